@@ -0,0 +1,122 @@
+"""
+Microbenchmark for the scraper HTML parsing layer.
+
+Compares parse time and peak memory of a full html.parser parse, a full lxml
+parse and an lxml partial parse (SoupStrainer) for saved search result pages.
+
+Usage:
+    python benchmark_parsing.py --source amazon page1.html page2.html
+"""
+
+import argparse
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+from bs4 import BeautifulSoup
+from rich.console import Console
+from rich.table import Table
+
+from dealfinder.utils.markup import SEARCH_RESULT_STRAINERS
+
+# CSS selector for the result elements of each source, used to check that strategies agree
+RESULT_SELECTORS = {
+    "amazon": 'div[data-component-type="s-search-result"]',
+    "ebay": "li.s-item",
+    "walmart": 'script[type="application/json"]',
+}
+
+def get_strategies(source: str) -> Dict[str, Callable[[str], BeautifulSoup]]:
+    """
+    Build the parsing strategies to compare.
+
+    Args:
+        source: Source name the pages were saved from
+
+    Returns:
+        Dictionary of strategy name to parse function
+    """
+    strainer = SEARCH_RESULT_STRAINERS[source]
+    return {
+        "html.parser (full)": lambda html: BeautifulSoup(html, "html.parser"),
+        "lxml (full)": lambda html: BeautifulSoup(html, "lxml"),
+        "lxml (partial)": lambda html: BeautifulSoup(html, "lxml", parse_only=strainer),
+    }
+
+def measure(parse: Callable[[str], BeautifulSoup], html: str, selector: str, repeat: int) -> Tuple[float, float, int]:
+    """
+    Measure one parsing strategy on one page.
+
+    Args:
+        parse: The parse function
+        html: The page HTML
+        selector: Selector for the result elements
+        repeat: Number of timed runs
+
+    Returns:
+        Tuple of (best parse+select time in ms, peak memory in MB, number of results found)
+    """
+    timings = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        results = parse(html).select(selector)
+        timings.append((time.perf_counter() - start_time) * 1000)
+
+    # Peak memory is measured separately so tracing overhead does not skew the timings
+    tracemalloc.start()
+    parse(html).select(selector)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return min(timings), peak / (1024 * 1024), len(results)
+
+def run_benchmark(source: str, paths: List[str], repeat: int) -> None:
+    """
+    Run all strategies over the given pages and print a results table.
+
+    Args:
+        source: Source name the pages were saved from
+        paths: Paths of saved search result pages
+        repeat: Number of timed runs per strategy and page
+    """
+    console = Console()
+    selector = RESULT_SELECTORS[source]
+    strategies = get_strategies(source)
+
+    table = Table(title=f"{source} search page parsing ({repeat} runs, best time)")
+    table.add_column("Page", style="cyan")
+    table.add_column("Size", justify="right")
+    table.add_column("Strategy", style="green")
+    table.add_column("Time (ms)", justify="right")
+    table.add_column("Peak memory (MB)", justify="right")
+    table.add_column("Results", justify="right")
+
+    for path in paths:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            html = f.read()
+
+        for name, parse in strategies.items():
+            elapsed, peak, found = measure(parse, html, selector, repeat)
+            table.add_row(
+                path,
+                f"{len(html) / 1024:.0f} KB",
+                name,
+                f"{elapsed:.1f}",
+                f"{peak:.2f}",
+                str(found)
+            )
+
+    console.print(table)
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark HTML parsing strategies for scraper pages")
+    parser.add_argument("--source", choices=sorted(RESULT_SELECTORS), required=True, help="Source the pages were saved from")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per strategy and page")
+    parser.add_argument("pages", nargs="+", help="Saved search result page HTML files")
+    args = parser.parse_args()
+
+    run_benchmark(args.source, args.pages, args.repeat)
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,8 @@ from typing import Dict, Any, List, Optional
 
 from dealfinder.agents.base import Agent, MCPMessage
 from dealfinder import config
+from dealfinder.utils.ranking import score_products, top_k_indices, order_by_score, best_index_per_group
+from dealfinder.utils.tracing import traced
 
 logger = logging.getLogger("DealFinderAI.ResultsAggregatorAgent")
 
@@ -223,6 +225,7 @@ class ResultsAggregatorAgent(Agent):
 Updated ResultsAggregatorAgent class with enhanced error handling and product filtering
 """
 
+    @traced("rank_products")
     def _rank_products(self, products: List[Dict[str, Any]], search_params: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
         Rank and sort products based on search parameters.
@@ -257,135 +260,21 @@ Updated ResultsAggregatorAgent class with enhanced error handling and product fi
                 except (ValueError, TypeError):
                     product["shipping"] = 0.0
         
-        # Calculate a score for each product
-        for product in products:
-            score = 0
-            
-            # Base score
-            # Higher ratings increase score
-            if "rating" in product:
-                try:
-                    rating = float(product["rating"])
-                    score += rating * 10
-                except (ValueError, TypeError):
-                    pass
-            
-            # More reviews increase confidence
-            if "reviews" in product:
-                try:
-                    reviews = int(product["reviews"])
-                    if reviews > 1000:
-                        score += 15
-                    elif reviews > 500:
-                        score += 10
-                    elif reviews > 100:
-                        score += 5
-                except (ValueError, TypeError):
-                    pass
-            
-            # Price considerations
-            if "price" in product:
-                try:
-                    price = float(product["price"])
-                    
-                    # Check if product is within desired price range
-                    if "price_range" in search_params and search_params["price_range"]:
-                        min_price, max_price = search_params["price_range"]
-                        if min_price and max_price:
-                            try:
-                                min_price = float(min_price)
-                                max_price = float(max_price)
-                                if min_price <= price <= max_price:
-                                    score += 20
-                                elif price < min_price:
-                                    score -= 5  # Too cheap might indicate lower quality
-                                elif price > max_price:
-                                    score -= 15  # Too expensive
-                            except (ValueError, TypeError):
-                                pass
-                        elif max_price:
-                            try:
-                                max_price = float(max_price)
-                                if price <= max_price:
-                                    score += 10
-                            except (ValueError, TypeError):
-                                pass
-                        elif min_price:
-                            try:
-                                min_price = float(min_price)
-                                if price >= min_price:
-                                    score += 5
-                            except (ValueError, TypeError):
-                                pass
-                    
-                    # Generally, lower prices are better for same product
-                    normalized_price_score = max(0, 30 - (price / 10))
-                    score += normalized_price_score
-                except (ValueError, TypeError):
-                    pass
-            
-            # Shipping considerations (for eBay)
-            if "shipping" in product:
-                try:
-                    shipping = float(product["shipping"])
-                    if shipping == 0:
-                        score += 5  # Free shipping bonus
-                except (ValueError, TypeError):
-                    pass
-                    
-            if "is_free_shipping" in product and product["is_free_shipping"]:
-                score += 5  # Free shipping bonus
-            
-            # Prime benefits (for Amazon)
-            if "is_prime" in product and product["is_prime"]:
-                score += 8
-            
-            # Pickup today benefits (for Walmart)
-            if "is_pickup_today" in product and product["is_pickup_today"]:
-                score += 6
-            
-            # Condition considerations (for eBay)
-            if "condition" in product:
-                condition = str(product.get("condition", "")).lower()
-                if "new" in condition:
-                    score += 10
-                elif "refurbished" in condition or "renewed" in condition:
-                    score += 5
-                elif "used" in condition and "like new" in condition:
-                    score += 3
-            
-            # Listing type considerations (for eBay)
-            if "listing_type" in product:
-                listing_type = str(product.get("listing_type", "")).lower()
-                if "buy it now" in listing_type:
-                    score += 5  # Buy It Now is generally preferred for immediacy
-            
-            # Seller rating considerations (for eBay)
-            if "seller_rating" in product:
-                try:
-                    seller_rating = float(product["seller_rating"])
-                    if seller_rating > 95:
-                        score += 5
-                    elif seller_rating > 90:
-                        score += 3
-                except (ValueError, TypeError):
-                    pass
-            
-            # Sponsored items are ranked lower
-            if "is_sponsored" in product and product["is_sponsored"]:
-                score -= 10
-            
-            # Store the score
+        # Score the whole batch at once
+        scores = score_products(products, search_params)
+        for product, score in zip(products, scores.tolist()):
             product["_score"] = score
         
-        # Sort by score (highest first)
-        sorted_products = sorted(products, key=lambda x: x.get("_score", 0), reverse=True)
-        
-        # Debug logging after sorting
-        self.logger.info(f"Sorted {len(sorted_products)} products by score")
-        
         # Ensure diversity by taking products from different sources
-        if len(sorted_products) > 5:
+        if len(products) > 5:
+            # Only the best products overall and the best product of each source can be
+            # selected, so order just those candidates instead of sorting the whole batch
+            candidates = set(top_k_indices(scores, config.DEFAULT_MAX_RESULTS + 5).tolist())
+            candidates.update(best_index_per_group(scores, [product.get("source") for product in products]))
+            sorted_products = [products[i] for i in order_by_score(scores, list(candidates))]
+            
+            self.logger.info(f"Selected {len(sorted_products)} top-scored candidates")
+            
             # Ensure top results have diversity of sources
             top_5_sources = set()
             final_products = []
@@ -413,6 +302,9 @@ Updated ResultsAggregatorAgent class with enhanced error handling and product fi
             self.logger.info(f"Returning {len(final_products)} diversified products")
             return final_products
         
+        # Sort by score (highest first)
+        sorted_products = [products[i] for i in top_k_indices(scores, len(products))]
+        
         # Debug logging for results when <= 5 products
         self.logger.info(f"Returning all {len(sorted_products)} sorted products")
         return sorted_products
@@ -5,11 +5,15 @@ This module defines the base Agent class and MCPMessage protocol
 that all agents in the system will use to communicate.
 """
 
+import asyncio
 import logging
 import json
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 
+from dealfinder.utils.metrics import instrument_agent_method
+from dealfinder.utils.tracing import current_span, trace_agent_method
+
 class MCPMessage:
     """Implementation of Multi-Agent Communication Protocol (MCP) messages"""
     
@@ -18,7 +22,9 @@ class MCPMessage:
                  receiver: str, 
                  content: Any,
                  message_type: str = "REQUEST",
-                 conversation_id: Optional[str] = None):
+                 conversation_id: Optional[str] = None,
+                 trace_id: Optional[str] = None,
+                 parent_span_id: Optional[str] = None):
         """
         Initialize a new MCP message.
         
@@ -28,6 +34,8 @@ class MCPMessage:
             content: The message content (can be any serializable object)
             message_type: The type of message (REQUEST, RESPONSE, INFO, ERROR)
             conversation_id: Optional conversation ID for grouping related messages
+            trace_id: Optional trace the message belongs to, defaults to the current span's trace
+            parent_span_id: Optional span that sent the message, defaults to the current span
         """
         self.sender = sender
         self.receiver = receiver
@@ -35,6 +43,14 @@ class MCPMessage:
         self.message_type = message_type  # REQUEST, RESPONSE, INFO, ERROR
         self.timestamp = datetime.now().isoformat()
         self.conversation_id = conversation_id or datetime.now().strftime("%Y%m%d%H%M%S")
+        
+        # Carry the sender's span so the receiving agent's span nests under it, even on another thread
+        if trace_id is None:
+            span = current_span()
+            if span is not None:
+                trace_id, parent_span_id = span.trace_id, span.span_id
+        self.trace_id = trace_id
+        self.parent_span_id = parent_span_id
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert message to dictionary format"""
@@ -44,7 +60,9 @@ class MCPMessage:
             "content": self.content,
             "message_type": self.message_type,
             "timestamp": self.timestamp,
-            "conversation_id": self.conversation_id
+            "conversation_id": self.conversation_id,
+            "trace_id": self.trace_id,
+            "parent_span_id": self.parent_span_id
         }
     
     def to_json(self) -> str:
@@ -60,13 +78,22 @@ class MCPMessage:
             receiver=data["receiver"],
             content=data["content"],
             message_type=data["message_type"],
-            conversation_id=data["conversation_id"]
+            conversation_id=data["conversation_id"],
+            trace_id=data.get("trace_id"),
+            parent_span_id=data.get("parent_span_id")
         )
 
 
 class Agent:
     """Base agent class for MCP protocol"""
     
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Record message handling latency and a tracing span for every agent's own handlers
+        for method_name in ("process_message", "async_process_message"):
+            if method_name in cls.__dict__:
+                setattr(cls, method_name, instrument_agent_method(trace_agent_method(cls.__dict__[method_name])))
+    
     def __init__(self, name: str):
         """
         Initialize a new agent.
@@ -100,6 +127,22 @@ class Agent:
             conversation_id=message.conversation_id
         )
     
+    async def async_process_message(self, message: MCPMessage) -> MCPMessage:
+        """
+        Process incoming message without blocking the event loop.
+        
+        Agents that wait on network I/O override this with a native async
+        implementation. The default runs process_message in the loop's executor.
+        
+        Args:
+            message: The incoming MCPMessage to process
+            
+        Returns:
+            A new MCPMessage containing the response
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.process_message, message)
+    
     def send_message(self, receiver: str, content: Any, message_type: str = "REQUEST") -> MCPMessage:
         """
         Create a new message to send to another agent.
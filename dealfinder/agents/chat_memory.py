@@ -12,28 +12,47 @@ from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 from dealfinder.agents.gemini_agent import GeminiAgent
 from dealfinder.agents.base import Agent, MCPMessage
+from dealfinder import config
 from dealfinder.utils.logging import get_logger
+from dealfinder.utils.follow_up import FollowUpClassifier, get_follow_up_classifier
+from dealfinder.utils.memory_store import ConversationStore, get_conversation_store
+from dealfinder.utils.metrics import llm_call_site
 
 logger = get_logger("ChatMemory")
 
 class ChatMemoryAgent(Agent):
     """Agent for storing conversation history and enabling context-aware responses"""
     
-    def __init__(self):
-        """Initialize the Chat Memory agent."""
+    def __init__(self,
+                 memory_store: Optional[ConversationStore] = None,
+                 classifier: Optional[FollowUpClassifier] = None):
+        """
+        Initialize the Chat Memory agent.
+        
+        Args:
+            memory_store: Optional conversation store, defaults to the shared process-wide store
+            classifier: Optional local follow-up classifier, defaults to the shared classifier
+        """
         super().__init__("ChatMemoryAgent")
         
+        # Bounded store with per-conversation TTL and LRU eviction
+        self.memory = memory_store if memory_store is not None else get_conversation_store()
+        
         # Store conversation context by conversation ID
-        self.conversation_contexts = {}
+        self.conversation_contexts = self.memory.field("conversation_context")
         
         # Store product information by conversation ID
-        self.product_info = {}
+        self.product_info = self.memory.field("product_info")
         
         # Track recent queries by conversation ID
-        self.recent_queries = {}
+        self.recent_queries = self.memory.field("recent_queries")
         
         # Track currently viewed product
-        self.focused_products = {}
+        self.focused_products = self.memory.field("focused_product")
+        
+        # Local follow-up classifier, with Gemini only consulted for ambiguous queries
+        self.classifier = classifier if classifier is not None else get_follow_up_classifier()
+        self._gemini_agent = None
     
     def process_message(self, message: MCPMessage) -> MCPMessage:
         """
@@ -766,6 +785,7 @@ detect product references.
                 conversation_id=message.conversation_id
             )
 
+    @llm_call_site("analyze_query")
     def _analyze_query(self, message: MCPMessage) -> MCPMessage:
         """
         Analyze if a query is related to previous products or represents a new search
@@ -786,6 +806,7 @@ detect product references.
             # Check if there are products to reference
             if conversation_id not in self.product_info or not self.product_info[conversation_id]:
                 self.logger.info("No product context available for this conversation")
+                self.classifier.record("no_context")
                 return MCPMessage(
                     sender=self.name,
                     receiver=message.sender,
@@ -803,6 +824,24 @@ detect product references.
             stored_products = self.product_info[conversation_id]
             self.logger.info(f"Found {len(stored_products)} products in memory")
             
+            # Decide confident cases locally, escalating only ambiguous queries to Gemini
+            if config.FOLLOW_UP_LOCAL_CLASSIFIER:
+                classification = self.classifier.classify(
+                    query,
+                    [product.get("title", "") for product in stored_products],
+                    self.focused_products.get(conversation_id, None)
+                )
+                if classification["decision"] != "ambiguous":
+                    self.logger.info(f"Local follow-up decision: {classification['decision']} ({classification['reason']})")
+                    self.classifier.record(f"local_{classification['decision']}")
+                    return MCPMessage(
+                        sender=self.name,
+                        receiver=message.sender,
+                        content=self._local_analysis(classification, stored_products),
+                        message_type="MEMORY_ANALYZE_RESPONSE",
+                        conversation_id=conversation_id
+                    )
+            
             # Create a structured prompt for Gemini to analyze context switch
             context_analysis_prompt = self._create_context_switch_prompt(query, stored_products)
             
@@ -815,15 +854,17 @@ detect product references.
                 conversation_id=conversation_id
             )
             
-            # Get Gemini's analysis - instantiate directly to avoid circular imports
-            gemini_agent = GeminiAgent()
-            analysis_response = gemini_agent.process_message(gemini_message)
+            # Get Gemini's analysis, reusing one agent across turns
+            analysis_response = self._get_gemini_agent().process_message(gemini_message)
             
             if analysis_response.message_type == "ERROR":
                 self.logger.warning(f"Error from Gemini agent: {analysis_response.content}")
                 # Fall back to legacy approach on error
+                self.classifier.record("legacy_fallback")
                 return self._legacy_analyze_query(message)
             
+            self.classifier.record("gemini")
+            
             # Parse Gemini's response to extract the analysis
             analysis_result = self._parse_gemini_analysis(analysis_response.content, stored_products)
             
@@ -839,7 +880,47 @@ detect product references.
         except Exception as e:
             self.logger.error(f"Error analyzing query with Gemini: {str(e)}")
             # Fall back to the legacy approach on exception
+            self.classifier.record("legacy_fallback")
             return self._legacy_analyze_query(message)
+    
+    def _get_gemini_agent(self) -> GeminiAgent:
+        """Get the Gemini agent used for ambiguous queries, created on first use."""
+        if self._gemini_agent is None:
+            self._gemini_agent = GeminiAgent()
+        return self._gemini_agent
+    
+    def _local_analysis(self, classification: Dict[str, Any], stored_products: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Build the analysis result for a query decided by the local classifier.
+        
+        Args:
+            classification: Result of FollowUpClassifier.classify
+            stored_products: Products stored for the conversation
+            
+        Returns:
+            Analysis result in the same format as the Gemini analysis
+        """
+        if classification["decision"] != "follow_up":
+            return {
+                "is_follow_up": False,
+                "focused_product": None,
+                "referenced_products": [],
+                "products": []
+            }
+        
+        indices = classification["referenced_indices"]
+        referenced_products = [stored_products[index] for index in indices]
+        
+        # If no specific products referenced, use first product
+        if not referenced_products:
+            referenced_products = [stored_products[0]]
+        
+        return {
+            "is_follow_up": True,
+            "focused_product": indices[0] if indices else None,
+            "referenced_products": referenced_products,
+            "products": []
+        }
         
     def _update_focus(self, message: MCPMessage) -> MCPMessage:
         """
@@ -897,29 +978,21 @@ detect product references.
             
             # Store original query
             if "query" in content:
-                if conversation_id not in self.recent_queries:
-                    self.recent_queries[conversation_id] = []
-                
-                # Add to recent queries (keep last 5)
-                self.recent_queries[conversation_id].append({
+                # Add to recent queries (keep last 5), replacing the list so its size is re-measured
+                queries = self.recent_queries.get(conversation_id, []) + [{
                     "query": content["query"],
                     "timestamp": datetime.now().isoformat(),
                     "search_params": content.get("search_params", {})
-                })
+                }]
                 
                 # Trim to last 5 queries
-                if len(self.recent_queries[conversation_id]) > 5:
-                    self.recent_queries[conversation_id] = self.recent_queries[conversation_id][-5:]
+                self.recent_queries[conversation_id] = queries[-5:]
             
             # Store product information
             if "products" in content:
                 products = content["products"]
                 self.logger.info(f"Storing {len(products)} products for conversation {conversation_id}")
                 
-                # Initialize if not exists
-                if conversation_id not in self.product_info:
-                    self.product_info[conversation_id] = []
-                
                 # Add to product info (replace existing products)
                 self.product_info[conversation_id] = products
             else:
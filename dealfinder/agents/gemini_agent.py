@@ -8,24 +8,36 @@ Google's Gemini API for natural language understanding.
 import os
 import json
 import logging
-from typing import Dict, Any, Optional
-
-import google.generativeai as genai
+import time
+from typing import Dict, Any, List, Optional
 
 from dealfinder.agents.base import Agent, MCPMessage
+from dealfinder import config
+from dealfinder.utils.cache import get_llm_cache, llm_cache_key
+from dealfinder.utils.llm_clients import LLMClientRegistry, get_llm_registry
+from dealfinder.utils.markup import minify_html_fragment
+from dealfinder.utils.metrics import llm_call_site, current_llm_call_site, observe_llm
+from dealfinder.utils.tracing import traced, set_span_attribute
 
 logger = logging.getLogger("DealFinderAI.GeminiAgent")
 
 class GeminiAgent(Agent):
     """Agent that interfaces with Google's Gemini API"""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self,
+                 api_key: Optional[str] = None,
+                 response_cache: Optional[Any] = None,
+                 registry: Optional[LLMClientRegistry] = None):
         """
         Initialize a new Gemini API agent.
         
         Args:
             api_key: Optional Gemini API key. If not provided, will try to get it from
                      the GEMINI_API_KEY environment variable.
+            response_cache: Optional cache with get/set methods for prompt responses.
+                            Defaults to the shared LLM cache when LLM_CACHE_ENABLED is set.
+            registry: Optional client registry providing the model handle and request limits.
+                      Defaults to the shared process-wide registry.
         """
         super().__init__("GeminiAgent")
         
@@ -34,8 +46,14 @@ class GeminiAgent(Agent):
         if not api_key:
             raise ValueError("Gemini API key is required. Set GEMINI_API_KEY environment variable or pass it to the constructor.")
         
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-1.5-flash')
+        # Model handles are shared, so creating an agent does not create a new client
+        self.registry = registry if registry is not None else get_llm_registry()
+        self.model_name = config.DEFAULT_LLM_MODEL
+        self.model = self.registry.get_model(self.model_name, api_key)
+        
+        if response_cache is None and config.LLM_CACHE_ENABLED:
+            response_cache = get_llm_cache()
+        self.response_cache = response_cache
     
     def process_message(self, message: MCPMessage) -> MCPMessage:
         """
@@ -55,13 +73,13 @@ class GeminiAgent(Agent):
         
         try:
             if message.message_type == "REQUEST":
-                # Generate response from Gemini
-                response = self.model.generate_content(message.content)
+                # Generate response from Gemini, labelled with the caller's call site
+                text = self._generate(message.content, default_call_site=message.sender)
                 
                 return MCPMessage(
                     sender=self.name,
                     receiver=message.sender,
-                    content=response.text,
+                    content=text,
                     message_type="RESPONSE",
                     conversation_id=message.conversation_id
                 )
@@ -87,6 +105,126 @@ class GeminiAgent(Agent):
                 conversation_id=message.conversation_id
             )
     
+    async def async_process_message(self, message: MCPMessage) -> MCPMessage:
+        """
+        Process requests using Gemini's async generate API.
+        
+        Handles the same message types as process_message without blocking
+        the event loop while waiting on the model.
+        
+        Args:
+            message: The incoming MCPMessage to process
+            
+        Returns:
+            A new MCPMessage containing the response
+        """
+        self.logger.info(f"Processing query with Gemini (async): {message.content}")
+        
+        try:
+            if message.message_type == "REQUEST":
+                text = await self._async_generate(message.content, default_call_site=message.sender)
+                
+                return MCPMessage(
+                    sender=self.name,
+                    receiver=message.sender,
+                    content=text,
+                    message_type="RESPONSE",
+                    conversation_id=message.conversation_id
+                )
+            elif message.message_type == "PARSE_QUERY":
+                return await self._async_parse_user_query(message)
+            else:
+                return MCPMessage(
+                    sender=self.name,
+                    receiver=message.sender,
+                    content={"error": f"Unsupported message type: {message.message_type}"},
+                    message_type="ERROR",
+                    conversation_id=message.conversation_id
+                )
+                
+        except Exception as e:
+            self.logger.error(f"Error processing Gemini request: {str(e)}")
+            return MCPMessage(
+                sender=self.name,
+                receiver=message.sender,
+                content={"error": f"Gemini API error: {str(e)}"},
+                message_type="ERROR",
+                conversation_id=message.conversation_id
+            )
+    
+    @traced("gemini.generate")
+    def _generate(self, prompt: str, default_call_site: str = "generate") -> str:
+        """
+        Generate a response for a prompt, serving repeated prompts from the response cache.
+        
+        Args:
+            prompt: The prompt to send to Gemini
+            default_call_site: Metrics label used when the caller set no llm_call_site
+            
+        Returns:
+            The response text
+        """
+        call_site = current_llm_call_site(default_call_site)
+        set_span_attribute("llm.call_site", call_site)
+        cache_key = llm_cache_key(self.model_name, prompt)
+        if self.response_cache is not None:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                observe_llm(call_site, "cached")
+                set_span_attribute("llm.cached", True)
+                return cached
+        
+        started = time.perf_counter()
+        try:
+            with self.registry.request_slot():
+                response = self.model.generate_content(prompt)
+                text = response.text
+        except Exception:
+            observe_llm(call_site, "error", time.perf_counter() - started)
+            raise
+        observe_llm(call_site, "ok", time.perf_counter() - started, response)
+        
+        if self.response_cache is not None and text:
+            self.response_cache.set(cache_key, text)
+        return text
+    
+    @traced("gemini.generate")
+    async def _async_generate(self, prompt: str, default_call_site: str = "generate") -> str:
+        """
+        Async counterpart of _generate using Gemini's async generate API.
+        
+        Args:
+            prompt: The prompt to send to Gemini
+            default_call_site: Metrics label used when the caller set no llm_call_site
+            
+        Returns:
+            The response text
+        """
+        call_site = current_llm_call_site(default_call_site)
+        set_span_attribute("llm.call_site", call_site)
+        cache_key = llm_cache_key(self.model_name, prompt)
+        if self.response_cache is not None:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                observe_llm(call_site, "cached")
+                set_span_attribute("llm.cached", True)
+                return cached
+        
+        started = time.perf_counter()
+        try:
+            async with self.registry.async_request_slot():
+                response = await self.model.generate_content_async(prompt)
+                text = response.text
+        except Exception:
+            observe_llm(call_site, "error", time.perf_counter() - started)
+            raise
+        observe_llm(call_site, "ok", time.perf_counter() - started, response)
+        
+        if self.response_cache is not None and text:
+            self.response_cache.set(cache_key, text)
+        return text
+    
+    @llm_call_site("parse_user_query")
     def _parse_user_query(self, message: MCPMessage) -> MCPMessage:
         """
         Parse a user query into structured search parameters.
@@ -97,9 +235,36 @@ class GeminiAgent(Agent):
         Returns:
             A new MCPMessage containing the parsed parameters
         """
+        text = self._generate(self._parse_query_prompt(message.content))
+        return self._parse_query_response(message, text)
+    
+    @llm_call_site("parse_user_query")
+    async def _async_parse_user_query(self, message: MCPMessage) -> MCPMessage:
+        """
+        Async counterpart of _parse_user_query using Gemini's async generate API.
+        
+        Args:
+            message: The incoming MCPMessage with the query to parse
+            
+        Returns:
+            A new MCPMessage containing the parsed parameters
+        """
+        text = await self._async_generate(self._parse_query_prompt(message.content))
+        return self._parse_query_response(message, text)
+    
+    def _parse_query_prompt(self, query: str) -> str:
+        """
+        Build the prompt used to parse a shopping query.
+        
+        Args:
+            query: The user query string
+            
+        Returns:
+            The prompt string
+        """
         prompt = f"""
         Parse the following shopping query into structured data:
-        "{message.content}"
+        "{query}"
         
         Return a JSON object with these fields:
         - product_type: The main product category
@@ -113,11 +278,22 @@ class GeminiAgent(Agent):
         Format as valid JSON without explanations.
         """
         
-        response = self.model.generate_content(prompt)
+        return prompt
+    
+    def _parse_query_response(self, message: MCPMessage, text: str) -> MCPMessage:
+        """
+        Turn Gemini's query parse response into an MCPMessage.
         
+        Args:
+            message: The incoming MCPMessage with the query that was parsed
+            text: The Gemini response text
+            
+        Returns:
+            A new MCPMessage containing the parsed parameters, or an ERROR message
+        """
         try:
             # Attempt to parse the JSON response
-            parsed_json = json.loads(response.text)
+            parsed_json = json.loads(text)
             return MCPMessage(
                 sender=self.name,
                 receiver=message.sender,
@@ -127,12 +303,12 @@ class GeminiAgent(Agent):
             )
         except json.JSONDecodeError:
             # If parsing fails, try to extract JSON from the response
-            self.logger.warning(f"Failed to parse Gemini response as JSON: {response.text}")
+            self.logger.warning(f"Failed to parse Gemini response as JSON: {text}")
             
             # Try to extract JSON block if it's wrapped in code markers
             try:
-                if "```json" in response.text:
-                    json_content = response.text.split("```json")[1].split("```")[0].strip()
+                if "```json" in text:
+                    json_content = text.split("```json")[1].split("```")[0].strip()
                     parsed_json = json.loads(json_content)
                     return MCPMessage(
                         sender=self.name,
@@ -148,22 +324,27 @@ class GeminiAgent(Agent):
             return MCPMessage(
                 sender=self.name,
                 receiver=message.sender,
-                content={"error": "Failed to parse query", "raw_response": response.text},
+                content={"error": "Failed to parse query", "raw_response": text},
                 message_type="ERROR",
                 conversation_id=message.conversation_id
             )
     
-    def extract_product_details_from_html(self, html_content: str) -> Dict[str, Any]:
+    @llm_call_site("extract_product_details")
+    def extract_product_details_from_html(self, html_content: str, minify: bool = True) -> Dict[str, Any]:
         """
         Extract product details from HTML content using Gemini.
         
         Args:
             html_content: HTML content to extract details from
+            minify: Strip non-semantic markup before sending; pass False for
+                    content that is not HTML (e.g. a JSON product record)
             
         Returns:
             Dictionary containing extracted product details
         """
         try:
+            if minify:
+                html_content = minify_html_fragment(html_content)
             prompt = f"""
             Extract product details from the following HTML content:
 
@@ -192,8 +373,7 @@ class GeminiAgent(Agent):
             }}
             ```
             """
-            response = self.model.generate_content(prompt)
-            content = response.text
+            content = self._generate(prompt)
             # Try to extract JSON from the response
             import re
             json_match = re.search(r'```json\s*([^`]+)\s*```', content)
@@ -210,25 +390,184 @@ class GeminiAgent(Agent):
                     return {
                         "error": "Could not extract product details from HTML"
                     }
-            # Type correction
-            try:
-                data["price"] = float(data.get("price", 0.0))
-            except Exception:
-                data["price"] = 0.0
-            try:
-                data["rating"] = float(data.get("rating", 0.0))
-            except Exception:
-                data["rating"] = 0.0
-            try:
-                data["reviews"] = int(data.get("reviews", 0))
-            except Exception:
-                data["reviews"] = 0
-            return data
+            return self._coerce_product_fields(data)
         except Exception as e:
             self.logger.error(f"Error extracting product details: {str(e)}")
             return {
                 "error": f"Error extracting product details: {str(e)}"
             }
+    
+    @llm_call_site("extract_products_batch")
+    def extract_products_from_html_batch(self, html_fragments: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Extract product details from several HTML fragments with batched Gemini calls.
+        
+        Fragments are sent in chunks of GEMINI_EXTRACTION_BATCH_SIZE, so N fragments
+        take ceil(N / batch size) round-trips instead of N.
+        
+        Args:
+            html_fragments: HTML content of each product listing
+            
+        Returns:
+            A list aligned with html_fragments containing the extracted product, or None
+            where extraction failed or the result did not match the product schema
+        """
+        results = [None] * len(html_fragments)
+        batch_size = max(1, config.GEMINI_EXTRACTION_BATCH_SIZE)
+        
+        for start in range(0, len(html_fragments), batch_size):
+            chunk = html_fragments[start:start + batch_size]
+            try:
+                items = self._parse_json_array(self._generate(self._batch_extraction_prompt(chunk)))
+            except Exception as e:
+                self.logger.error(f"Error in batch product extraction: {str(e)}")
+                continue
+            
+            if items is None:
+                self.logger.warning(f"Could not parse batch extraction response for {len(chunk)} fragments")
+                continue
+            
+            for position, item in enumerate(items):
+                # Prefer the echoed index, falling back to position in the array
+                index = item.get("index", position) if isinstance(item, dict) else position
+                if not isinstance(index, int) or not 0 <= index < len(chunk):
+                    continue
+                
+                product = self._validate_product(item)
+                if product is not None:
+                    results[start + index] = product
+        
+        extracted = sum(1 for product in results if product is not None)
+        self.logger.info(f"Batch extraction returned {extracted}/{len(html_fragments)} valid products")
+        return results
+    
+    def _batch_extraction_prompt(self, html_fragments: List[str]) -> str:
+        """
+        Build the prompt used to extract several products in one call.
+        
+        Args:
+            html_fragments: HTML content of each product listing
+            
+        Returns:
+            The prompt string
+        """
+        sections = "\n\n".join(
+            f"Fragment {index}:\n```html\n{minify_html_fragment(fragment)}\n```"
+            for index, fragment in enumerate(html_fragments)
+        )
+        
+        prompt = f"""
+            Extract product details from each of the following {len(html_fragments)} HTML fragments.
+            Each fragment contains a single product listing.
+
+            {sections}
+
+            For each fragment extract:
+            - index: The fragment number
+            - title: Product title
+            - price: Product price as a float
+            - url: Product URL
+            - image_url: Product image URL
+            - rating: Product rating (0-5)
+            - reviews: Number of reviews
+
+            Return a JSON array with exactly one object per fragment, in fragment order:
+            ```json
+            [
+                {{
+                    "index": 0,
+                    "title": "",
+                    "price": 0.0,
+                    "url": "",
+                    "image_url": "",
+                    "rating": 0.0,
+                    "reviews": 0
+                }}
+            ]
+            ```
+            """
+        
+        return prompt
+    
+    def _parse_json_array(self, content: str) -> Optional[List[Any]]:
+        """
+        Parse a JSON array from a Gemini response, with or without code fences.
+        
+        Args:
+            content: The Gemini response text
+            
+        Returns:
+            The parsed list, or None if no JSON array could be parsed
+        """
+        import re
+        json_match = re.search(r'```(?:json)?\s*([\s\S]*?)\s*```', content)
+        candidate = json_match.group(1) if json_match else content.strip()
+        
+        try:
+            data = json.loads(candidate)
+        except json.JSONDecodeError:
+            return None
+        
+        return data if isinstance(data, list) else None
+    
+    def _validate_product(self, data: Any) -> Optional[Dict[str, Any]]:
+        """
+        Check an extracted product against the product schema.
+        
+        The product must be an object with a non-empty string title; url and
+        image_url must be strings if present, and numeric fields are coerced.
+        
+        Args:
+            data: A single extracted item
+            
+        Returns:
+            The product dictionary with schema fields only, or None if it is invalid
+        """
+        if not isinstance(data, dict):
+            return None
+        
+        title = data.get("title")
+        if not isinstance(title, str) or not title.strip():
+            return None
+        
+        for field in ("url", "image_url"):
+            if data.get(field) is not None and not isinstance(data[field], str):
+                return None
+        
+        product = {
+            "title": title.strip(),
+            "price": data.get("price", 0.0),
+            "url": data.get("url") or "",
+            "image_url": data.get("image_url") or "",
+            "rating": data.get("rating", 0.0),
+            "reviews": data.get("reviews", 0)
+        }
+        return self._coerce_product_fields(product)
+    
+    def _coerce_product_fields(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Coerce numeric product fields to their expected types.
+        
+        Args:
+            data: Extracted product dictionary
+            
+        Returns:
+            The same dictionary with price, rating and reviews coerced
+        """
+        try:
+            data["price"] = float(data.get("price", 0.0))
+        except Exception:
+            data["price"] = 0.0
+        try:
+            data["rating"] = float(data.get("rating", 0.0))
+        except Exception:
+            data["rating"] = 0.0
+        try:
+            data["reviews"] = int(data.get("reviews", 0))
+        except Exception:
+            data["reviews"] = 0
+        return data
+    
     def run(self, prompt: str) -> str:
         """
         Run a free-form prompt using the Gemini model and return the response text.
@@ -240,8 +579,7 @@ class GeminiAgent(Agent):
             The text content of Gemini's response.
         """
         try:
-            response = self.model.generate_content(prompt)
-            return response.text
+            return self._generate(prompt, default_call_site="run")
         except Exception as e:
             self.logger.error(f"Error in run(): {str(e)}")
             return f"Error: {str(e)}"
\ No newline at end of file
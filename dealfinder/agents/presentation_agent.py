@@ -11,6 +11,7 @@ from typing import Dict, Any, List, Optional
 
 from dealfinder.agents.base import Agent, MCPMessage
 from dealfinder.utils.logging import get_logger
+from dealfinder.utils.metrics import llm_call_site
 
 logger = get_logger("PresentationAgent")
 
@@ -705,6 +706,7 @@ class PresentationAgent(Agent):
     We need to ensure follow-up questions properly display actual prices.
     """
 
+    @llm_call_site("presentation_follow_up")
     def _handle_follow_up(self, query: str, referenced_products: List[Dict[str, Any]], conversation_id: str) -> str:
         """
         Handle follow-up questions about specific products.
@@ -5,13 +5,12 @@ This module implements the ProductComparisonAgent class that identifies
 the same products across different e-commerce sites and compares prices.
 """
 
-import re
 import logging
-import difflib
 from typing import Dict, Any, List, Optional, Tuple
 
 from dealfinder.agents.base import Agent, MCPMessage
 from dealfinder.utils.logging import get_logger
+from dealfinder.utils.matching import group_similar_titles
 
 logger = get_logger("ProductComparison")
 
@@ -351,12 +350,6 @@ class ProductComparisonAgent(Agent):
         Returns:
             List of product groups, where each group is a list of similar products
         """
-        # Create groups of similar products
-        product_groups = []
-        
-        # Products already assigned to a group
-        assigned_products = set()
-        
         # Log the number of products to group
         self.logger.info(f"Grouping {len(products)} products")
         
@@ -369,76 +362,9 @@ class ProductComparisonAgent(Agent):
                     self.logger.warning(f"Invalid price in product {product.get('title', 'Unknown')}: {product.get('price')}")
                     product["price"] = 0.0
         
-        # Extract model numbers and significant terms from titles
-        product_info = []
-        for i, product in enumerate(products):
-            title = product.get("title", "").lower()
-            # Try to extract model numbers (like WH-1000XM4)
-            model_numbers = re.findall(r'[a-zA-Z]+[-]?\d+[a-zA-Z0-9]*', title)
-            # Extract significant terms (words with 4+ characters)
-            significant_terms = [word for word in title.split() if len(word) >= 4]
-            product_info.append({
-                "index": i,
-                "model_numbers": model_numbers,
-                "significant_terms": significant_terms,
-                "title": title
-            })
-        
-        # First pass: group by model number
-        for i, info in enumerate(product_info):
-            if i in assigned_products:
-                continue
-                
-            group = [products[i]]
-            assigned_products.add(i)
-            
-            for j, other_info in enumerate(product_info):
-                if j in assigned_products or i == j:
-                    continue
-                
-                # Check for matching model numbers
-                if info["model_numbers"] and other_info["model_numbers"]:
-                    for model in info["model_numbers"]:
-                        if any(model.lower() in other_model.lower() or other_model.lower() in model.lower() 
-                            for other_model in other_info["model_numbers"]):
-                            group.append(products[j])
-                            assigned_products.add(j)
-                            break
-            
-            if len(group) > 1:
-                product_groups.append(group)
-        
-        # Second pass: group by title similarity
-        for i, info in enumerate(product_info):
-            if i in assigned_products:
-                continue
-                
-            group = [products[i]]
-            assigned_products.add(i)
-            
-            for j, other_info in enumerate(product_info):
-                if j in assigned_products or i == j:
-                    continue
-                
-                # Calculate title similarity
-                similarity = difflib.SequenceMatcher(None, info["title"], other_info["title"]).ratio()
-                
-                # Check for shared significant terms
-                shared_terms = set(info["significant_terms"]) & set(other_info["significant_terms"])
-                term_ratio = len(shared_terms) / max(len(info["significant_terms"]), len(other_info["significant_terms"]), 1)
-                
-                # If titles are similar or share many significant terms
-                if similarity > 0.6 or term_ratio > 0.5:
-                    group.append(products[j])
-                    assigned_products.add(j)
-            
-            if len(group) > 1:
-                product_groups.append(group)
-        
-        # Add remaining ungrouped products as single-item groups
-        for i, product in enumerate(products):
-            if i not in assigned_products:
-                product_groups.append([product])
+        # Index-based matching: only candidate pairs sharing a model number or blocking token are scored
+        title_groups = group_similar_titles([product.get("title", "") for product in products])
+        product_groups = [[products[i] for i in group] for group in title_groups]
         
         # Log the results
         self.logger.info(f"Created {len(product_groups)} product groups")
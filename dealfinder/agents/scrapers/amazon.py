@@ -850,6 +850,7 @@ This module implements the RealAmazonScraperAgent class that uses BeautifulSoup,
 requests, and Gemini AI to extract and optimize product data from Amazon.
 """
 
+import asyncio
 import random
 import time
 import logging
@@ -857,12 +858,17 @@ import json
 import re
 from typing import Dict, Any, List, Optional, Tuple
 
-import requests
-from bs4 import BeautifulSoup
 
 from dealfinder.agents.base import Agent, MCPMessage
 from dealfinder import config
 from dealfinder.utils.logging import get_logger
+from dealfinder.utils.http import get_transport, get_async_transport
+from dealfinder.utils.cache import get_search_cache, search_cache_key
+from dealfinder.utils.circuit_breaker import get_circuit_breaker
+from dealfinder.utils.rate_limit import RateLimitExceeded
+from dealfinder.utils.relevance import RelevanceMatcher
+from dealfinder.utils.metrics import llm_call_site, count_products
+from dealfinder.utils.markup import minify_html_fragment, parse_search_page
 from dealfinder.agents.gemini_agent import GeminiAgent
 
 logger = get_logger("Scrapers.Amazon")
@@ -875,6 +881,10 @@ class RealAmazonScraperAgent(Agent):
         super().__init__("AmazonScraperAgent")
         self.base_url = config.AMAZON_BASE_URL
         self.gemini_agent = GeminiAgent()
+        self.transport = get_transport()
+        self.async_transport = get_async_transport()
+        self.result_cache = get_search_cache()
+        self.circuit_breaker = get_circuit_breaker("amazon")
         
         # Configure headers with default values
         self.headers = {
@@ -906,23 +916,107 @@ class RealAmazonScraperAgent(Agent):
             )
         
         search_params = message.content
-        self.logger.info(f"Searching Amazon for: {search_params}")
+        self.logger.info("Searching Amazon for: %s", search_params.get("query", ""))
+        self.logger.debug("Search parameters: %s", search_params)
         
         try:
-            # Use Gemini to optimize the search query for Amazon's search engine
-            optimized_params = self._optimize_search_params(search_params)
-            self.logger.info(f"Optimized search parameters: {optimized_params}")
+            # Repeat searches are served from the result cache without touching the network
+            cached = self._get_cached_search(search_params)
+            if cached is not None:
+                query, products = cached
+            else:
+                # Fail fast while the source is known to be down, before spending a Gemini call
+                self.circuit_breaker.check()
+                
+                # Use Gemini to optimize the search query for Amazon's search engine
+                optimized_params = self._optimize_search_params(search_params)
+                self.logger.debug("Optimized search parameters: %s", optimized_params)
+                
+                # Convert optimized parameters to Amazon search query
+                query = self._build_search_query(optimized_params)
+                self.logger.info(f"Built Amazon query: {query}")
+                
+                # Perform the search
+                products = self._scrape_search_results(query, optimized_params)
+                self._cache_search(search_params, query, products)
             
-            # Convert optimized parameters to Amazon search query
-            query = self._build_search_query(optimized_params)
-            self.logger.info(f"Built Amazon query: {query}")
+            # Apply Gemini-based relevance filtering
+            extracted = len(products)
+            if not search_params.get("skip_relevance_filter", False):
+                products = self._apply_relevance_filter(products, search_params)
+            count_products("amazon", extracted, len(products))
+            
+            return MCPMessage(
+                sender=self.name,
+                receiver=message.sender,
+                content={
+                    "source": "Amazon",
+                    "query": query,
+                    "products": products
+                },
+                message_type="SEARCH_RESPONSE",
+                conversation_id=message.conversation_id
+            )
+        
+        except Exception as e:
+            self.logger.error(f"Error scraping Amazon: {str(e)}")
+            return MCPMessage(
+                sender=self.name,
+                receiver=message.sender,
+                content={"error": f"Amazon scraping error: {str(e)}"},
+                message_type="ERROR",
+                conversation_id=message.conversation_id
+            )
+    
+    async def async_process_message(self, message: MCPMessage) -> MCPMessage:
+        """
+        Process search request for Amazon without blocking the event loop.
+        
+        Args:
+            message: The incoming MCPMessage to process
             
-            # Perform the search
-            products = self._scrape_search_results(query, optimized_params)
+        Returns:
+            A new MCPMessage containing the search results
+        """
+        if message.message_type != "SEARCH_REQUEST":
+            return MCPMessage(
+                sender=self.name,
+                receiver=message.sender,
+                content={"error": "Only SEARCH_REQUEST message type is supported"},
+                message_type="ERROR",
+                conversation_id=message.conversation_id
+            )
+        
+        search_params = message.content
+        self.logger.info("Searching Amazon for: %s", search_params.get("query", ""))
+        self.logger.debug("Search parameters: %s", search_params)
+        
+        try:
+            # Repeat searches are served from the result cache without touching the network
+            cached = self._get_cached_search(search_params)
+            if cached is not None:
+                query, products = cached
+            else:
+                # Fail fast while the source is known to be down, before spending a Gemini call
+                self.circuit_breaker.check()
+                
+                # Use Gemini to optimize the search query for Amazon's search engine
+                optimized_params = await self._async_optimize_search_params(search_params)
+                self.logger.debug("Optimized search parameters: %s", optimized_params)
+                
+                # Convert optimized parameters to Amazon search query
+                query = self._build_search_query(optimized_params)
+                self.logger.info(f"Built Amazon query: {query}")
+                
+                # Perform the search
+                products = await self._async_scrape_search_results(query, optimized_params)
+                self._cache_search(search_params, query, products)
             
             # Apply Gemini-based relevance filtering
+            extracted = len(products)
             if not search_params.get("skip_relevance_filter", False):
                 products = self._apply_relevance_filter(products, search_params)
+            count_products("amazon", extracted, len(products))
             
             return MCPMessage(
                 sender=self.name,
@@ -946,6 +1040,46 @@ class RealAmazonScraperAgent(Agent):
                 conversation_id=message.conversation_id
             )
     
+    def _get_cached_search(self, search_params: Dict[str, Any]) -> Optional[Tuple[str, List[Dict[str, Any]]]]:
+        """
+        Look up previously scraped results for equivalent search parameters.
+        
+        Args:
+            search_params: Original search parameters
+            
+        Returns:
+            Tuple of (query, products) if cached, None otherwise
+        """
+        if not config.SEARCH_CACHE_ENABLED:
+            return None
+        
+        cached = self.result_cache.get(search_cache_key("amazon", search_params))
+        if cached is None:
+            return None
+        
+        self.logger.info(f"Serving cached Amazon results for query: {cached['query']}")
+        return cached["query"], cached["products"]
+    
+    def _cache_search(self, search_params: Dict[str, Any], query: str, products: List[Dict[str, Any]]) -> None:
+        """
+        Cache scraped results for the original search parameters.
+        
+        Args:
+            search_params: Original search parameters
+            query: The Amazon query that was searched
+            products: Scraped products before relevance filtering
+        """
+        # Empty results usually mean a blocked or failed request, so don't cache them
+        if not config.SEARCH_CACHE_ENABLED or not products:
+            return
+        
+        self.result_cache.set(
+            search_cache_key("amazon", search_params),
+            {"query": query, "products": products},
+            ttl=config.SEARCH_CACHE_TTL.get("amazon", config.SEARCH_CACHE_DEFAULT_TTL)
+        )
+    
+    @llm_call_site("optimize_search_params")
     def _optimize_search_params(self, search_params: Dict[str, Any]) -> Dict[str, Any]:
         """
         Use Gemini to optimize search parameters for Amazon's search engine.
@@ -957,59 +1091,12 @@ class RealAmazonScraperAgent(Agent):
             Optimized search parameters
         """
         try:
-            # Extract query components for optimization
-            query_components = []
-            if "product_type" in search_params and search_params["product_type"]:
-                query_components.append(search_params["product_type"])
-                
-            if "keywords" in search_params:
-                if isinstance(search_params["keywords"], list):
-                    query_components.extend(search_params["keywords"])
-                else:
-                    query_components.append(search_params["keywords"])
-                    
-            if "brands" in search_params and search_params["brands"]:
-                brands = search_params["brands"]
-                if isinstance(brands, list):
-                    query_components.extend(brands)
-                else:
-                    query_components.append(brands)
-                    
-            if "features" in search_params and search_params["features"]:
-                features = search_params["features"]
-                if isinstance(features, list):
-                    query_components.extend(features)
-                else:
-                    query_components.append(features)
+            prompt = self._optimization_prompt(search_params)
             
             # If no components to optimize, return original parameters
-            if not query_components:
+            if not prompt:
                 return search_params
             
-            # Create prompt for Gemini
-            original_query = " ".join(query_components)
-            prompt = f"""
-            Optimize this search query for Amazon's search engine:
-            
-            "{original_query}"
-            
-            For Amazon searches, please:
-            1. Focus on product-specific model numbers and identifiers if present
-            2. Include key brand names (Amazon's A9 algorithm prioritizes brand matches)
-            3. Remove generic words that may dilute results
-            4. Add Amazon-specific terms that might improve results (like "Amazon's Choice" if looking for quality products)
-            5. Optimize for Amazon's search algorithm which prioritizes exact matches and recent sales volume
-            
-            Return a JSON object with:
-            - optimized_keywords: List of 3-5 optimized search terms (most important first)
-            - amazon_category: Any Amazon department/category suggestion (Electronics, Books, etc.)
-            - must_include_terms: Terms that MUST be in results
-            - exclude_terms: Terms that should NOT be in results
-            - amazon_search_filters: Any Amazon-specific filters to apply (Prime eligible, etc.)
-            
-            Format as JSON only with no explanation.
-            """
-            
             # Call Gemini
             message = MCPMessage(
                 sender="AmazonScraperAgent",
@@ -1019,55 +1106,166 @@ class RealAmazonScraperAgent(Agent):
             )
             
             response = self.gemini_agent.process_message(message)
+            return self._apply_optimization(search_params, response)
             
-            # Parse response
-            optimization_data = {}
-            if isinstance(response.content, str):
-                # Try to extract JSON from the response
-                try:
-                    # Check if response is wrapped in code blocks
-                    json_match = re.search(r'```(?:json)?\s*([\s\S]*?)\s*```', response.content)
-                    if json_match:
-                        optimization_data = json.loads(json_match.group(1))
-                    else:
-                        # Try direct parsing
-                        optimization_data = json.loads(response.content)
-                except json.JSONDecodeError:
-                    self.logger.warning("Could not parse Gemini optimization response as JSON")
-            else:
-                # Response is already parsed
-                optimization_data = response.content
-            
-            # Create optimized parameters
-            optimized_params = search_params.copy()
-            
-            # Update keywords if optimized keywords were provided
-            if "optimized_keywords" in optimization_data and optimization_data["optimized_keywords"]:
-                optimized_params["keywords"] = optimization_data["optimized_keywords"]
-            
-            # Add Amazon category if provided
-            if "amazon_category" in optimization_data and optimization_data["amazon_category"]:
-                optimized_params["category"] = optimization_data["amazon_category"]
+        except Exception as e:
+            self.logger.error(f"Error optimizing search parameters: {str(e)}")
+            # Fall back to original parameters
+            return search_params
+    
+    @llm_call_site("optimize_search_params")
+    async def _async_optimize_search_params(self, search_params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Async counterpart of _optimize_search_params using Gemini's async API.
+        
+        Args:
+            search_params: Original search parameters
             
-            # Add must-include terms
-            if "must_include_terms" in optimization_data and optimization_data["must_include_terms"]:
-                optimized_params["must_include_terms"] = optimization_data["must_include_terms"]
+        Returns:
+            Optimized search parameters
+        """
+        try:
+            prompt = self._optimization_prompt(search_params)
             
-            # Add exclude terms
-            if "exclude_terms" in optimization_data and optimization_data["exclude_terms"]:
-                optimized_params["exclude_terms"] = optimization_data["exclude_terms"]
+            # If no components to optimize, return original parameters
+            if not prompt:
+                return search_params
             
-            # Add Amazon-specific filters
-            if "amazon_search_filters" in optimization_data and optimization_data["amazon_search_filters"]:
-                optimized_params["amazon_filters"] = optimization_data["amazon_search_filters"]
+            # Call Gemini
+            message = MCPMessage(
+                sender="AmazonScraperAgent",
+                receiver="GeminiAgent",
+                content=prompt,
+                message_type="REQUEST"
+            )
             
-            return optimized_params
+            response = await self.gemini_agent.async_process_message(message)
+            return self._apply_optimization(search_params, response)
             
         except Exception as e:
             self.logger.error(f"Error optimizing search parameters: {str(e)}")
             # Fall back to original parameters
             return search_params
     
+    def _optimization_prompt(self, search_params: Dict[str, Any]) -> Optional[str]:
+        """
+        Build the Gemini prompt used to optimize search parameters for Amazon.
+        
+        Args:
+            search_params: Original search parameters
+            
+        Returns:
+            The prompt string, or None if there is nothing to optimize
+        """
+        # Extract query components for optimization
+        query_components = []
+        if "product_type" in search_params and search_params["product_type"]:
+            query_components.append(search_params["product_type"])
+            
+        if "keywords" in search_params:
+            if isinstance(search_params["keywords"], list):
+                query_components.extend(search_params["keywords"])
+            else:
+                query_components.append(search_params["keywords"])
+                
+        if "brands" in search_params and search_params["brands"]:
+            brands = search_params["brands"]
+            if isinstance(brands, list):
+                query_components.extend(brands)
+            else:
+                query_components.append(brands)
+                
+        if "features" in search_params and search_params["features"]:
+            features = search_params["features"]
+            if isinstance(features, list):
+                query_components.extend(features)
+            else:
+                query_components.append(features)
+        
+        # Nothing to optimize without query components
+        if not query_components:
+            return None
+        
+        # Create prompt for Gemini
+        original_query = " ".join(query_components)
+        prompt = f"""
+        Optimize this search query for Amazon's search engine:
+        
+        "{original_query}"
+        
+        For Amazon searches, please:
+        1. Focus on product-specific model numbers and identifiers if present
+        2. Include key brand names (Amazon's A9 algorithm prioritizes brand matches)
+        3. Remove generic words that may dilute results
+        4. Add Amazon-specific terms that might improve results (like "Amazon's Choice" if looking for quality products)
+        5. Optimize for Amazon's search algorithm which prioritizes exact matches and recent sales volume
+        
+        Return a JSON object with:
+        - optimized_keywords: List of 3-5 optimized search terms (most important first)
+        - amazon_category: Any Amazon department/category suggestion (Electronics, Books, etc.)
+        - must_include_terms: Terms that MUST be in results
+        - exclude_terms: Terms that should NOT be in results
+        - amazon_search_filters: Any Amazon-specific filters to apply (Prime eligible, etc.)
+        
+        Format as JSON only with no explanation.
+        """
+        
+        return prompt
+    
+    def _apply_optimization(self, search_params: Dict[str, Any], response: MCPMessage) -> Dict[str, Any]:
+        """
+        Merge Gemini's optimization response into the search parameters.
+        
+        Args:
+            search_params: Original search parameters
+            response: Gemini's response to the optimization prompt
+            
+        Returns:
+            Optimized search parameters
+        """
+        # Parse response
+        optimization_data = {}
+        if isinstance(response.content, str):
+            # Try to extract JSON from the response
+            try:
+                # Check if response is wrapped in code blocks
+                json_match = re.search(r'```(?:json)?\s*([\s\S]*?)\s*```', response.content)
+                if json_match:
+                    optimization_data = json.loads(json_match.group(1))
+                else:
+                    # Try direct parsing
+                    optimization_data = json.loads(response.content)
+            except json.JSONDecodeError:
+                self.logger.warning("Could not parse Gemini optimization response as JSON")
+        else:
+            # Response is already parsed
+            optimization_data = response.content
+        
+        # Create optimized parameters
+        optimized_params = search_params.copy()
+        
+        # Update keywords if optimized keywords were provided
+        if "optimized_keywords" in optimization_data and optimization_data["optimized_keywords"]:
+            optimized_params["keywords"] = optimization_data["optimized_keywords"]
+        
+        # Add Amazon category if provided
+        if "amazon_category" in optimization_data and optimization_data["amazon_category"]:
+            optimized_params["category"] = optimization_data["amazon_category"]
+        
+        # Add must-include terms
+        if "must_include_terms" in optimization_data and optimization_data["must_include_terms"]:
+            optimized_params["must_include_terms"] = optimization_data["must_include_terms"]
+        
+        # Add exclude terms
+        if "exclude_terms" in optimization_data and optimization_data["exclude_terms"]:
+            optimized_params["exclude_terms"] = optimization_data["exclude_terms"]
+        
+        # Add Amazon-specific filters
+        if "amazon_search_filters" in optimization_data and optimization_data["amazon_search_filters"]:
+            optimized_params["amazon_filters"] = optimization_data["amazon_search_filters"]
+        
+        return optimized_params
+    
     def _build_search_query(self, search_params: Dict[str, Any]) -> str:
         """
         Build optimized search query string from parameters for Amazon's search engine.
@@ -1184,9 +1382,82 @@ class RealAmazonScraperAgent(Agent):
         if max_results is None:
             max_results = config.MAX_PRODUCTS_PER_SOURCE
         
-        # Get extra results for better filtering
-        scrape_count = max_results * 2
+        params = self._build_request_params(query, search_params)
+        
+        # Use a random user agent for each request
+        current_headers = self.headers.copy()
+        current_headers["User-Agent"] = random.choice(config.USER_AGENTS)
+
+        # Make the request over the shared pooled transport (handles retries and backoff)
+        self.logger.info(f"Making Amazon search request with params: {params}")
+        try:
+            response = self.transport.get(self.base_url, params=params, headers=current_headers)
+        except RateLimitExceeded:
+            # Shed locally under load: the source itself did not fail, so the circuit is left alone
+            return []
+        if response is None:
+            self.logger.error("Max retries exceeded")
+            self.circuit_breaker.record_failure()
+            return []
+        self.circuit_breaker.record_success()
+
+        products = self._parse_search_results(response.text, search_params, max_results)
+        
+        return products
+    
+    async def _async_scrape_search_results(self, query: str, search_params: Dict[str, Any], max_results: int = None) -> List[Dict[str, Any]]:
+        """
+        Async counterpart of _scrape_search_results using the async HTTP transport.
         
+        Page parsing runs in the default executor so it does not block the event loop.
+        
+        Args:
+            query: The search query string
+            search_params: Optimized search parameters
+            max_results: Maximum number of results to return (default: from config)
+            
+        Returns:
+            A list of product dictionaries
+        """
+        # Use configured max_results if not specified
+        if max_results is None:
+            max_results = config.MAX_PRODUCTS_PER_SOURCE
+        
+        params = self._build_request_params(query, search_params)
+        
+        # Use a random user agent for each request
+        current_headers = self.headers.copy()
+        current_headers["User-Agent"] = random.choice(config.USER_AGENTS)
+
+        # Make the request over the shared async transport (handles retries and backoff)
+        self.logger.info(f"Making Amazon search request with params: {params}")
+        try:
+            html = await self.async_transport.get(self.base_url, params=params, headers=current_headers)
+        except RateLimitExceeded:
+            # Shed locally under load: the source itself did not fail, so the circuit is left alone
+            return []
+        if html is None:
+            self.logger.error("Max retries exceeded")
+            self.circuit_breaker.record_failure()
+            return []
+        self.circuit_breaker.record_success()
+
+        loop = asyncio.get_running_loop()
+        products = await loop.run_in_executor(None, self._parse_search_results, html, search_params, max_results)
+        
+        return products
+    
+    def _build_request_params(self, query: str, search_params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build the Amazon search request parameters.
+        
+        Args:
+            query: The search query string
+            search_params: Optimized search parameters
+            
+        Returns:
+            Dictionary of query string parameters
+        """
         # Set up Amazon-specific request parameters
         params = {
             "k": query,           # Main search query
@@ -1285,35 +1556,25 @@ class RealAmazonScraperAgent(Agent):
                     # We'll handle this in post-processing
                     pass
         
-        # Use a random user agent for each request
-        current_headers = self.headers.copy()
-        current_headers["User-Agent"] = random.choice(config.USER_AGENTS)
-
-        # Make the request with retry logic
-        for attempt in range(3):
-            try:
-                self.logger.info(f"Making Amazon search request with params: {params}")
-                response = requests.get(
-                    self.base_url,
-                    params=params,
-                    headers=current_headers,
-                    timeout=config.SCRAPING_TIMEOUT
-                )
-                
-                if response.status_code == 200:
-                    break
-                else:
-                    self.logger.warning(f"Amazon search request failed with status {response.status_code}, retrying")
-                    time.sleep(2 ** attempt)
-            except Exception as e:
-                self.logger.warning(f"Request error: {str(e)}, retrying")
-                time.sleep(2 ** attempt)
-        else:
-            self.logger.error("Max retries exceeded")
-            return []
-
-        # Parse the HTML response
-        soup = BeautifulSoup(response.text, 'html.parser')
+        return params
+    
+    def _parse_search_results(self, html: str, search_params: Dict[str, Any], max_results: int) -> List[Dict[str, Any]]:
+        """
+        Parse a Amazon search results page into product dictionaries.
+        
+        Args:
+            html: The search results page HTML
+            search_params: Optimized search parameters
+            max_results: Maximum number of results to return
+            
+        Returns:
+            A list of product dictionaries
+        """
+        # Get extra results for better filtering
+        scrape_count = max_results * 2
+        
+        # Parse only the search result elements of the page
+        soup = parse_search_page(html, "amazon")
         
         # Get product listings
         product_divs = soup.select('div[data-component-type="s-search-result"]')
@@ -1324,9 +1585,10 @@ class RealAmazonScraperAgent(Agent):
             self.logger.info("Using Gemini for all product extraction")
             extracted_products = []
             
-            for div in product_divs[:scrape_count]:
-                product = self.gemini_agent.extract_product_details_from_html(str(div))
-                if product and isinstance(product, dict):
+            # One batched Gemini call for all fragments instead of one call per product
+            fragments = [str(div) for div in product_divs[:scrape_count]]
+            for product in self.gemini_agent.extract_products_from_html_batch(fragments):
+                if product:
                     product["source"] = "Amazon"
                     extracted_products.append(product)
                     
@@ -1349,17 +1611,11 @@ class RealAmazonScraperAgent(Agent):
             
             seen_ids.add(asin)
             product["source"] = "Amazon"
-            self.logger.info(f"Extracted product: {product['title']} at {product['price']} USD")
+            self.logger.info("Extracted product: %s at %s USD", product['title'], product['price'])
             products.append(product)
             
             if len(products) >= scrape_count:
                 break
-
-        # Add a short delay to avoid rate limiting
-        time.sleep(random.uniform(
-            config.SCRAPING_DELAY_MIN,
-            config.SCRAPING_DELAY_MAX
-        ))
         
         self.logger.info(f"Extracted {len(products)} products from Amazon")
         
@@ -1387,32 +1643,8 @@ class RealAmazonScraperAgent(Agent):
         try:
             self.logger.info(f"Applying relevance filtering to {len(products)} products")
             
-            # Extract filtering criteria
-            must_include_terms = search_params.get("must_include_terms", [])
-            exclude_terms = search_params.get("exclude_terms", [])
-            
-            # Prepare keywords for matching
-            keywords = []
-            if "keywords" in search_params:
-                if isinstance(search_params["keywords"], list):
-                    keywords.extend([k.lower() for k in search_params["keywords"] if k])
-                elif search_params["keywords"]:
-                    keywords.append(search_params["keywords"].lower())
-            
-            # Prepare brands for matching
-            brands = []
-            if "brands" in search_params and search_params["brands"]:
-                if isinstance(search_params["brands"], list):
-                    brands.extend([b.lower() for b in search_params["brands"] if b])
-                else:
-                    brands.append(search_params["brands"].lower())
-            
-            # Convert must_include and exclude_terms to lists if they're not already
-            if must_include_terms and not isinstance(must_include_terms, list):
-                must_include_terms = [must_include_terms]
-            
-            if exclude_terms and not isinstance(exclude_terms, list):
-                exclude_terms = [exclude_terms]
+            # Compile the query's terms once and scan each product's text in one pass
+            matcher = RelevanceMatcher.from_search_params(search_params)
             
             # Apply basic filtering
             filtered_products = []
@@ -1420,30 +1652,20 @@ class RealAmazonScraperAgent(Agent):
                 # Get product text for matching (combine title and description)
                 title = product.get("title", "").lower()
                 description = product.get("description", "").lower()
-                combined_text = f"{title} {description}"
-                
-                # Skip products with exclude terms
-                if exclude_terms and any(term.lower() in combined_text for term in exclude_terms if term):
-                    continue
-                
-                # Keep products with must_include terms
-                if must_include_terms:
-                    if not all(term.lower() in combined_text for term in must_include_terms if term):
-                        continue
                 
-                # Ensure brand match if brands were specified
-                if brands and not any(brand in combined_text for brand in brands):
+                # Skip products failing the exclude, must-include or brand criteria
+                match = matcher.match(title, description)
+                if match is None:
                     continue
+                title_matches, description_matches = match
                 
                 # Calculate a relevance score for Amazon-specific ranking
                 relevance_score = 0
                 
                 # Keywords in title are very important
-                keyword_matches = sum(1 for kw in keywords if kw in title)
-                relevance_score += keyword_matches * 10
+                relevance_score += title_matches * 10
                 
                 # Keywords in description are less important
-                description_matches = sum(1 for kw in keywords if kw in description)
                 relevance_score += description_matches * 2
                 
                 # Amazon-specific bonuses:
@@ -1725,14 +1947,14 @@ class RealAmazonScraperAgent(Agent):
             
             # Use Gemini fallback if essential fields are missing or incomplete
             if not title or title == f"Amazon Product {asin}" or not url or price == 0.0:
-                self.logger.warning(f"Incomplete data for ASIN {asin}, falling back to Gemini extraction.")
+                self.logger.warning("Incomplete data for ASIN %s, falling back to Gemini extraction.", asin)
                 gemini_fallback = self._extract_with_gemini(str(product_div))
                 if gemini_fallback:
                     self.logger.info("Gemini used for product extraction")
-                    self.logger.info(f"Extracted product: {gemini_fallback.get('title', '')} at {gemini_fallback.get('price', 0)} USD")
+                    self.logger.info("Extracted product: %s at %s USD", gemini_fallback.get('title', ''), gemini_fallback.get('price', 0))
                     return gemini_fallback
             
-            self.logger.info(f"Extracted product: {product['title']} at {product['price']} USD")
+            self.logger.info("Extracted product: %s at %s USD", product['title'], product['price'])
             return product
                 
         except Exception as e:
@@ -1777,6 +1999,7 @@ class RealAmazonScraperAgent(Agent):
             self.logger.warning(f"Error parsing price '{price_text}': {str(e)}")
             return 0.0
 
+    @llm_call_site("extraction_fallback")
     def _extract_with_gemini(self, html_block: str) -> Optional[Dict[str, Any]]:
         """
         Use Gemini to extract product details from HTML.
@@ -1793,7 +2016,7 @@ class RealAmazonScraperAgent(Agent):
             Extract detailed product information from this Amazon listing HTML:
             
             ```html
-            {html_block}
+            {minify_html_fragment(html_block)}
             ```
             
             Extract:
@@ -1899,6 +2122,7 @@ class RealAmazonScraperAgent(Agent):
             self.logger.error(f"Gemini extraction failed: {str(e)}")
             return None
             
+    @llm_call_site("relevance_check")
     def _gemini_relevance_check(self, product: Dict[str, Any], search_params: Dict[str, Any]) -> Dict[str, Any]:
         """
         Use Gemini to evaluate if a product is relevant to the search query.
@@ -1997,6 +2221,7 @@ class RealAmazonScraperAgent(Agent):
             self.logger.error(f"Error in Gemini relevance check: {str(e)}")
             return {"relevance_score": 50, "reasoning": f"Error: {str(e)}"}
     
+    @llm_call_site("search_query_prompt")
     def _gemini_search_query_prompt(self, search_params: Dict[str, Any]) -> str:
         """
         Generate a prompt for Gemini to create an optimized search query.
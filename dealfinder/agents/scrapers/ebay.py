@@ -800,19 +800,24 @@ This module implements the RealEbayScraperAgent class that uses BeautifulSoup,
 requests, and Gemini AI to extract and optimize product data from eBay.
 """
 
+import asyncio
 import random
-import time
 import logging
 import json
 import re
 from typing import Dict, Any, List, Optional, Tuple
 
-import requests
-from bs4 import BeautifulSoup
 
 from dealfinder.agents.base import Agent, MCPMessage
 from dealfinder import config
 from dealfinder.utils.logging import get_logger
+from dealfinder.utils.http import get_transport, get_async_transport
+from dealfinder.utils.cache import get_search_cache, search_cache_key
+from dealfinder.utils.circuit_breaker import get_circuit_breaker
+from dealfinder.utils.rate_limit import RateLimitExceeded
+from dealfinder.utils.relevance import RelevanceMatcher
+from dealfinder.utils.metrics import llm_call_site, count_products
+from dealfinder.utils.markup import parse_search_page
 from dealfinder.agents.gemini_agent import GeminiAgent
 
 logger = get_logger("Scrapers.Ebay")
@@ -825,6 +830,10 @@ class RealEbayScraperAgent(Agent):
         super().__init__("EbayScraperAgent")
         self.base_url = config.EBAY_BASE_URL
         self.gemini_agent = GeminiAgent()
+        self.transport = get_transport()
+        self.async_transport = get_async_transport()
+        self.result_cache = get_search_cache()
+        self.circuit_breaker = get_circuit_breaker("ebay")
         
         # Configure headers with default values
         self.headers = {
@@ -855,23 +864,107 @@ class RealEbayScraperAgent(Agent):
             )
         
         search_params = message.content
-        self.logger.info(f"Searching eBay for: {search_params}")
+        self.logger.info("Searching eBay for: %s", search_params.get("query", ""))
+        self.logger.debug("Search parameters: %s", search_params)
         
         try:
-            # Use Gemini to optimize the search query for eBay's search engine
-            optimized_params = self._optimize_search_params(search_params)
-            self.logger.info(f"Optimized search parameters: {optimized_params}")
+            # Repeat searches are served from the result cache without touching the network
+            cached = self._get_cached_search(search_params)
+            if cached is not None:
+                query, products = cached
+            else:
+                # Fail fast while the source is known to be down, before spending a Gemini call
+                self.circuit_breaker.check()
+                
+                # Use Gemini to optimize the search query for eBay's search engine
+                optimized_params = self._optimize_search_params(search_params)
+                self.logger.debug("Optimized search parameters: %s", optimized_params)
+                
+                # Convert optimized parameters to eBay search query
+                query = self._build_search_query(optimized_params)
+                self.logger.info(f"Built eBay query: {query}")
+                
+                # Perform the search
+                products = self._scrape_search_results(query, optimized_params)
+                self._cache_search(search_params, query, products)
             
-            # Convert optimized parameters to eBay search query
-            query = self._build_search_query(optimized_params)
-            self.logger.info(f"Built eBay query: {query}")
+            # Apply Gemini-based relevance filtering
+            extracted = len(products)
+            if not search_params.get("skip_relevance_filter", False):
+                products = self._apply_relevance_filter(products, search_params)
+            count_products("ebay", extracted, len(products))
+            
+            return MCPMessage(
+                sender=self.name,
+                receiver=message.sender,
+                content={
+                    "source": "eBay",
+                    "query": query,
+                    "products": products
+                },
+                message_type="SEARCH_RESPONSE",
+                conversation_id=message.conversation_id
+            )
+        
+        except Exception as e:
+            self.logger.error(f"Error scraping eBay: {str(e)}")
+            return MCPMessage(
+                sender=self.name,
+                receiver=message.sender,
+                content={"error": f"eBay scraping error: {str(e)}"},
+                message_type="ERROR",
+                conversation_id=message.conversation_id
+            )
+    
+    async def async_process_message(self, message: MCPMessage) -> MCPMessage:
+        """
+        Process search request for eBay without blocking the event loop.
+        
+        Args:
+            message: The incoming MCPMessage to process
             
-            # Perform the search
-            products = self._scrape_search_results(query, optimized_params)
+        Returns:
+            A new MCPMessage containing the search results
+        """
+        if message.message_type != "SEARCH_REQUEST":
+            return MCPMessage(
+                sender=self.name,
+                receiver=message.sender,
+                content={"error": "Only SEARCH_REQUEST message type is supported"},
+                message_type="ERROR",
+                conversation_id=message.conversation_id
+            )
+        
+        search_params = message.content
+        self.logger.info("Searching eBay for: %s", search_params.get("query", ""))
+        self.logger.debug("Search parameters: %s", search_params)
+        
+        try:
+            # Repeat searches are served from the result cache without touching the network
+            cached = self._get_cached_search(search_params)
+            if cached is not None:
+                query, products = cached
+            else:
+                # Fail fast while the source is known to be down, before spending a Gemini call
+                self.circuit_breaker.check()
+                
+                # Use Gemini to optimize the search query for eBay's search engine
+                optimized_params = await self._async_optimize_search_params(search_params)
+                self.logger.debug("Optimized search parameters: %s", optimized_params)
+                
+                # Convert optimized parameters to eBay search query
+                query = self._build_search_query(optimized_params)
+                self.logger.info(f"Built eBay query: {query}")
+                
+                # Perform the search
+                products = await self._async_scrape_search_results(query, optimized_params)
+                self._cache_search(search_params, query, products)
             
             # Apply Gemini-based relevance filtering
+            extracted = len(products)
             if not search_params.get("skip_relevance_filter", False):
                 products = self._apply_relevance_filter(products, search_params)
+            count_products("ebay", extracted, len(products))
             
             return MCPMessage(
                 sender=self.name,
@@ -895,6 +988,46 @@ class RealEbayScraperAgent(Agent):
                 conversation_id=message.conversation_id
             )
     
+    def _get_cached_search(self, search_params: Dict[str, Any]) -> Optional[Tuple[str, List[Dict[str, Any]]]]:
+        """
+        Look up previously scraped results for equivalent search parameters.
+        
+        Args:
+            search_params: Original search parameters
+            
+        Returns:
+            Tuple of (query, products) if cached, None otherwise
+        """
+        if not config.SEARCH_CACHE_ENABLED:
+            return None
+        
+        cached = self.result_cache.get(search_cache_key("ebay", search_params))
+        if cached is None:
+            return None
+        
+        self.logger.info(f"Serving cached eBay results for query: {cached['query']}")
+        return cached["query"], cached["products"]
+    
+    def _cache_search(self, search_params: Dict[str, Any], query: str, products: List[Dict[str, Any]]) -> None:
+        """
+        Cache scraped results for the original search parameters.
+        
+        Args:
+            search_params: Original search parameters
+            query: The eBay query that was searched
+            products: Scraped products before relevance filtering
+        """
+        # Empty results usually mean a blocked or failed request, so don't cache them
+        if not config.SEARCH_CACHE_ENABLED or not products:
+            return
+        
+        self.result_cache.set(
+            search_cache_key("ebay", search_params),
+            {"query": query, "products": products},
+            ttl=config.SEARCH_CACHE_TTL.get("ebay", config.SEARCH_CACHE_DEFAULT_TTL)
+        )
+    
+    @llm_call_site("optimize_search_params")
     def _optimize_search_params(self, search_params: Dict[str, Any]) -> Dict[str, Any]:
         """
         Use Gemini to optimize search parameters for eBay's search engine.
@@ -906,58 +1039,12 @@ class RealEbayScraperAgent(Agent):
             Optimized search parameters
         """
         try:
-            # Extract query components for optimization
-            query_components = []
-            if "product_type" in search_params and search_params["product_type"]:
-                query_components.append(search_params["product_type"])
-                
-            if "keywords" in search_params:
-                if isinstance(search_params["keywords"], list):
-                    query_components.extend(search_params["keywords"])
-                else:
-                    query_components.append(search_params["keywords"])
-                    
-            if "brands" in search_params and search_params["brands"]:
-                brands = search_params["brands"]
-                if isinstance(brands, list):
-                    query_components.extend(brands)
-                else:
-                    query_components.append(brands)
-                    
-            if "features" in search_params and search_params["features"]:
-                features = search_params["features"]
-                if isinstance(features, list):
-                    query_components.extend(features)
-                else:
-                    query_components.append(features)
+            prompt = self._optimization_prompt(search_params)
             
             # If no components to optimize, return original parameters
-            if not query_components:
+            if not prompt:
                 return search_params
             
-            # Create prompt for Gemini
-            original_query = " ".join(query_components)
-            prompt = f"""
-            Optimize this search query for eBay's search engine:
-            
-            "{original_query}"
-            
-            For eBay searches, please:
-            1. Focus on exact model numbers and specific part identifiers if present
-            2. Include key brand names
-            3. Remove generic words that may dilute results
-            4. Add eBay-specific terms that might improve results
-            5. Optimize for finding the most relevant listings
-            
-            Return a JSON object with:
-            - optimized_keywords: List of 3-5 optimized search terms (most important first)
-            - category_hints: Any eBay category suggestions
-            - must_include_terms: Terms that MUST be in results
-            - exclude_terms: Terms that should NOT be in results
-            
-            Format as JSON only with no explanation.
-            """
-            
             # Call Gemini
             message = MCPMessage(
                 sender="EbayScraperAgent",
@@ -967,51 +1054,161 @@ class RealEbayScraperAgent(Agent):
             )
             
             response = self.gemini_agent.process_message(message)
+            return self._apply_optimization(search_params, response)
             
-            # Parse response
-            optimization_data = {}
-            if isinstance(response.content, str):
-                # Try to extract JSON from the response
-                try:
-                    # Check if response is wrapped in code blocks
-                    json_match = re.search(r'```(?:json)?\s*([\s\S]*?)\s*```', response.content)
-                    if json_match:
-                        optimization_data = json.loads(json_match.group(1))
-                    else:
-                        # Try direct parsing
-                        optimization_data = json.loads(response.content)
-                except json.JSONDecodeError:
-                    self.logger.warning("Could not parse Gemini optimization response as JSON")
-            else:
-                # Response is already parsed
-                optimization_data = response.content
-            
-            # Create optimized parameters
-            optimized_params = search_params.copy()
-            
-            # Update keywords if optimized keywords were provided
-            if "optimized_keywords" in optimization_data and optimization_data["optimized_keywords"]:
-                optimized_params["keywords"] = optimization_data["optimized_keywords"]
+        except Exception as e:
+            self.logger.error(f"Error optimizing search parameters: {str(e)}")
+            # Fall back to original parameters
+            return search_params
+    
+    @llm_call_site("optimize_search_params")
+    async def _async_optimize_search_params(self, search_params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Async counterpart of _optimize_search_params using Gemini's async API.
+        
+        Args:
+            search_params: Original search parameters
             
-            # Add category hints if provided
-            if "category_hints" in optimization_data and optimization_data["category_hints"]:
-                optimized_params["category_hints"] = optimization_data["category_hints"]
+        Returns:
+            Optimized search parameters
+        """
+        try:
+            prompt = self._optimization_prompt(search_params)
             
-            # Add must-include terms
-            if "must_include_terms" in optimization_data and optimization_data["must_include_terms"]:
-                optimized_params["must_include_terms"] = optimization_data["must_include_terms"]
+            # If no components to optimize, return original parameters
+            if not prompt:
+                return search_params
             
-            # Add exclude terms
-            if "exclude_terms" in optimization_data and optimization_data["exclude_terms"]:
-                optimized_params["exclude_terms"] = optimization_data["exclude_terms"]
+            # Call Gemini
+            message = MCPMessage(
+                sender="EbayScraperAgent",
+                receiver="GeminiAgent",
+                content=prompt,
+                message_type="REQUEST"
+            )
             
-            return optimized_params
+            response = await self.gemini_agent.async_process_message(message)
+            return self._apply_optimization(search_params, response)
             
         except Exception as e:
             self.logger.error(f"Error optimizing search parameters: {str(e)}")
             # Fall back to original parameters
             return search_params
     
+    def _optimization_prompt(self, search_params: Dict[str, Any]) -> Optional[str]:
+        """
+        Build the Gemini prompt used to optimize search parameters for eBay.
+        
+        Args:
+            search_params: Original search parameters
+            
+        Returns:
+            The prompt string, or None if there is nothing to optimize
+        """
+        # Extract query components for optimization
+        query_components = []
+        if "product_type" in search_params and search_params["product_type"]:
+            query_components.append(search_params["product_type"])
+            
+        if "keywords" in search_params:
+            if isinstance(search_params["keywords"], list):
+                query_components.extend(search_params["keywords"])
+            else:
+                query_components.append(search_params["keywords"])
+                
+        if "brands" in search_params and search_params["brands"]:
+            brands = search_params["brands"]
+            if isinstance(brands, list):
+                query_components.extend(brands)
+            else:
+                query_components.append(brands)
+                
+        if "features" in search_params and search_params["features"]:
+            features = search_params["features"]
+            if isinstance(features, list):
+                query_components.extend(features)
+            else:
+                query_components.append(features)
+        
+        # Nothing to optimize without query components
+        if not query_components:
+            return None
+        
+        # Create prompt for Gemini
+        original_query = " ".join(query_components)
+        prompt = f"""
+        Optimize this search query for eBay's search engine:
+        
+        "{original_query}"
+        
+        For eBay searches, please:
+        1. Focus on exact model numbers and specific part identifiers if present
+        2. Include key brand names
+        3. Remove generic words that may dilute results
+        4. Add eBay-specific terms that might improve results
+        5. Optimize for finding the most relevant listings
+        
+        Return a JSON object with:
+        - optimized_keywords: List of 3-5 optimized search terms (most important first)
+        - category_hints: Any eBay category suggestions
+        - must_include_terms: Terms that MUST be in results
+        - exclude_terms: Terms that should NOT be in results
+        
+        Format as JSON only with no explanation.
+        """
+        
+        return prompt
+    
+    def _apply_optimization(self, search_params: Dict[str, Any], response: MCPMessage) -> Dict[str, Any]:
+        """
+        Merge Gemini's optimization response into the search parameters.
+        
+        Args:
+            search_params: Original search parameters
+            response: Gemini's response to the optimization prompt
+            
+        Returns:
+            Optimized search parameters
+        """
+        # Parse response
+        optimization_data = {}
+        if isinstance(response.content, str):
+            # Try to extract JSON from the response
+            try:
+                # Check if response is wrapped in code blocks
+                json_match = re.search(r'```(?:json)?\s*([\s\S]*?)\s*```', response.content)
+                if json_match:
+                    optimization_data = json.loads(json_match.group(1))
+                else:
+                    # Try direct parsing
+                    optimization_data = json.loads(response.content)
+            except json.JSONDecodeError:
+                self.logger.warning("Could not parse Gemini optimization response as JSON")
+        else:
+            # Response is already parsed
+            optimization_data = response.content
+        
+        # Create optimized parameters
+        optimized_params = search_params.copy()
+        
+        # Update keywords if optimized keywords were provided
+        if "optimized_keywords" in optimization_data and optimization_data["optimized_keywords"]:
+            optimized_params["keywords"] = optimization_data["optimized_keywords"]
+        
+        # Add category hints if provided
+        if "category_hints" in optimization_data and optimization_data["category_hints"]:
+            optimized_params["category_hints"] = optimization_data["category_hints"]
+        
+        # Add must-include terms
+        if "must_include_terms" in optimization_data and optimization_data["must_include_terms"]:
+            optimized_params["must_include_terms"] = optimization_data["must_include_terms"]
+        
+        # Add exclude terms
+        if "exclude_terms" in optimization_data and optimization_data["exclude_terms"]:
+            optimized_params["exclude_terms"] = optimization_data["exclude_terms"]
+        
+        return optimized_params
+    
     def _build_search_query(self, search_params: Dict[str, Any]) -> str:
         """
         Build optimized search query string from parameters for eBay's search engine.
@@ -1117,9 +1314,82 @@ class RealEbayScraperAgent(Agent):
         if max_results is None:
             max_results = config.MAX_PRODUCTS_PER_SOURCE
         
-        # Get extra results for better filtering
-        scrape_count = max_results * 2
+        params = self._build_request_params(query, search_params)
         
+        # Use a random user agent for each request to avoid blocking
+        current_headers = self.headers.copy()
+        current_headers["User-Agent"] = random.choice(config.USER_AGENTS)
+
+        # Make the request over the shared pooled transport (handles retries and backoff)
+        self.logger.info(f"Making eBay search request with params: {params}")
+        try:
+            response = self.transport.get(self.base_url, params=params, headers=current_headers)
+        except RateLimitExceeded:
+            # Shed locally under load: the source itself did not fail, so the circuit is left alone
+            return []
+        if response is None:
+            self.logger.error("Max retries exceeded")
+            self.circuit_breaker.record_failure()
+            return []
+        self.circuit_breaker.record_success()
+
+        products = self._parse_search_results(response.text, search_params, max_results)
+        
+        return products
+    
+    async def _async_scrape_search_results(self, query: str, search_params: Dict[str, Any], max_results: int = None) -> List[Dict[str, Any]]:
+        """
+        Async counterpart of _scrape_search_results using the async HTTP transport.
+        
+        Page parsing runs in the default executor so it does not block the event loop.
+        
+        Args:
+            query: The search query string
+            search_params: Optimized search parameters
+            max_results: Maximum number of results to return (default: from config)
+            
+        Returns:
+            A list of product dictionaries
+        """
+        # Use configured max_results if not specified
+        if max_results is None:
+            max_results = config.MAX_PRODUCTS_PER_SOURCE
+        
+        params = self._build_request_params(query, search_params)
+        
+        # Use a random user agent for each request to avoid blocking
+        current_headers = self.headers.copy()
+        current_headers["User-Agent"] = random.choice(config.USER_AGENTS)
+
+        # Make the request over the shared async transport (handles retries and backoff)
+        self.logger.info(f"Making eBay search request with params: {params}")
+        try:
+            html = await self.async_transport.get(self.base_url, params=params, headers=current_headers)
+        except RateLimitExceeded:
+            # Shed locally under load: the source itself did not fail, so the circuit is left alone
+            return []
+        if html is None:
+            self.logger.error("Max retries exceeded")
+            self.circuit_breaker.record_failure()
+            return []
+        self.circuit_breaker.record_success()
+
+        loop = asyncio.get_running_loop()
+        products = await loop.run_in_executor(None, self._parse_search_results, html, search_params, max_results)
+        
+        return products
+    
+    def _build_request_params(self, query: str, search_params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build the eBay search request parameters.
+        
+        Args:
+            query: The search query string
+            search_params: Optimized search parameters
+            
+        Returns:
+            Dictionary of query string parameters
+        """
         # Set up eBay-specific request parameters
         params = {
             "_nkw": query,
@@ -1175,35 +1445,25 @@ class RealEbayScraperAgent(Agent):
             elif condition == "refurbished":
                 params["LH_ItemCondition"] = "2500"  # Manufacturer refurbished
         
-        # Use a random user agent for each request to avoid blocking
-        current_headers = self.headers.copy()
-        current_headers["User-Agent"] = random.choice(config.USER_AGENTS)
-
-        # Make the request with retry logic
-        for attempt in range(3):
-            try:
-                self.logger.info(f"Making eBay search request with params: {params}")
-                response = requests.get(
-                    self.base_url,
-                    params=params,
-                    headers=current_headers,
-                    timeout=config.SCRAPING_TIMEOUT
-                )
-                
-                if response.status_code == 200:
-                    break
-                else:
-                    self.logger.warning(f"eBay search request failed with status {response.status_code}, retrying")
-                    time.sleep(2 ** attempt)
-            except Exception as e:
-                self.logger.warning(f"Request error: {str(e)}, retrying")
-                time.sleep(2 ** attempt)
-        else:
-            self.logger.error("Max retries exceeded")
-            return []
-
-        # Parse the HTML response
-        soup = BeautifulSoup(response.text, 'html.parser')
+        return params
+    
+    def _parse_search_results(self, html: str, search_params: Dict[str, Any], max_results: int) -> List[Dict[str, Any]]:
+        """
+        Parse an eBay search results page into product dictionaries.
+        
+        Args:
+            html: The search results page HTML
+            search_params: Optimized search parameters
+            max_results: Maximum number of results to return
+            
+        Returns:
+            A list of product dictionaries
+        """
+        # Get extra results for better filtering
+        scrape_count = max_results * 2
+        
+        # Parse only the search result elements of the page
+        soup = parse_search_page(html, "ebay")
         
         # Get product listings
         products = []
@@ -1217,9 +1477,10 @@ class RealEbayScraperAgent(Agent):
             self.logger.info("Using Gemini for all product extraction")
             extracted_products = []
             
-            for div in product_divs[:scrape_count]:
-                product = self.gemini_agent.extract_product_details_from_html(str(div))
-                if product and isinstance(product, dict):
+            # One batched Gemini call for all fragments instead of one call per product
+            fragments = [str(div) for div in product_divs[:scrape_count]]
+            for product in self.gemini_agent.extract_products_from_html_batch(fragments):
+                if product:
                     product["source"] = "eBay"
                     extracted_products.append(product)
                     
@@ -1238,17 +1499,11 @@ class RealEbayScraperAgent(Agent):
                 
             seen_ids.add(item_id)
             product["source"] = "eBay"
-            self.logger.info(f"Extracted product: {product['title']} at {product['price']} USD")
+            self.logger.info("Extracted product: %s at %s USD", product['title'], product['price'])
             products.append(product)
             
             if len(products) >= scrape_count:
                 break
-
-        # Add a short delay to avoid rate limiting
-        time.sleep(random.uniform(
-            config.SCRAPING_DELAY_MIN, 
-            config.SCRAPING_DELAY_MAX
-        ))
         
         self.logger.info(f"Extracted {len(products)} products from eBay")
         
@@ -1276,32 +1531,8 @@ class RealEbayScraperAgent(Agent):
         try:
             self.logger.info(f"Applying relevance filtering to {len(products)} products")
             
-            # Extract filtering criteria
-            must_include_terms = search_params.get("must_include_terms", [])
-            exclude_terms = search_params.get("exclude_terms", [])
-            
-            # Prepare keywords for matching
-            keywords = []
-            if "keywords" in search_params:
-                if isinstance(search_params["keywords"], list):
-                    keywords.extend([k.lower() for k in search_params["keywords"] if k])
-                elif search_params["keywords"]:
-                    keywords.append(search_params["keywords"].lower())
-            
-            # Prepare brands for matching
-            brands = []
-            if "brands" in search_params and search_params["brands"]:
-                if isinstance(search_params["brands"], list):
-                    brands.extend([b.lower() for b in search_params["brands"] if b])
-                else:
-                    brands.append(search_params["brands"].lower())
-            
-            # Convert must_include and exclude_terms to lists if they're not already
-            if must_include_terms and not isinstance(must_include_terms, list):
-                must_include_terms = [must_include_terms]
-            
-            if exclude_terms and not isinstance(exclude_terms, list):
-                exclude_terms = [exclude_terms]
+            # Compile the query's terms once and scan each product's text in one pass
+            matcher = RelevanceMatcher.from_search_params(search_params)
             
             # Apply basic filtering
             filtered_products = []
@@ -1309,30 +1540,20 @@ class RealEbayScraperAgent(Agent):
                 # Get product text for matching (combine title and description)
                 title = product.get("title", "").lower()
                 description = product.get("description", "").lower()
-                combined_text = f"{title} {description}"
-                
-                # Skip products with exclude terms
-                if exclude_terms and any(term.lower() in combined_text for term in exclude_terms if term):
-                    continue
-                
-                # Keep products with must_include terms
-                if must_include_terms:
-                    if not all(term.lower() in combined_text for term in must_include_terms if term):
-                        continue
                 
-                # Ensure brand match if brands were specified
-                if brands and not any(brand in combined_text for brand in brands):
+                # Skip products failing the exclude, must-include or brand criteria
+                match = matcher.match(title, description)
+                if match is None:
                     continue
+                title_matches, description_matches = match
                 
                 # Calculate a relevance score
                 relevance_score = 0
                 
                 # Keywords in title are very important
-                keyword_matches = sum(1 for kw in keywords if kw in title)
-                relevance_score += keyword_matches * 10
+                relevance_score += title_matches * 10
                 
                 # Keywords in description are less important
-                description_matches = sum(1 for kw in keywords if kw in description)
                 relevance_score += description_matches * 2
                 
                 # Prefer Buy It Now listings
@@ -1518,10 +1739,10 @@ class RealEbayScraperAgent(Agent):
                 gemini_fallback = self._extract_with_gemini(str(product_div))
                 if gemini_fallback:
                     self.logger.info("Gemini used for product extraction")
-                    self.logger.info(f"Extracted product: {gemini_fallback.get('title', '')} at {gemini_fallback.get('price', 0)} USD")
+                    self.logger.info("Extracted product: %s at %s USD", gemini_fallback.get('title', ''), gemini_fallback.get('price', 0))
                     return gemini_fallback
                     
-            self.logger.info(f"Extracted product: {product['title']} at {product['price']} USD")
+            self.logger.info("Extracted product: %s at %s USD", product['title'], product['price'])
             return product
             
         except Exception as e:
@@ -1565,6 +1786,7 @@ class RealEbayScraperAgent(Agent):
             self.logger.warning(f"Error parsing price '{price_text}': {str(e)}")
             return 0.0
 
+    @llm_call_site("extraction_fallback")
     def _extract_with_gemini(self, html_block: str) -> Optional[Dict[str, Any]]:
         """
         Use Gemini to extract product details from HTML.
@@ -1642,6 +1864,7 @@ class RealEbayScraperAgent(Agent):
             self.logger.error(f"Gemini extraction failed: {str(e)}")
             return None
             
+    @llm_call_site("relevance_check")
     def _gemini_relevance_check(self, product: Dict[str, Any], search_params: Dict[str, Any]) -> Dict[str, Any]:
         """
         Use Gemini to evaluate if a product is relevant to the search query.
@@ -1218,23 +1218,32 @@ This module implements the RealWalmartScraperAgent class that uses BeautifulSoup
 requests, and Gemini AI to extract and optimize product data from Walmart.
 """
 
+import asyncio
 import random
-import time
 import logging
 import json
 import re
 from typing import Dict, Any, List, Optional, Tuple
 
-import requests
-from bs4 import BeautifulSoup
 
 from dealfinder.agents.base import Agent, MCPMessage
 from dealfinder import config
 from dealfinder.utils.logging import get_logger
+from dealfinder.utils.http import get_transport, get_async_transport
+from dealfinder.utils.cache import get_search_cache, search_cache_key
+from dealfinder.utils.circuit_breaker import get_circuit_breaker
+from dealfinder.utils.rate_limit import RateLimitExceeded
+from dealfinder.utils.relevance import RelevanceMatcher
+from dealfinder.utils.metrics import llm_call_site, count_products
+from dealfinder.utils.markup import parse_html, parse_search_page
 from dealfinder.agents.gemini_agent import GeminiAgent
 
 logger = get_logger("Scrapers.Walmart")
 
+# Start of the Next.js data script that embeds the search results JSON
+NEXT_DATA_MARKER = 'id="__NEXT_DATA__"'
+JSON_DECODER = json.JSONDecoder()
+
 class RealWalmartScraperAgent(Agent):
     """Agent for scraping Walmart product listings with Gemini-enhanced search optimization"""
     
@@ -1243,6 +1252,10 @@ class RealWalmartScraperAgent(Agent):
         super().__init__("WalmartScraperAgent")
         self.base_url = config.WALMART_BASE_URL
         self.gemini_agent = GeminiAgent()
+        self.transport = get_transport()
+        self.async_transport = get_async_transport()
+        self.result_cache = get_search_cache()
+        self.circuit_breaker = get_circuit_breaker("walmart")
         
         # Configure headers with default values
         self.headers = {
@@ -1274,23 +1287,107 @@ class RealWalmartScraperAgent(Agent):
             )
         
         search_params = message.content
-        self.logger.info(f"Searching Walmart for: {search_params}")
+        self.logger.info("Searching Walmart for: %s", search_params.get("query", ""))
+        self.logger.debug("Search parameters: %s", search_params)
         
         try:
-            # Use Gemini to optimize the search query for Walmart's search engine
-            optimized_params = self._optimize_search_params(search_params)
-            self.logger.info(f"Optimized search parameters: {optimized_params}")
+            # Repeat searches are served from the result cache without touching the network
+            cached = self._get_cached_search(search_params)
+            if cached is not None:
+                query, products = cached
+            else:
+                # Fail fast while the source is known to be down, before spending a Gemini call
+                self.circuit_breaker.check()
+                
+                # Use Gemini to optimize the search query for Walmart's search engine
+                optimized_params = self._optimize_search_params(search_params)
+                self.logger.debug("Optimized search parameters: %s", optimized_params)
+                
+                # Convert optimized parameters to Walmart search query
+                query = self._build_search_query(optimized_params)
+                self.logger.info(f"Built Walmart query: {query}")
+                
+                # Perform the search
+                products = self._scrape_search_results(query, optimized_params)
+                self._cache_search(search_params, query, products)
             
-            # Convert optimized parameters to Walmart search query
-            query = self._build_search_query(optimized_params)
-            self.logger.info(f"Built Walmart query: {query}")
+            # Apply Gemini-based relevance filtering
+            extracted = len(products)
+            if not search_params.get("skip_relevance_filter", False):
+                products = self._apply_relevance_filter(products, search_params)
+            count_products("walmart", extracted, len(products))
             
-            # Perform the search
-            products = self._scrape_search_results(query, optimized_params)
+            return MCPMessage(
+                sender=self.name,
+                receiver=message.sender,
+                content={
+                    "source": "Walmart",
+                    "query": query,
+                    "products": products
+                },
+                message_type="SEARCH_RESPONSE",
+                conversation_id=message.conversation_id
+            )
+        
+        except Exception as e:
+            self.logger.error(f"Error scraping Walmart: {str(e)}")
+            return MCPMessage(
+                sender=self.name,
+                receiver=message.sender,
+                content={"error": f"Walmart scraping error: {str(e)}"},
+                message_type="ERROR",
+                conversation_id=message.conversation_id
+            )
+    
+    async def async_process_message(self, message: MCPMessage) -> MCPMessage:
+        """
+        Process search request for Walmart without blocking the event loop.
+        
+        Args:
+            message: The incoming MCPMessage to process
+            
+        Returns:
+            A new MCPMessage containing the search results
+        """
+        if message.message_type != "SEARCH_REQUEST":
+            return MCPMessage(
+                sender=self.name,
+                receiver=message.sender,
+                content={"error": "Only SEARCH_REQUEST message type is supported"},
+                message_type="ERROR",
+                conversation_id=message.conversation_id
+            )
+        
+        search_params = message.content
+        self.logger.info("Searching Walmart for: %s", search_params.get("query", ""))
+        self.logger.debug("Search parameters: %s", search_params)
+        
+        try:
+            # Repeat searches are served from the result cache without touching the network
+            cached = self._get_cached_search(search_params)
+            if cached is not None:
+                query, products = cached
+            else:
+                # Fail fast while the source is known to be down, before spending a Gemini call
+                self.circuit_breaker.check()
+                
+                # Use Gemini to optimize the search query for Walmart's search engine
+                optimized_params = await self._async_optimize_search_params(search_params)
+                self.logger.debug("Optimized search parameters: %s", optimized_params)
+                
+                # Convert optimized parameters to Walmart search query
+                query = self._build_search_query(optimized_params)
+                self.logger.info(f"Built Walmart query: {query}")
+                
+                # Perform the search
+                products = await self._async_scrape_search_results(query, optimized_params)
+                self._cache_search(search_params, query, products)
             
             # Apply Gemini-based relevance filtering
+            extracted = len(products)
             if not search_params.get("skip_relevance_filter", False):
                 products = self._apply_relevance_filter(products, search_params)
+            count_products("walmart", extracted, len(products))
             
             return MCPMessage(
                 sender=self.name,
@@ -1314,6 +1411,46 @@ class RealWalmartScraperAgent(Agent):
                 conversation_id=message.conversation_id
             )
     
+    def _get_cached_search(self, search_params: Dict[str, Any]) -> Optional[Tuple[str, List[Dict[str, Any]]]]:
+        """
+        Look up previously scraped results for equivalent search parameters.
+        
+        Args:
+            search_params: Original search parameters
+            
+        Returns:
+            Tuple of (query, products) if cached, None otherwise
+        """
+        if not config.SEARCH_CACHE_ENABLED:
+            return None
+        
+        cached = self.result_cache.get(search_cache_key("walmart", search_params))
+        if cached is None:
+            return None
+        
+        self.logger.info(f"Serving cached Walmart results for query: {cached['query']}")
+        return cached["query"], cached["products"]
+    
+    def _cache_search(self, search_params: Dict[str, Any], query: str, products: List[Dict[str, Any]]) -> None:
+        """
+        Cache scraped results for the original search parameters.
+        
+        Args:
+            search_params: Original search parameters
+            query: The Walmart query that was searched
+            products: Scraped products before relevance filtering
+        """
+        # Empty results usually mean a blocked or failed request, so don't cache them
+        if not config.SEARCH_CACHE_ENABLED or not products:
+            return
+        
+        self.result_cache.set(
+            search_cache_key("walmart", search_params),
+            {"query": query, "products": products},
+            ttl=config.SEARCH_CACHE_TTL.get("walmart", config.SEARCH_CACHE_DEFAULT_TTL)
+        )
+    
+    @llm_call_site("optimize_search_params")
     def _optimize_search_params(self, search_params: Dict[str, Any]) -> Dict[str, Any]:
         """
         Use Gemini to optimize search parameters for Walmart's search engine.
@@ -1325,59 +1462,12 @@ class RealWalmartScraperAgent(Agent):
             Optimized search parameters
         """
         try:
-            # Extract query components for optimization
-            query_components = []
-            if "product_type" in search_params and search_params["product_type"]:
-                query_components.append(search_params["product_type"])
-                
-            if "keywords" in search_params:
-                if isinstance(search_params["keywords"], list):
-                    query_components.extend(search_params["keywords"])
-                else:
-                    query_components.append(search_params["keywords"])
-                    
-            if "brands" in search_params and search_params["brands"]:
-                brands = search_params["brands"]
-                if isinstance(brands, list):
-                    query_components.extend(brands)
-                else:
-                    query_components.append(brands)
-                    
-            if "features" in search_params and search_params["features"]:
-                features = search_params["features"]
-                if isinstance(features, list):
-                    query_components.extend(features)
-                else:
-                    query_components.append(features)
+            prompt = self._optimization_prompt(search_params)
             
             # If no components to optimize, return original parameters
-            if not query_components:
+            if not prompt:
                 return search_params
             
-            # Create prompt for Gemini
-            original_query = " ".join(query_components)
-            prompt = f"""
-            Optimize this search query for Walmart's search engine:
-            
-            "{original_query}"
-            
-            For Walmart searches, please:
-            1. Focus on model numbers and specific identifiers if present
-            2. Include key brand names (Walmart's search works well with brand names)
-            3. Remove generic words that may dilute results
-            4. Add Walmart-specific terms that might improve results (like "Rollback" if looking for deals)
-            5. Prioritize precise product names and specifications
-            
-            Return a JSON object with:
-            - optimized_keywords: List of 3-5 optimized search terms (most important first)
-            - department_hint: Any Walmart department suggestion (Electronics, Home, etc.)
-            - must_include_terms: Terms that MUST be in results
-            - exclude_terms: Terms that should NOT be in results
-            - walmart_specific_filters: Any Walmart-specific filters to apply
-            
-            Format as JSON only with no explanation.
-            """
-            
             # Call Gemini
             message = MCPMessage(
                 sender="WalmartScraperAgent",
@@ -1387,55 +1477,166 @@ class RealWalmartScraperAgent(Agent):
             )
             
             response = self.gemini_agent.process_message(message)
+            return self._apply_optimization(search_params, response)
             
-            # Parse response
-            optimization_data = {}
-            if isinstance(response.content, str):
-                # Try to extract JSON from the response
-                try:
-                    # Check if response is wrapped in code blocks
-                    json_match = re.search(r'```(?:json)?\s*([\s\S]*?)\s*```', response.content)
-                    if json_match:
-                        optimization_data = json.loads(json_match.group(1))
-                    else:
-                        # Try direct parsing
-                        optimization_data = json.loads(response.content)
-                except json.JSONDecodeError:
-                    self.logger.warning("Could not parse Gemini optimization response as JSON")
-            else:
-                # Response is already parsed
-                optimization_data = response.content
-            
-            # Create optimized parameters
-            optimized_params = search_params.copy()
-            
-            # Update keywords if optimized keywords were provided
-            if "optimized_keywords" in optimization_data and optimization_data["optimized_keywords"]:
-                optimized_params["keywords"] = optimization_data["optimized_keywords"]
-            
-            # Add department hints if provided
-            if "department_hint" in optimization_data and optimization_data["department_hint"]:
-                optimized_params["department"] = optimization_data["department_hint"]
+        except Exception as e:
+            self.logger.error(f"Error optimizing search parameters: {str(e)}")
+            # Fall back to original parameters
+            return search_params
+    
+    @llm_call_site("optimize_search_params")
+    async def _async_optimize_search_params(self, search_params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Async counterpart of _optimize_search_params using Gemini's async API.
+        
+        Args:
+            search_params: Original search parameters
             
-            # Add must-include terms
-            if "must_include_terms" in optimization_data and optimization_data["must_include_terms"]:
-                optimized_params["must_include_terms"] = optimization_data["must_include_terms"]
+        Returns:
+            Optimized search parameters
+        """
+        try:
+            prompt = self._optimization_prompt(search_params)
             
-            # Add exclude terms
-            if "exclude_terms" in optimization_data and optimization_data["exclude_terms"]:
-                optimized_params["exclude_terms"] = optimization_data["exclude_terms"]
+            # If no components to optimize, return original parameters
+            if not prompt:
+                return search_params
             
-            # Add Walmart-specific filters
-            if "walmart_specific_filters" in optimization_data and optimization_data["walmart_specific_filters"]:
-                optimized_params["walmart_filters"] = optimization_data["walmart_specific_filters"]
+            # Call Gemini
+            message = MCPMessage(
+                sender="WalmartScraperAgent",
+                receiver="GeminiAgent",
+                content=prompt,
+                message_type="REQUEST"
+            )
             
-            return optimized_params
+            response = await self.gemini_agent.async_process_message(message)
+            return self._apply_optimization(search_params, response)
             
         except Exception as e:
             self.logger.error(f"Error optimizing search parameters: {str(e)}")
             # Fall back to original parameters
             return search_params
     
+    def _optimization_prompt(self, search_params: Dict[str, Any]) -> Optional[str]:
+        """
+        Build the Gemini prompt used to optimize search parameters for Walmart.
+        
+        Args:
+            search_params: Original search parameters
+            
+        Returns:
+            The prompt string, or None if there is nothing to optimize
+        """
+        # Extract query components for optimization
+        query_components = []
+        if "product_type" in search_params and search_params["product_type"]:
+            query_components.append(search_params["product_type"])
+            
+        if "keywords" in search_params:
+            if isinstance(search_params["keywords"], list):
+                query_components.extend(search_params["keywords"])
+            else:
+                query_components.append(search_params["keywords"])
+                
+        if "brands" in search_params and search_params["brands"]:
+            brands = search_params["brands"]
+            if isinstance(brands, list):
+                query_components.extend(brands)
+            else:
+                query_components.append(brands)
+                
+        if "features" in search_params and search_params["features"]:
+            features = search_params["features"]
+            if isinstance(features, list):
+                query_components.extend(features)
+            else:
+                query_components.append(features)
+        
+        # Nothing to optimize without query components
+        if not query_components:
+            return None
+        
+        # Create prompt for Gemini
+        original_query = " ".join(query_components)
+        prompt = f"""
+        Optimize this search query for Walmart's search engine:
+        
+        "{original_query}"
+        
+        For Walmart searches, please:
+        1. Focus on model numbers and specific identifiers if present
+        2. Include key brand names (Walmart's search works well with brand names)
+        3. Remove generic words that may dilute results
+        4. Add Walmart-specific terms that might improve results (like "Rollback" if looking for deals)
+        5. Prioritize precise product names and specifications
+        
+        Return a JSON object with:
+        - optimized_keywords: List of 3-5 optimized search terms (most important first)
+        - department_hint: Any Walmart department suggestion (Electronics, Home, etc.)
+        - must_include_terms: Terms that MUST be in results
+        - exclude_terms: Terms that should NOT be in results
+        - walmart_specific_filters: Any Walmart-specific filters to apply
+        
+        Format as JSON only with no explanation.
+        """
+        
+        return prompt
+    
+    def _apply_optimization(self, search_params: Dict[str, Any], response: MCPMessage) -> Dict[str, Any]:
+        """
+        Merge Gemini's optimization response into the search parameters.
+        
+        Args:
+            search_params: Original search parameters
+            response: Gemini's response to the optimization prompt
+            
+        Returns:
+            Optimized search parameters
+        """
+        # Parse response
+        optimization_data = {}
+        if isinstance(response.content, str):
+            # Try to extract JSON from the response
+            try:
+                # Check if response is wrapped in code blocks
+                json_match = re.search(r'```(?:json)?\s*([\s\S]*?)\s*```', response.content)
+                if json_match:
+                    optimization_data = json.loads(json_match.group(1))
+                else:
+                    # Try direct parsing
+                    optimization_data = json.loads(response.content)
+            except json.JSONDecodeError:
+                self.logger.warning("Could not parse Gemini optimization response as JSON")
+        else:
+            # Response is already parsed
+            optimization_data = response.content
+        
+        # Create optimized parameters
+        optimized_params = search_params.copy()
+        
+        # Update keywords if optimized keywords were provided
+        if "optimized_keywords" in optimization_data and optimization_data["optimized_keywords"]:
+            optimized_params["keywords"] = optimization_data["optimized_keywords"]
+        
+        # Add department hints if provided
+        if "department_hint" in optimization_data and optimization_data["department_hint"]:
+            optimized_params["department"] = optimization_data["department_hint"]
+        
+        # Add must-include terms
+        if "must_include_terms" in optimization_data and optimization_data["must_include_terms"]:
+            optimized_params["must_include_terms"] = optimization_data["must_include_terms"]
+        
+        # Add exclude terms
+        if "exclude_terms" in optimization_data and optimization_data["exclude_terms"]:
+            optimized_params["exclude_terms"] = optimization_data["exclude_terms"]
+        
+        # Add Walmart-specific filters
+        if "walmart_specific_filters" in optimization_data and optimization_data["walmart_specific_filters"]:
+            optimized_params["walmart_filters"] = optimization_data["walmart_specific_filters"]
+        
+        return optimized_params
+    
     def _build_search_query(self, search_params: Dict[str, Any]) -> str:
         """
         Build optimized search query string from parameters for Walmart's search engine.
@@ -1545,9 +1746,82 @@ class RealWalmartScraperAgent(Agent):
         if max_results is None:
             max_results = config.MAX_PRODUCTS_PER_SOURCE
         
-        # Get extra results for better filtering
-        scrape_count = max_results * 2
+        params = self._build_request_params(query, search_params)
         
+        # Use a random user agent for each request to avoid blocking
+        current_headers = self.headers.copy()
+        current_headers["User-Agent"] = random.choice(config.USER_AGENTS)
+
+        # Make the request over the shared pooled transport (handles retries and backoff)
+        self.logger.info(f"Making Walmart search request with params: {params}")
+        try:
+            response = self.transport.get(self.base_url, params=params, headers=current_headers)
+        except RateLimitExceeded:
+            # Shed locally under load: the source itself did not fail, so the circuit is left alone
+            return []
+        if response is None:
+            self.logger.error("Max retries exceeded")
+            self.circuit_breaker.record_failure()
+            return []
+        self.circuit_breaker.record_success()
+
+        products = self._parse_search_results(response.text, search_params, max_results)
+        
+        return products
+    
+    async def _async_scrape_search_results(self, query: str, search_params: Dict[str, Any], max_results: int = None) -> List[Dict[str, Any]]:
+        """
+        Async counterpart of _scrape_search_results using the async HTTP transport.
+        
+        Page parsing runs in the default executor so it does not block the event loop.
+        
+        Args:
+            query: The search query string
+            search_params: Optimized search parameters
+            max_results: Maximum number of results to return (default: from config)
+            
+        Returns:
+            A list of product dictionaries
+        """
+        # Use configured max_results if not specified
+        if max_results is None:
+            max_results = config.MAX_PRODUCTS_PER_SOURCE
+        
+        params = self._build_request_params(query, search_params)
+        
+        # Use a random user agent for each request to avoid blocking
+        current_headers = self.headers.copy()
+        current_headers["User-Agent"] = random.choice(config.USER_AGENTS)
+
+        # Make the request over the shared async transport (handles retries and backoff)
+        self.logger.info(f"Making Walmart search request with params: {params}")
+        try:
+            html = await self.async_transport.get(self.base_url, params=params, headers=current_headers)
+        except RateLimitExceeded:
+            # Shed locally under load: the source itself did not fail, so the circuit is left alone
+            return []
+        if html is None:
+            self.logger.error("Max retries exceeded")
+            self.circuit_breaker.record_failure()
+            return []
+        self.circuit_breaker.record_success()
+
+        loop = asyncio.get_running_loop()
+        products = await loop.run_in_executor(None, self._parse_search_results, html, search_params, max_results)
+        
+        return products
+    
+    def _build_request_params(self, query: str, search_params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build the Walmart search request parameters.
+        
+        Args:
+            query: The search query string
+            search_params: Optimized search parameters
+            
+        Returns:
+            Dictionary of query string parameters
+        """
         # Construct the search URL params with enhanced parameters
         params = {
             "q": query,
@@ -1596,39 +1870,28 @@ class RealWalmartScraperAgent(Agent):
                 for key, value in walmart_filters.items():
                     params[key] = value
         
-        # Use a random user agent for each request to avoid blocking
-        current_headers = self.headers.copy()
-        current_headers["User-Agent"] = random.choice(config.USER_AGENTS)
-
-        # Make the request with retry logic
-        for attempt in range(3):
-            try:
-                self.logger.info(f"Making Walmart search request with params: {params}")
-                response = requests.get(
-                    self.base_url,
-                    params=params,
-                    headers=current_headers,
-                    timeout=config.SCRAPING_TIMEOUT
-                )
-                
-                if response.status_code == 200:
-                    break
-                else:
-                    self.logger.warning(f"Walmart search request failed with status {response.status_code}, retrying")
-                    time.sleep(2 ** attempt)
-            except Exception as e:
-                self.logger.warning(f"Request error: {str(e)}, retrying")
-                time.sleep(2 ** attempt)
-        else:
-            self.logger.error("Max retries exceeded")
-            return []
-
-        # Parse the HTML response
-        soup = BeautifulSoup(response.text, 'html.parser')
+        return params
+    
+    def _parse_search_results(self, html: str, search_params: Dict[str, Any], max_results: int) -> List[Dict[str, Any]]:
+        """
+        Parse a Walmart search results page into product dictionaries.
+        
+        Args:
+            html: The search results page HTML
+            search_params: Optimized search parameters
+            max_results: Maximum number of results to return
+            
+        Returns:
+            A list of product dictionaries
+        """
+        # Get extra results for better filtering
+        scrape_count = max_results * 2
         
         # Get product listings - always_use_gemini support
         if search_params.get("always_use_gemini"):
             self.logger.info("Using Gemini for all product extraction")
+            soup = parse_html(html)
+            
             # Try product divs from HTML
             product_divs = soup.select('div[data-item-id]')
             if not product_divs:
@@ -1638,22 +1901,28 @@ class RealWalmartScraperAgent(Agent):
                 
             extracted_products = []
             
-            for div in product_divs[:scrape_count]:
-                product = self.gemini_agent.extract_product_details_from_html(str(div))
-                if product and isinstance(product, dict):
+            # One batched Gemini call for all fragments instead of one call per product
+            fragments = [str(div) for div in product_divs[:scrape_count]]
+            for product in self.gemini_agent.extract_products_from_html_batch(fragments):
+                if product:
                     product["source"] = "Walmart"
                     extracted_products.append(product)
                     
             # Return the requested number of products
             return extracted_products[:max_results]
 
-        # Try JSON extraction first (more reliable)
-        products = self._extract_from_json_data(soup)
+        # Fast path: decode only the product subtree of the embedded __NEXT_DATA__ JSON
+        products = self._extract_from_next_data(html)
+        
+        # Then try DOM-based JSON extraction (more reliable than HTML), parsing only the JSON script tags
+        if not products:
+            self.logger.info("__NEXT_DATA__ fast path found no products, falling back to JSON script tags")
+            products = self._extract_from_json_data(parse_search_page(html, "walmart"))
         
         # Fall back to HTML extraction if JSON extraction fails
         if not products:
             self.logger.info("JSON extraction failed, falling back to HTML extraction")
-            products = self._extract_from_html(soup, scrape_count)
+            products = self._extract_from_html(parse_html(html), scrape_count)
             
         # Deduplicate by product_id
         seen_ids = set()
@@ -1666,17 +1935,11 @@ class RealWalmartScraperAgent(Agent):
                 
             seen_ids.add(pid)
             product["source"] = "Walmart"
-            self.logger.info(f"Extracted product: {product.get('title', '')} at {product.get('price', 0)} USD")
+            self.logger.info("Extracted product: %s at %s USD", product.get('title', ''), product.get('price', 0))
             filtered_products.append(product)
             
             if len(filtered_products) >= scrape_count:
                 break
-
-        # Add a short delay to avoid rate limiting
-        time.sleep(random.uniform(
-            config.SCRAPING_DELAY_MIN,
-            config.SCRAPING_DELAY_MAX
-        ))
         
         self.logger.info(f"Extracted {len(filtered_products)} products from Walmart")
         
@@ -1704,32 +1967,8 @@ class RealWalmartScraperAgent(Agent):
         try:
             self.logger.info(f"Applying relevance filtering to {len(products)} products")
             
-            # Extract filtering criteria
-            must_include_terms = search_params.get("must_include_terms", [])
-            exclude_terms = search_params.get("exclude_terms", [])
-            
-            # Prepare keywords for matching
-            keywords = []
-            if "keywords" in search_params:
-                if isinstance(search_params["keywords"], list):
-                    keywords.extend([k.lower() for k in search_params["keywords"] if k])
-                elif search_params["keywords"]:
-                    keywords.append(search_params["keywords"].lower())
-            
-            # Prepare brands for matching
-            brands = []
-            if "brands" in search_params and search_params["brands"]:
-                if isinstance(search_params["brands"], list):
-                    brands.extend([b.lower() for b in search_params["brands"] if b])
-                else:
-                    brands.append(search_params["brands"].lower())
-            
-            # Convert must_include and exclude_terms to lists if they're not already
-            if must_include_terms and not isinstance(must_include_terms, list):
-                must_include_terms = [must_include_terms]
-            
-            if exclude_terms and not isinstance(exclude_terms, list):
-                exclude_terms = [exclude_terms]
+            # Compile the query's terms once and scan each product's text in one pass
+            matcher = RelevanceMatcher.from_search_params(search_params)
             
             # Apply basic filtering
             filtered_products = []
@@ -1737,30 +1976,20 @@ class RealWalmartScraperAgent(Agent):
                 # Get product text for matching (combine title and description)
                 title = product.get("title", "").lower()
                 description = product.get("description", "").lower()
-                combined_text = f"{title} {description}"
                 
-                # Skip products with exclude terms
-                if exclude_terms and any(term.lower() in combined_text for term in exclude_terms if term):
-                    continue
-                
-                # Keep products with must_include terms
-                if must_include_terms:
-                    if not all(term.lower() in combined_text for term in must_include_terms if term):
-                        continue
-                
-                # Ensure brand match if brands were specified
-                if brands and not any(brand in combined_text for brand in brands):
+                # Skip products failing the exclude, must-include or brand criteria
+                match = matcher.match(title, description)
+                if match is None:
                     continue
+                title_matches, description_matches = match
                 
                 # Calculate a relevance score for Walmart-specific ranking
                 relevance_score = 0
                 
                 # Keywords in title are very important
-                keyword_matches = sum(1 for kw in keywords if kw in title)
-                relevance_score += keyword_matches * 10
+                relevance_score += title_matches * 10
                 
                 # Keywords in description are less important
-                description_matches = sum(1 for kw in keywords if kw in description)
                 relevance_score += description_matches * 2
                 
                 # Walmart-specific bonuses:
@@ -1812,6 +2041,89 @@ class RealWalmartScraperAgent(Agent):
             # On error, return original products
             return products[:config.MAX_PRODUCTS_PER_SOURCE]
     
+    def _extract_from_next_data(self, html: str) -> List[Dict[str, Any]]:
+        """
+        Extract products from the page's __NEXT_DATA__ JSON without building a DOM.
+        
+        The script tag is located by string offset and only the product list
+        subtree is decoded, instead of parsing the page and the whole JSON blob.
+        
+        Args:
+            html: The search results page HTML
+            
+        Returns:
+            A list of product dictionaries, empty if the fast path does not apply
+        """
+        try:
+            marker = html.find(NEXT_DATA_MARKER)
+            if marker == -1:
+                return []
+            
+            start = html.find(">", marker) + 1
+            end = html.find("</script>", start)
+            if start == 0 or end == -1:
+                return []
+            
+            raw_items = []
+            
+            # Current layout: searchResult.itemStacks[].items[]
+            item_stacks = self._decode_json_value(html, '"itemStacks":', start, end)
+            if isinstance(item_stacks, list):
+                for stack in item_stacks:
+                    if isinstance(stack, dict) and isinstance(stack.get("items"), list):
+                        raw_items.extend(stack["items"])
+            
+            # Older layout: searchContent.searchResultsMap.REGULAR_SEARCH.products[]
+            if not raw_items:
+                regular_search = self._decode_json_value(html, '"REGULAR_SEARCH":', start, end)
+                if isinstance(regular_search, dict) and isinstance(regular_search.get("products"), list):
+                    raw_items = regular_search["products"]
+            
+            products = []
+            for item in raw_items:
+                # Skip ad tiles and placeholders mixed into the item list
+                if not isinstance(item, dict) or item.get("__typename", "Product") != "Product":
+                    continue
+                
+                product = self._parse_json_product(item)
+                if product:
+                    products.append(product)
+            
+            self.logger.info(f"Extracted {len(products)} products from __NEXT_DATA__")
+            return products
+            
+        except Exception as e:
+            self.logger.warning(f"__NEXT_DATA__ fast path failed: {str(e)}")
+            return []
+    
+    def _decode_json_value(self, text: str, key: str, start: int, end: int) -> Any:
+        """
+        Decode the JSON value that follows the first occurrence of a key.
+        
+        Args:
+            text: Text containing the JSON document
+            key: Quoted key followed by a colon, e.g. '"itemStacks":'
+            start: Offset where the JSON document starts
+            end: Offset where the JSON document ends
+            
+        Returns:
+            The decoded value, or None if the key is missing or the value is not valid JSON
+        """
+        position = text.find(key, start, end)
+        if position == -1:
+            return None
+        
+        position += len(key)
+        while position < end and text[position].isspace():
+            position += 1
+        
+        try:
+            value, _ = JSON_DECODER.raw_decode(text, position)
+        except json.JSONDecodeError:
+            return None
+        
+        return value
+    
     def _extract_from_json_data(self, soup) -> List[Dict[str, Any]]:
         """
         Extract product data from JSON embedded in the page.
@@ -2009,9 +2321,9 @@ class RealWalmartScraperAgent(Agent):
             # Use Gemini fallback if essential fields are missing
             if (not title or title == "Unknown Product") or not product_url or price == 0.0:
                 try:
-                    gemini = GeminiAgent()
+                    gemini = self.gemini_agent
                     html_context = json.dumps(item)  # Pass the JSON item as context string
-                    gemini_response = gemini.extract_product_details_from_html(html_context)
+                    gemini_response = gemini.extract_product_details_from_html(html_context, minify=False)
                     if isinstance(gemini_response, dict):
                         title = gemini_response.get("title", title)
                         price = gemini_response.get("price", price)
@@ -2039,7 +2351,7 @@ class RealWalmartScraperAgent(Agent):
             }
 
             # Log successful extraction
-            self.logger.info(f"Extracted product from JSON: {title}")
+            self.logger.info("Extracted product from JSON: %s", title)
             return product
 
         except Exception as e:
@@ -2277,7 +2589,7 @@ class RealWalmartScraperAgent(Agent):
             # Use Gemini fallback if essential fields are missing
             if (not title or title == "Unknown Product") or not url or price == 0.0:
                 try:
-                    gemini = GeminiAgent()
+                    gemini = self.gemini_agent
                     html_context = str(product_div)
                     gemini_response = gemini.extract_product_details_from_html(html_context)
                     if isinstance(gemini_response, dict):
@@ -2289,7 +2601,7 @@ class RealWalmartScraperAgent(Agent):
                 except Exception as e:
                     self.logger.error(f"Gemini fallback failed: {str(e)}")
 
-            self.logger.info(f"Extracted product: {title} at {price} USD")
+            self.logger.info("Extracted product: %s at %s USD", title, price)
 
             # Create enhanced product dictionary
             product = {
@@ -2365,6 +2677,7 @@ class RealWalmartScraperAgent(Agent):
             self.logger.warning(f"Error parsing price '{price_text}': {str(e)}")
             return 0.0
     
+    @llm_call_site("search_query_prompt")
     def _gemini_search_query_prompt(self, search_params: Dict[str, Any]) -> str:
         """
         Generate a prompt for Gemini to create an optimized search query.
@@ -17,8 +17,55 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 # Scraping configuration
 MAX_PRODUCTS_PER_SOURCE = 5  # Maximum number of products to get from each source
 SCRAPING_TIMEOUT = 10  # Timeout in seconds for scraping requests
-SCRAPING_DELAY_MIN = 0.5  # Minimum delay between requests in seconds
-SCRAPING_DELAY_MAX = 1.5  # Maximum delay between requests in seconds
+SEARCH_MAX_WORKERS = 6  # Maximum number of concurrent source searches per controller
+SEARCH_SOURCE_DEADLINE = 25  # Seconds to wait for each source before returning partial results
+HTML_PARSER = "lxml"  # BeautifulSoup parser backend (falls back to html.parser if unavailable)
+HTML_PARTIAL_PARSING = True  # Only materialize search result elements when parsing result pages
+
+# HTTP transport configuration (shared, pooled keep-alive sessions)
+HTTP_POOL_CONNECTIONS = 10  # Number of connection pools cached per host session
+HTTP_POOL_MAXSIZE = 10  # Maximum open connections kept per host
+HTTP_MAX_RETRIES = 3  # Attempts per request before giving up
+HTTP_BACKOFF_FACTOR = 1.0  # Base backoff in seconds, doubled after each failed attempt
+HTTP_RATE_LIMIT_PER_SECOND = 1.0  # Requests per second allowed per retailer host, shared by all queries in the process
+HTTP_RATE_LIMIT_BURST = 3  # Requests a host may receive back to back before pacing starts
+HTTP_RATE_LIMIT_MIN_RATE = 0.1  # Lowest per-host rate after repeated 429/503 responses
+HTTP_RATE_LIMIT_RECOVERY = 0.1  # Fraction of the base rate restored after each successful response
+HTTP_RATE_LIMIT_MAX_WAIT = 15  # Seconds a request may wait for its host before failing
+HTTP_HOST_RATE_LIMITS = {}  # Optional (rate, burst) overrides keyed by host, e.g. {"www.ebay.com": (2.0, 5)}
+
+# Source circuit breaker configuration (skip sources that keep failing)
+CIRCUIT_BREAKER_ENABLED = True  # Fail fast for sources whose recent fetches mostly failed
+CIRCUIT_WINDOW_SIZE = 10  # Recent fetch outcomes considered per source
+CIRCUIT_WINDOW_SECONDS = 300  # Ignore outcomes older than this (in seconds)
+CIRCUIT_MIN_REQUESTS = 4  # Outcomes needed before a source's circuit can open
+CIRCUIT_FAILURE_RATE = 0.5  # Fraction of failed fetches that opens the circuit
+CIRCUIT_OPEN_SECONDS = 30  # Cool-down before probing a source again
+CIRCUIT_MAX_OPEN_SECONDS = 600  # Longest cool-down, doubled after each failed probe
+
+# Search result cache configuration
+SEARCH_CACHE_ENABLED = True  # Serve repeat searches from cache instead of re-scraping
+SEARCH_CACHE_MAX_ENTRIES = 500  # Maximum cached searches (least recently used are evicted)
+SEARCH_CACHE_DEFAULT_TTL = 900  # Time to live for cached searches (in seconds)
+SEARCH_CACHE_TTL = {  # Per-source time to live overrides (in seconds)
+    "amazon": 900,
+    "walmart": 900,
+    "ebay": 300,  # Auction prices move faster
+}
+SEARCH_CACHE_DB_PATH = os.getenv("SEARCH_CACHE_DB_PATH")  # Optional SQLite file to persist the cache across restarts
+
+# LLM response cache configuration (keyed on model name + prompt hash)
+LLM_CACHE_ENABLED = True  # Reuse Gemini responses for identical prompts
+LLM_CACHE_MAX_ENTRIES = 2000  # Maximum cached responses (least recently used are evicted)
+LLM_CACHE_TTL = 21600  # Time to live for cached responses (in seconds)
+LLM_CACHE_DB_PATH = os.getenv("LLM_CACHE_DB_PATH")  # Optional SQLite file to persist the cache across restarts
+GEMINI_EXTRACTION_BATCH_SIZE = 10  # HTML fragments sent per batched product extraction call
+GEMINI_FRAGMENT_TOKEN_BUDGET = 1500  # Approximate token budget per HTML fragment after minification
+
+# Gemini client limits (shared by every agent in the process)
+GEMINI_MAX_CONCURRENCY = 4  # Maximum Gemini requests in flight at once
+GEMINI_REQUESTS_PER_MINUTE = 60  # Requests started per rolling minute (0 disables the budget)
+GEMINI_BUDGET_MAX_WAIT = 30  # Seconds a request waits for a slot before failing
 
 # User agent list for rotating headers
 USER_AGENTS = [
@@ -67,14 +114,47 @@ LOGGING_CONFIG = {
     }
 }
 
+LOG_ASYNC = True  # Write log records from a background listener thread instead of the logging call
+LOG_QUEUE_SIZE = 10000  # Records waiting for the listener before new ones are dropped
+LOG_FILE_FORMAT = "json"  # "json" (structlog JSON lines) or "text" for the log file
+# Per-logger rate limits, applied per message template: "rate" records/second with a "burst",
+# and/or "every" to keep only every Nth record. Errors are never dropped.
+LOG_RATE_LIMITS = {
+    "DealFinderAI.AmazonScraperAgent": {"rate": 2, "burst": 10},
+    "DealFinderAI.EbayScraperAgent": {"rate": 2, "burst": 10},
+    "DealFinderAI.WalmartScraperAgent": {"rate": 2, "burst": 10},
+}
+
 # Analytics configuration
 ANALYTICS_FILE = "dealfinder_analytics.log"
 ENABLE_ANALYTICS = True
+ANALYTICS_BUFFER_SIZE = 10000  # Entries buffered in memory before the oldest are dropped
+ANALYTICS_FLUSH_INTERVAL = 2  # Seconds between background writes of buffered entries
+ANALYTICS_SEGMENT_MAX_BYTES = 16 * 1024 * 1024  # Rotate the analytics file at this size
+ANALYTICS_SEGMENT_MAX_AGE = 3600  # Rotate the analytics file after this many seconds
+ANALYTICS_COMPACT_INTERVAL = 300  # Seconds between compactions of rotated segments into .npz (0 to disable)
 
 # Web server configuration
 WEB_HOST = "0.0.0.0"
 WEB_PORT = 5000
 DEBUG_MODE = True
+METRICS_ENABLED = True  # Record Prometheus metrics and serve them at /metrics
+TRACING_ENABLED = True  # Record per-query tracing spans
+TRACE_FILE = os.getenv("TRACE_FILE", "dealfinder_traces.jsonl")  # Finished traces are appended here as OTLP/JSON lines (empty to disable)
+TRACE_FILE_MAX_BYTES = 16 * 1024 * 1024  # Rotate the trace file at this size (0 to never rotate)
+TRACE_FILE_BACKUPS = 3  # Rotated trace files kept; older traces are deleted
+TRACE_MAX_RECENT = 50  # Finished traces kept in memory for /api/traces
+STREAM_HEARTBEAT_INTERVAL = 15  # Seconds between keep-alive comments on idle event streams
+SESSION_TTL = 3600  # Seconds of inactivity after which a web session expires
+SESSION_MAX_ENTRIES = 10000  # Web sessions kept (least recently used are evicted)
+SESSION_MAX_BYTES = 16 * 1024 * 1024  # Approximate memory budget for web session data
+
+# Background job configuration (asynchronous /api/jobs queries)
+JOB_MAX_WORKERS = 4  # Worker threads running submitted queries
+JOB_MAX_QUEUED = 50  # Jobs waiting for a worker before new submissions are rejected
+JOB_RESULT_TTL = 600  # Seconds a finished job's result is kept for retrieval
+JOB_MAX_RETAINED = 1000  # Finished jobs kept at most (oldest expire first)
+JOB_MAX_WAIT = 30  # Longest a long-poll request waits for a job to finish (in seconds)
 
 # Default settings
 DEFAULT_MAX_RESULTS = 10
@@ -83,4 +163,11 @@ DEFAULT_SORT_PREFERENCE = "price_low_to_high"
 # LangChain Integration Configuration (NEW)
 ENABLE_LANGCHAIN = True  # Feature flag to enable/disable LangChain integration
 DEFAULT_LLM_MODEL = "gemini-1.5-flash"  # Using Gemini model only
-LANGCHAIN_MEMORY_TTL = 3600  # Time to live for conversation memory (in seconds)
\ No newline at end of file
+LANGCHAIN_MEMORY_TTL = 3600  # Time to live for conversation memory (in seconds)
+CHAT_MEMORY_MAX_CONVERSATIONS = 1000  # Conversations kept in memory (least recently used are evicted)
+CHAT_MEMORY_MAX_BYTES = 64 * 1024 * 1024  # Approximate memory budget for stored conversation state
+CHAT_MEMORY_SWEEP_INTERVAL = 60  # Seconds between background sweeps of expired conversations
+SHARED_STATE_DB_PATH = os.getenv("SHARED_STATE_DB_PATH")  # Optional SQLite file (WAL mode) sharing sessions and chat memory across worker processes
+SHARED_STATE_HOT_ENTRIES = 256  # Decoded shared-store values cached in each process
+FOLLOW_UP_LOCAL_CLASSIFIER = True  # Decide confident follow-up/new-search cases locally before asking Gemini
+FOLLOW_UP_OVERLAP_THRESHOLD = 0.5  # Fraction of query product words found in shown titles to count as about them
\ No newline at end of file
@@ -2,11 +2,16 @@
 Updated controller implementation for DealFinder AI with product comparison and chat memory.
 """
 
+import asyncio
+import contextvars
+import functools
 import json
 import logging
 import random
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
 from datetime import datetime
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Callable, Dict, Any, List, Optional, Tuple
 
 from rich.console import Console
 from rich.panel import Panel
@@ -22,7 +27,10 @@ from dealfinder.agents.chat_memory import ChatMemoryAgent
 from dealfinder.agents.scrapers import get_scraper_agents
 
 from dealfinder import config
+from dealfinder.utils.analytics import get_analytics_sink
 from dealfinder.utils.logging import setup_logging, get_logger
+from dealfinder.utils.metrics import llm_call_site
+from dealfinder.utils.tracing import start_span
 
 # Set up logging
 logger = get_logger("Controller")
@@ -59,6 +67,12 @@ class DealFinderController:
         self.scraper_agents = get_scraper_agents()
         self.logger.info(f"Initialized scraper agents: {list(self.scraper_agents.keys())}")
         
+        # Bounded executor used to fan search requests out to all sources at once
+        self.search_executor = ThreadPoolExecutor(
+            max_workers=config.SEARCH_MAX_WORKERS,
+            thread_name_prefix="dealfinder-search"
+        )
+        
         # Agent registry
         self.agents = {
             "GeminiAgent": self.gemini_agent,
@@ -417,315 +431,530 @@ instead of properly handling them through the chat memory system.
 Updated Controller with enhanced debugging and fallback options
 """
 
-    def process_user_query(self, query: str, session_id: str = None) -> str:
+    def process_user_query(self, 
+                           query: str, 
+                           session_id: str = None, 
+                           on_event: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> str:
         """
         Process a user query and return the formatted response.
         
         Args:
             query: The user query string
             session_id: Optional session ID for conversation tracking
+            on_event: Optional callback receiving (event, data) as each stage completes:
+                      "parsed", "source" (once per retailer), "ranked" and "comparison"
             
         Returns:
             A formatted response string with the search results
         """
-        try:
-            # Create a conversation ID for this interaction if not provided
-            conversation_id = session_id or datetime.now().strftime("%Y%m%d%H%M%S")
-            
-            # If this is a new session, initialize conversation history
-            if conversation_id not in self.conversation_history:
-                self.conversation_history[conversation_id] = []
+        # Create a conversation ID for this interaction if not provided
+        conversation_id = session_id or datetime.now().strftime("%Y%m%d%H%M%S")
+        started = time.perf_counter()
+        
+        with start_span("process_user_query", {"conversation_id": conversation_id}) as span:
+            try:
+                with start_span("prepare_search"):
+                    early_response, search_params = self._prepare_search(query, conversation_id)
+                if early_response is not None:
+                    span.set_attribute("follow_up", True)
+                    return early_response
+                self._emit(on_event, "parsed", {"search_params": search_params})
                 
-            self.logger.info(f"Processing user query: {query}")
-            
-            # Check if this is a follow-up question by analyzing the query
-            analyze_message = MCPMessage(
-                sender="Controller",
-                receiver="ChatMemoryAgent",
-                content={"query": query},
-                message_type="MEMORY_ANALYZE",
-                conversation_id=conversation_id
-            )
-            analyze_response = self.chat_memory_agent.process_message(analyze_message)
-            self.conversation_history[conversation_id].append((analyze_message, analyze_response))
-            
-            # Extract results from the analysis
-            is_follow_up = False
-            referenced_products = []
-            
-            if analyze_response.message_type != "ERROR":
-                self.logger.info(f"Analyze response: {analyze_response.content}")
-                is_follow_up = analyze_response.content.get("is_follow_up", False)
-                referenced_products = analyze_response.content.get("referenced_products", [])
+                # 2. Send search requests to all scraper agents concurrently
+                with start_span("search_all_sources"):
+                    search_results = self._search_all_sources(search_params, conversation_id, on_event)
                 
-                # Log the decision for debugging
-                self.logger.info(f"Is follow-up? {is_follow_up}")
-                self.logger.info(f"Referenced products: {len(referenced_products)}")
-            
-            # Enhanced follow-up detection based on query content
-            # Keywords that indicate a search for specific products
-            sony_keywords = ["sony", "headphones", "wh1000", "wh-1000", "xm4", "xm5"]
-            
-            # Check if query contains explicit Sony headphone references
-            contains_sony_keywords = sum(1 for kw in sony_keywords if kw.lower() in query.lower()) >= 2
-            
-            # If this looks like a new product search rather than a follow-up, reset follow-up status
-            if contains_sony_keywords and "latest" in query.lower():
-                self.logger.info(f"Query contains explicit Sony headphone keywords with 'latest'. Treating as new search.")
-                is_follow_up = False
-                referenced_products = []
+                with start_span("complete_query"):
+                    return self._complete_query(query, search_params, search_results, conversation_id, on_event, started)
+                
+            except Exception as e:
+                self.logger.error(f"Error processing query: {str(e)}")
+                span.set_attribute("error", str(e))
+                return f"Sorry, there was an error processing your request: {str(e)}"
+    
+    async def async_process_user_query(self, 
+                                       query: str, 
+                                       session_id: str = None, 
+                                       on_event: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> str:
+        """
+        Process a user query on the running event loop and return the formatted response.
+        
+        Scraper searches are awaited together over the shared async HTTP transport, while
+        the blocking parse, aggregate and present stages run in the default executor.
+        
+        Args:
+            query: The user query string
+            session_id: Optional session ID for conversation tracking
+            on_event: Optional stage callback, as for process_user_query
             
-            # Handle follow-up questions
-            if is_follow_up and referenced_products:
-                self.logger.info(f"Handling as follow-up question about {len(referenced_products)} products")
-                return self._handle_follow_up(query, referenced_products, conversation_id)
+        Returns:
+            A formatted response string with the search results
+        """
+        loop = asyncio.get_running_loop()
+        conversation_id = session_id or datetime.now().strftime("%Y%m%d%H%M%S")
+        started = time.perf_counter()
+        
+        def in_executor(func, *args):
+            # Executor threads do not inherit context, so run the stage in a copy of the current span context
+            return loop.run_in_executor(None, functools.partial(contextvars.copy_context().run, func, *args))
+        
+        with start_span("process_user_query", {"conversation_id": conversation_id}) as span:
+            try:
+                with start_span("prepare_search"):
+                    early_response, search_params = await in_executor(self._prepare_search, query, conversation_id)
+                if early_response is not None:
+                    span.set_attribute("follow_up", True)
+                    return early_response
+                self._emit(on_event, "parsed", {"search_params": search_params})
+                
+                # 2. Await search requests to all scraper agents together
+                with start_span("search_all_sources"):
+                    search_results = await self._async_search_all_sources(search_params, conversation_id, on_event)
+                
+                with start_span("complete_query"):
+                    return await in_executor(
+                        self._complete_query, query, search_params, search_results, conversation_id, on_event, started
+                    )
+                
+            except Exception as e:
+                self.logger.error(f"Error processing query: {str(e)}")
+                span.set_attribute("error", str(e))
+                return f"Sorry, there was an error processing your request: {str(e)}"
+    
+    def _prepare_search(self, query: str, conversation_id: str) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """
+        Check the query for follow-ups and parse it into search parameters.
+        
+        Args:
+            query: The user query string
+            conversation_id: Conversation ID for this interaction
             
-            # If not a follow-up or no products found, proceed with a new search
-            self.logger.info("Processing as new search query")
+        Returns:
+            Tuple of (response to return without searching, search parameters); exactly one is set
+        """
+        # If this is a new session, initialize conversation history
+        if conversation_id not in self.conversation_history:
+            self.conversation_history[conversation_id] = []
             
-            # 1. Parse the user query with Gemini
-            parse_message = MCPMessage(
-                sender="Controller",
-                receiver="GeminiAgent",
-                content=query,
-                message_type="PARSE_QUERY",
-                conversation_id=conversation_id
-            )
+        self.logger.info(f"Processing user query: {query}")
+        
+        # Check if this is a follow-up question by analyzing the query
+        analyze_message = MCPMessage(
+            sender="Controller",
+            receiver="ChatMemoryAgent",
+            content={"query": query},
+            message_type="MEMORY_ANALYZE",
+            conversation_id=conversation_id
+        )
+        analyze_response = self.chat_memory_agent.process_message(analyze_message)
+        self.conversation_history[conversation_id].append((analyze_message, analyze_response))
+        
+        # Extract results from the analysis
+        is_follow_up = False
+        referenced_products = []
+        
+        if analyze_response.message_type != "ERROR":
+            self.logger.info(f"Analyze response: {analyze_response.content}")
+            is_follow_up = analyze_response.content.get("is_follow_up", False)
+            referenced_products = analyze_response.content.get("referenced_products", [])
             
-            parse_response = self.gemini_agent.process_message(parse_message)
-            self.conversation_history[conversation_id].append((parse_message, parse_response))
-            
-            if parse_response.message_type == "ERROR":
-                return f"Error parsing your query: {parse_response.content.get('error', 'Unknown error')}"
-            
-            # Extract search parameters from the response
-            if isinstance(parse_response.content, str):
-                # Try to extract JSON from a string response (happens when Gemini returns JSON in a code block)
-                import re
-                import json
-                json_match = re.search(r'```(?:json)?\s*([\s\S]*?)\s*```', parse_response.content)
-                if json_match:
-                    try:
-                        search_params = json.loads(json_match.group(1))
-                    except:
-                        # If parsing fails, create a basic search parameter
-                        search_params = {"keywords": [query.strip()]}
-                else:
-                    # If no JSON found, use the raw query
+            # Log the decision for debugging
+            self.logger.info(f"Is follow-up? {is_follow_up}")
+            self.logger.info(f"Referenced products: {len(referenced_products)}")
+        
+        # Enhanced follow-up detection based on query content
+        # Keywords that indicate a search for specific products
+        sony_keywords = ["sony", "headphones", "wh1000", "wh-1000", "xm4", "xm5"]
+        
+        # Check if query contains explicit Sony headphone references
+        contains_sony_keywords = sum(1 for kw in sony_keywords if kw.lower() in query.lower()) >= 2
+        
+        # If this looks like a new product search rather than a follow-up, reset follow-up status
+        if contains_sony_keywords and "latest" in query.lower():
+            self.logger.info(f"Query contains explicit Sony headphone keywords with 'latest'. Treating as new search.")
+            is_follow_up = False
+            referenced_products = []
+        
+        # Handle follow-up questions
+        if is_follow_up and referenced_products:
+            self.logger.info(f"Handling as follow-up question about {len(referenced_products)} products")
+            return self._handle_follow_up(query, referenced_products, conversation_id), None
+        
+        # If not a follow-up or no products found, proceed with a new search
+        self.logger.info("Processing as new search query")
+        
+        # 1. Parse the user query with Gemini
+        parse_message = MCPMessage(
+            sender="Controller",
+            receiver="GeminiAgent",
+            content=query,
+            message_type="PARSE_QUERY",
+            conversation_id=conversation_id
+        )
+        
+        parse_response = self.gemini_agent.process_message(parse_message)
+        self.conversation_history[conversation_id].append((parse_message, parse_response))
+        
+        if parse_response.message_type == "ERROR":
+            return f"Error parsing your query: {parse_response.content.get('error', 'Unknown error')}", None
+        
+        # Extract search parameters from the response
+        if isinstance(parse_response.content, str):
+            # Try to extract JSON from a string response (happens when Gemini returns JSON in a code block)
+            import re
+            import json
+            json_match = re.search(r'```(?:json)?\s*([\s\S]*?)\s*```', parse_response.content)
+            if json_match:
+                try:
+                    search_params = json.loads(json_match.group(1))
+                except:
+                    # If parsing fails, create a basic search parameter
                     search_params = {"keywords": [query.strip()]}
             else:
-                search_params = parse_response.content
-                
-            # Make sure we have valid search parameters
-            if not search_params or not any(search_params.values()):
+                # If no JSON found, use the raw query
                 search_params = {"keywords": [query.strip()]}
-                
-            self.logger.info(f"Parsed search parameters: {search_params}")
+        else:
+            search_params = parse_response.content
+            
+        # Make sure we have valid search parameters
+        if not search_params or not any(search_params.values()):
+            search_params = {"keywords": [query.strip()]}
+            
+        self.logger.info(f"Parsed search parameters: {search_params}")
+        
+        return None, search_params
+    
+    def _complete_query(self, 
+                        query: str, 
+                        search_params: Dict[str, Any], 
+                        search_results: List[Dict[str, Any]], 
+                        conversation_id: str,
+                        on_event: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+                        started: Optional[float] = None) -> str:
+        """
+        Aggregate, compare, remember and present the search results for a query.
+        
+        Args:
+            query: The user query string
+            search_params: Parsed search parameters
+            search_results: Search response contents from the scraper agents
+            conversation_id: Conversation ID for this interaction
+            on_event: Optional callback receiving the "ranked" and "comparison" events
+            started: Optional time.perf_counter() value when the query started, for analytics latency
             
-            # 2. Send search requests to each scraper agent
-            search_results = []
+        Returns:
+            A formatted response string with the search results
+        """
+        # Count total number of products before aggregation
+        total_products_before = sum(
+            len(result.get("products", [])) for result in search_results
+        )
+        self.logger.info(f"Total products before aggregation: {total_products_before}")
+        
+        # 3. Aggregate and rank results
+        aggregate_message = MCPMessage(
+            sender="Controller",
+            receiver="ResultsAggregatorAgent",
+            content={
+                "original_query": query,
+                "search_params": search_params,
+                "results": search_results
+            },
+            message_type="AGGREGATE_REQUEST",
+            conversation_id=conversation_id
+        )
+        aggregate_response = self.aggregator_agent.process_message(aggregate_message)
+        self.conversation_history[conversation_id].append((aggregate_message, aggregate_response))
+        
+        if aggregate_response.message_type == "ERROR":
+            return f"Error aggregating results: {aggregate_response.content.get('error', 'Unknown error')}"
+        
+        # 4. Compare similar products across sites
+        # Extract all products from the aggregated results
+        all_products = aggregate_response.content.get("top_products", [])
+        
+        # FIX: If aggregation filtered out all products but we had products before,
+        # use the raw search results instead
+        if not all_products and total_products_before > 0:
+            self.logger.warning("Aggregation returned no products despite having search results. Using raw search results.")
+            all_products = []
+            for result in search_results:
+                if "products" in result:
+                    all_products.extend(result["products"][:5])  # Take top 5 from each source
+        
+        if not all_products:
+            return "I couldn't find any products matching your search. Could you try a different query?"
+        
+        # Log the number of products after aggregation
+        self.logger.info(f"Products after aggregation: {len(all_products)}")
+        self._emit(on_event, "ranked", {
+            "top_products": all_products,
+            "total_results": aggregate_response.content.get("total_results", 0),
+            "selected_results": aggregate_response.content.get("selected_results", 0)
+        })
+        
+        compare_message = MCPMessage(
+            sender="Controller",
+            receiver="ProductComparisonAgent",
+            content={
+                "original_query": query,
+                "search_params": search_params,
+                "all_products": all_products
+            },
+            message_type="COMPARE_REQUEST",
+            conversation_id=conversation_id
+        )
+        compare_response = self.comparison_agent.process_message(compare_message)
+        self.conversation_history[conversation_id].append((compare_message, compare_response))
+        
+        if compare_response.message_type == "ERROR":
+            self.logger.warning(f"Error comparing products: {compare_response.content}")
+            # Continue without comparison results
+            comparison_results = None
+        else:
+            comparison_results = compare_response.content
+            self._emit(on_event, "comparison", {"comparison_results": comparison_results})
+
+        # Store product memory for follow-up queries
+        store_message = MCPMessage(
+            sender="Controller",
+            receiver="ChatMemoryAgent",
+            message_type="MEMORY_STORE",
+            content={
+                "query": query,
+                "products": all_products,
+            },
+            conversation_id=conversation_id
+        )
+        self.chat_memory_agent.process_message(store_message)
+        print("[DEBUG] Stored products in memory:", len(all_products))
+        
+        # 5. Format and present results with comparison highlights
+        present_message = MCPMessage(
+            sender="Controller",
+            receiver="PresentationAgent",
+            content={
+                "original_query": query,
+                "search_params": search_params,
+                "top_products": all_products,
+                "grouped_results": aggregate_response.content.get("grouped_results", {}),
+                "comparison_results": comparison_results,
+                "total_results": aggregate_response.content.get("total_results", 0),
+                "selected_results": aggregate_response.content.get("selected_results", 0)
+            },
+            message_type="PRESENT_REQUEST",
+            conversation_id=conversation_id
+        )
+        present_response = self.presentation_agent.process_message(present_message)
+        self.conversation_history[conversation_id].append((present_message, present_response))
+        
+        if present_response.message_type == "ERROR":
+            return f"Error presenting results: {present_response.content.get('error', 'Unknown error')}"
+        
+        # 6. Store the product data in chat memory for future reference
+        memory_store_message = MCPMessage(
+            sender="Controller",
+            receiver="ChatMemoryAgent",
+            message_type="MEMORY_STORE",
+            content={
+                "query": query,
+                "search_params": search_params,
+                "products": all_products,
+                "context": {
+                    "comparison_results": comparison_results
+                }
+            },
+            conversation_id=conversation_id
+        )
+        memory_store_response = self.chat_memory_agent.process_message(memory_store_message)
+        self.conversation_history[conversation_id].append((memory_store_message, memory_store_response))
+        
+        if memory_store_response.message_type == "ERROR":
+            self.logger.warning(f"Error storing memory: {memory_store_response.content}")
+        else:
+            self.logger.info("Successfully stored search results in memory")
+        
+        # 7. Log the complete interaction for future analytics
+        latency_ms = (time.perf_counter() - started) * 1000 if started is not None else None
+        self._log_interaction(query, search_params, aggregate_response.content, search_results, latency_ms)
+        
+        # Return the formatted response
+        return present_response.content["formatted_response"]
+        
+    def _search_all_sources(self, 
+                            search_params: Dict[str, Any], 
+                            conversation_id: str,
+                            on_event: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
+        """
+        Send the search request to every scraper agent concurrently and gather the results.
+        
+        Sources that fail or miss the per-source deadline are logged and skipped, so the
+        caller always gets whatever partial results arrived in time.
+        
+        Args:
+            search_params: Parsed search parameters to send to each scraper
+            conversation_id: Conversation ID for this interaction
+            on_event: Optional callback receiving a "source" event as each source's products arrive
             
-            # Amazon search
-            amazon_message = MCPMessage(
+        Returns:
+            List of successful search response contents, in scraper registry order
+        """
+        messages = {}
+        futures = {}
+        for source, agent in self.scraper_agents.items():
+            message = MCPMessage(
                 sender="Controller",
-                receiver="AmazonScraperAgent",
+                receiver=agent.name,
                 content=search_params,
                 message_type="SEARCH_REQUEST",
                 conversation_id=conversation_id
             )
-            amazon_response = self.scraper_agents["amazon"].process_message(amazon_message)
-            self.conversation_history[conversation_id].append((amazon_message, amazon_response))
-            
-            # if amazon_response.message_type != "ERROR":
-            #     search_results.append(amazon_response.content)
-            #     # Debug: Log the number of Amazon products
-            #     if "products" in amazon_response.content:
-            #         self.logger.info(f"Amazon returned {len(amazon_response.content['products'])} products")
-            # else:
-            #     self.logger.warning(f"Amazon search error: {amazon_response.content}")
-            if amazon_response.message_type != "ERROR":
-                # Add this debug print
-                self.logger.info(f"Amazon response content: {amazon_response.content}")
+            messages[source] = message
+            futures[source] = self.search_executor.submit(agent.process_message, message)
+        
+        # All sources start together, so one timeout bounds each source by the same deadline.
+        # Responses are collected as they complete so each source can be reported immediately.
+        sources = {future: source for source, future in futures.items()}
+        results_by_source = {}
+        try:
+            for future in as_completed(futures.values(), timeout=config.SEARCH_SOURCE_DEADLINE):
+                source = sources[future]
+                try:
+                    response = future.result()
+                except Exception as e:
+                    self.logger.warning(f"{source} search failed: {str(e)}")
+                    continue
                 
-                if "products" in amazon_response.content:
-                    products_list = amazon_response.content["products"]
-                    self.logger.info(f"Amazon returned {len(products_list)} products")
-                    search_results.append(amazon_response.content)
-                else:
-                    self.logger.warning("No 'products' field in Amazon response")
-            else:
-                self.logger.warning(f"Amazon search error: {amazon_response.content}")
-            # Walmart search
-            walmart_message = MCPMessage(
-                sender="Controller",
-                receiver="WalmartScraperAgent",
-                content=search_params,
-                message_type="SEARCH_REQUEST",
-                conversation_id=conversation_id
-            )
-            walmart_response = self.scraper_agents["walmart"].process_message(walmart_message)
-            self.conversation_history[conversation_id].append((walmart_message, walmart_response))
-            
-            if walmart_response.message_type != "ERROR":
-                search_results.append(walmart_response.content)
-                # Debug: Log the number of Walmart products
-                if "products" in walmart_response.content:
-                    self.logger.info(f"Walmart returned {len(walmart_response.content['products'])} products")
-            else:
-                self.logger.warning(f"Walmart search error: {walmart_response.content}")
+                result = self._collect_search_response(source, messages[source], response, conversation_id, on_event)
+                if result is not None:
+                    results_by_source[source] = result
+        except FuturesTimeoutError:
+            for source, future in futures.items():
+                if not future.done():
+                    future.cancel()
+                    self.logger.warning(
+                        f"{source} search missed the {config.SEARCH_SOURCE_DEADLINE}s deadline, continuing without it"
+                    )
+        
+        search_results = [results_by_source[source] for source in futures if source in results_by_source]
+        self.logger.info(f"Received results from {len(search_results)}/{len(futures)} sources")
+        return search_results
+    
+    async def _async_search_all_sources(self, 
+                                        search_params: Dict[str, Any], 
+                                        conversation_id: str,
+                                        on_event: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
+        """
+        Await the search request on every scraper agent together and gather the results.
+        
+        Each source is bounded by the per-source deadline; sources that fail or time out
+        are logged and skipped so partial results are still returned.
+        
+        Args:
+            search_params: Parsed search parameters to send to each scraper
+            conversation_id: Conversation ID for this interaction
+            on_event: Optional callback receiving a "source" event as each source's products arrive
             
-            # eBay search
-            ebay_message = MCPMessage(
+        Returns:
+            List of successful search response contents, in scraper registry order
+        """
+        messages = {}
+        for source, agent in self.scraper_agents.items():
+            messages[source] = MCPMessage(
                 sender="Controller",
-                receiver="EbayScraperAgent",
+                receiver=agent.name,
                 content=search_params,
                 message_type="SEARCH_REQUEST",
                 conversation_id=conversation_id
             )
-            ebay_response = self.scraper_agents["ebay"].process_message(ebay_message)
-            self.conversation_history[conversation_id].append((ebay_message, ebay_response))
-            
-            if ebay_response.message_type != "ERROR":
-                search_results.append(ebay_response.content)
-                # Debug: Log the number of eBay products
-                if "products" in ebay_response.content:
-                    self.logger.info(f"eBay returned {len(ebay_response.content['products'])} products")
-            else:
-                self.logger.warning(f"eBay search error: {ebay_response.content}")
-            
-            # Count total number of products before aggregation
-            total_products_before = sum(
-                len(result.get("products", [])) for result in search_results
-            )
-            self.logger.info(f"Total products before aggregation: {total_products_before}")
-            
-            # 3. Aggregate and rank results
-            aggregate_message = MCPMessage(
-                sender="Controller",
-                receiver="ResultsAggregatorAgent",
-                content={
-                    "original_query": query,
-                    "search_params": search_params,
-                    "results": search_results
-                },
-                message_type="AGGREGATE_REQUEST",
-                conversation_id=conversation_id
-            )
-            aggregate_response = self.aggregator_agent.process_message(aggregate_message)
-            self.conversation_history[conversation_id].append((aggregate_message, aggregate_response))
-            
-            if aggregate_response.message_type == "ERROR":
-                return f"Error aggregating results: {aggregate_response.content.get('error', 'Unknown error')}"
-            
-            # 4. Compare similar products across sites
-            # Extract all products from the aggregated results
-            all_products = aggregate_response.content.get("top_products", [])
-            
-            # FIX: If aggregation filtered out all products but we had products before,
-            # use the raw search results instead
-            if not all_products and total_products_before > 0:
-                self.logger.warning("Aggregation returned no products despite having search results. Using raw search results.")
-                all_products = []
-                for result in search_results:
-                    if "products" in result:
-                        all_products.extend(result["products"][:5])  # Take top 5 from each source
-            
-            if not all_products:
-                return "I couldn't find any products matching your search. Could you try a different query?"
-            
-            # Log the number of products after aggregation
-            self.logger.info(f"Products after aggregation: {len(all_products)}")
-            
-            compare_message = MCPMessage(
-                sender="Controller",
-                receiver="ProductComparisonAgent",
-                content={
-                    "original_query": query,
-                    "search_params": search_params,
-                    "all_products": all_products
-                },
-                message_type="COMPARE_REQUEST",
-                conversation_id=conversation_id
-            )
-            compare_response = self.comparison_agent.process_message(compare_message)
-            self.conversation_history[conversation_id].append((compare_message, compare_response))
-            
-            if compare_response.message_type == "ERROR":
-                self.logger.warning(f"Error comparing products: {compare_response.content}")
-                # Continue without comparison results
-                comparison_results = None
-            else:
-                comparison_results = compare_response.content
-
-            # Store product memory for follow-up queries
-            store_message = MCPMessage(
-                sender="Controller",
-                receiver="ChatMemoryAgent",
-                message_type="MEMORY_STORE",
-                content={
-                    "query": query,
-                    "products": all_products,
-                },
-                conversation_id=conversation_id
-            )
-            self.chat_memory_agent.process_message(store_message)
-            print("[DEBUG] Stored products in memory:", len(all_products))
-            
-            # 5. Format and present results with comparison highlights
-            present_message = MCPMessage(
-                sender="Controller",
-                receiver="PresentationAgent",
-                content={
-                    "original_query": query,
-                    "search_params": search_params,
-                    "top_products": all_products,
-                    "grouped_results": aggregate_response.content.get("grouped_results", {}),
-                    "comparison_results": comparison_results,
-                    "total_results": aggregate_response.content.get("total_results", 0),
-                    "selected_results": aggregate_response.content.get("selected_results", 0)
-                },
-                message_type="PRESENT_REQUEST",
-                conversation_id=conversation_id
-            )
-            present_response = self.presentation_agent.process_message(present_message)
-            self.conversation_history[conversation_id].append((present_message, present_response))
-            
-            if present_response.message_type == "ERROR":
-                return f"Error presenting results: {present_response.content.get('error', 'Unknown error')}"
-            
-            # 6. Store the product data in chat memory for future reference
-            memory_store_message = MCPMessage(
-                sender="Controller",
-                receiver="ChatMemoryAgent",
-                message_type="MEMORY_STORE",
-                content={
-                    "query": query,
-                    "search_params": search_params,
-                    "products": all_products,
-                    "context": {
-                        "comparison_results": comparison_results
-                    }
-                },
-                conversation_id=conversation_id
+        
+        async def search(source: str, message: MCPMessage) -> Optional[Dict[str, Any]]:
+            response = await asyncio.wait_for(
+                self.scraper_agents[source].async_process_message(message),
+                timeout=config.SEARCH_SOURCE_DEADLINE
             )
-            memory_store_response = self.chat_memory_agent.process_message(memory_store_message)
-            self.conversation_history[conversation_id].append((memory_store_message, memory_store_response))
-            
-            if memory_store_response.message_type == "ERROR":
-                self.logger.warning(f"Error storing memory: {memory_store_response.content}")
-            else:
-                self.logger.info("Successfully stored search results in memory")
-            
-            # 7. Log the complete interaction for future analytics
-            self._log_interaction(query, search_params, aggregate_response.content)
-            
-            # Return the formatted response
-            return present_response.content["formatted_response"]
+            # Collected on completion so each source can be reported immediately
+            return self._collect_search_response(source, message, response, conversation_id, on_event)
+        
+        results = await asyncio.gather(
+            *(search(source, message) for source, message in messages.items()),
+            return_exceptions=True
+        )
+        
+        search_results = []
+        for source, result in zip(messages, results):
+            if isinstance(result, asyncio.TimeoutError):
+                self.logger.warning(
+                    f"{source} search missed the {config.SEARCH_SOURCE_DEADLINE}s deadline, continuing without it"
+                )
+                continue
+            
+            if isinstance(result, Exception):
+                self.logger.warning(f"{source} search failed: {str(result)}")
+                continue
+            
+            if result is not None:
+                search_results.append(result)
+        
+        self.logger.info(f"Received results from {len(search_results)}/{len(messages)} sources")
+        return search_results
+    
+    def _collect_search_response(self, 
+                                 source: str, 
+                                 message: MCPMessage, 
+                                 response: MCPMessage, 
+                                 conversation_id: str,
+                                 on_event: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Record a scraper response and report its products if it returned any.
+        
+        Args:
+            source: Source name of the scraper agent
+            message: The search request that was sent
+            response: The scraper agent's response
+            conversation_id: Conversation ID for this interaction
+            on_event: Optional callback receiving a "source" event with the products
             
-        except Exception as e:
-            self.logger.error(f"Error processing query: {str(e)}")
-            return f"Sorry, there was an error processing your request: {str(e)}"
+        Returns:
+            The response contents if it returned products, otherwise None
+        """
+        self.conversation_history[conversation_id].append((message, response))
+        
+        if response.message_type == "ERROR":
+            self.logger.warning(f"{source} search error: {response.content}")
+            return None
+        
+        if "products" not in response.content:
+            self.logger.warning(f"No 'products' field in {source} response")
+            return None
+        
+        self.logger.info(f"{source} returned {len(response.content['products'])} products")
+        self._emit(on_event, "source", {"source": source, "products": response.content["products"]})
+        return response.content
+    
+    def _emit(self, 
+              on_event: Optional[Callable[[str, Dict[str, Any]], None]], 
+              event: str, 
+              data: Dict[str, Any]) -> None:
+        """
+        Report a completed stage to the caller's event callback.
+        
+        Callback errors are logged and never fail the query.
+        
+        Args:
+            on_event: The callback, or None
+            event: Event name
+            data: Event payload
+        """
+        if on_event is None:
+            return
         
+        try:
+            on_event(event, data)
+        except Exception as e:
+            self.logger.warning(f"Error delivering '{event}' event: {str(e)}")
+    
+    @llm_call_site("follow_up_response")
     def _handle_follow_up(self, query: str, referenced_products: List[Dict[str, Any]], conversation_id: str) -> str:
         """
         Handle follow-up questions about specific products.
@@ -827,14 +1056,23 @@ Updated Controller with enhanced debugging and fallback options
             self.logger.error(f"Error handling follow-up: {str(e)}")
             return f"I'm sorry, I had trouble understanding your follow-up question. Could you try asking in a different way?"
             
-    def _log_interaction(self, query: str, search_params: Dict[str, Any], results: Dict[str, Any]) -> None:
+    def _log_interaction(self, 
+                         query: str, 
+                         search_params: Dict[str, Any], 
+                         results: Dict[str, Any],
+                         search_results: Optional[List[Dict[str, Any]]] = None,
+                         latency_ms: Optional[float] = None) -> None:
         """
         Log the interaction for future analysis.
         
+        The entry is buffered by the analytics sink and written in the background.
+        
         Args:
             query: The original user query
             search_params: The parsed search parameters
             results: The aggregated results
+            search_results: Optional search response contents, for per-source product counts
+            latency_ms: Optional time taken to answer the query
         """
         try:
             if not config.ENABLE_ANALYTICS:
@@ -847,12 +1085,16 @@ Updated Controller with enhanced debugging and fallback options
                 "results_summary": {
                     "total_results": results.get("total_results", 0),
                     "selected_results": results.get("selected_results", 0),
-                    "sources": list(results.get("grouped_results", {}).keys())
-                }
+                    "sources": list(results.get("grouped_results", {}).keys()),
+                    "source_counts": {
+                        result.get("source", "unknown"): len(result.get("products", []))
+                        for result in search_results or []
+                    }
+                },
+                "latency_ms": round(latency_ms, 1) if latency_ms is not None else None
             }
             
-            with open(config.ANALYTICS_FILE, "a") as f:
-                f.write(json.dumps(log_entry) + "\n")
+            get_analytics_sink().record(log_entry)
                 
         except Exception as e:
             self.logger.error(f"Error logging interaction: {str(e)}")
@@ -31,13 +31,14 @@ class DealFinderControllerAdapter:
         # Track which controller is used for each session
         self.session_controllers = {}
     
-    def process_user_query(self, query: str, session_id: str = None) -> str:
+    def process_user_query(self, query: str, session_id: str = None, on_event=None) -> str:
         """
         Process a user query using the appropriate controller.
         
         Args:
             query: The user query string
             session_id: Optional session ID for conversation tracking
+            on_event: Optional callback receiving (event, data) as each stage completes
             
         Returns:
             A formatted response string with the search results
@@ -54,9 +55,9 @@ class DealFinderControllerAdapter:
         
         # Route to the appropriate controller
         if use_langchain:
-            return self.langchain_controller.process_user_query(query, session_id)
+            return self.langchain_controller.process_user_query(query, session_id, on_event)
         else:
-            return self.original_controller.process_user_query(query, session_id)
+            return self.original_controller.process_user_query(query, session_id, on_event)
     
     def display_welcome_message(self) -> str:
         """Display welcome message using the appropriate controller."""
@@ -4,7 +4,7 @@ Utilities module for DealFinder AI.
 This module contains utility functions used throughout the application.
 """
 
-from dealfinder.utils.logging import setup_logging, get_logger
+from dealfinder.utils.logging import setup_logging, get_logger, get_logging_stats
 from dealfinder.utils.parsing import (
     parse_price_range,
     extract_brands,
@@ -12,13 +12,79 @@ from dealfinder.utils.parsing import (
     extract_features,
     normalize_search_params,
 )
+from dealfinder.utils.http import HttpTransport, AsyncHttpTransport, get_transport, get_async_transport
+from dealfinder.utils.rate_limit import HostRateLimiter, RateLimitExceeded, get_rate_limiter
+from dealfinder.utils.circuit_breaker import CircuitBreaker, CircuitOpenError, get_circuit_breaker, circuit_breaker_stats
+from dealfinder.utils.markup import parse_html, parse_search_page, minify_html_fragment
+from dealfinder.utils.matching import group_similar_titles
+from dealfinder.utils.relevance import RelevanceMatcher, compile_terms
+from dealfinder.utils.ranking import score_products, top_k_indices
+from dealfinder.utils.memory_store import (
+    ConversationStore,
+    SharedConversationStore,
+    get_conversation_store,
+    get_session_store,
+)
+from dealfinder.utils.follow_up import FollowUpClassifier, get_follow_up_classifier
+from dealfinder.utils.llm_clients import LLMClientRegistry, LLMBudgetExceeded, get_llm_registry
+from dealfinder.utils.jobs import JobManager, JobQueueFull, get_job_manager
+from dealfinder.utils.metrics import llm_call_site, render_metrics
+from dealfinder.utils.tracing import start_span, traced, get_tracer, render_waterfall
+from dealfinder.utils.analytics import AnalyticsSink, load_analytics, get_analytics_sink
+from dealfinder.utils.cache import TTLCache, search_cache_key, llm_cache_key, get_search_cache, get_llm_cache
 
 __all__ = [
     'setup_logging',
     'get_logger',
+    'get_logging_stats',
     'parse_price_range',
     'extract_brands',
     'parse_sort_preference',
     'extract_features',
     'normalize_search_params',
+    'HttpTransport',
+    'AsyncHttpTransport',
+    'get_transport',
+    'get_async_transport',
+    'HostRateLimiter',
+    'RateLimitExceeded',
+    'get_rate_limiter',
+    'CircuitBreaker',
+    'CircuitOpenError',
+    'get_circuit_breaker',
+    'circuit_breaker_stats',
+    'parse_html',
+    'parse_search_page',
+    'minify_html_fragment',
+    'group_similar_titles',
+    'RelevanceMatcher',
+    'compile_terms',
+    'score_products',
+    'top_k_indices',
+    'ConversationStore',
+    'SharedConversationStore',
+    'get_conversation_store',
+    'get_session_store',
+    'FollowUpClassifier',
+    'get_follow_up_classifier',
+    'LLMClientRegistry',
+    'LLMBudgetExceeded',
+    'get_llm_registry',
+    'JobManager',
+    'JobQueueFull',
+    'get_job_manager',
+    'llm_call_site',
+    'render_metrics',
+    'start_span',
+    'traced',
+    'get_tracer',
+    'render_waterfall',
+    'AnalyticsSink',
+    'load_analytics',
+    'get_analytics_sink',
+    'TTLCache',
+    'search_cache_key',
+    'llm_cache_key',
+    'get_search_cache',
+    'get_llm_cache',
 ]
\ No newline at end of file
@@ -0,0 +1,532 @@
+"""
+Query analytics for DealFinder AI.
+
+This module records one entry per completed query without blocking the
+request: entries are buffered in memory and appended to the analytics file by
+a background thread. The file is rotated by size and age, and closed segments
+are compacted into compressed columnar NumPy archives (.npz), which the query
+API reads to report top queries, per-source yield and latency percentiles.
+"""
+
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+import weakref
+from collections import Counter, deque
+from datetime import datetime
+from typing import Dict, Any, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from dealfinder import config
+from dealfinder.utils.logging import get_logger
+
+logger = get_logger("Analytics")
+
+def _timestamp(value: Any) -> float:
+    """Convert an entry's ISO timestamp to seconds since the epoch, NaN if missing."""
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        return float("nan")
+
+def _number(value: Any, default: float) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+def entries_to_columns(entries: Iterable[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """
+    Convert analytics entries to columns.
+
+    Per-source product counts are stored in long format: one row per source of
+    each entry, pointing back to the entry's row.
+
+    Args:
+        entries: Analytics entries as written by AnalyticsSink
+
+    Returns:
+        Dictionary of column name to array
+    """
+    timestamps, queries, totals, selected, latencies = [], [], [], [], []
+    source_rows, source_names, source_counts = [], [], []
+
+    for row, entry in enumerate(entries):
+        summary = entry.get("results_summary") or {}
+        timestamps.append(_timestamp(entry.get("timestamp")))
+        queries.append(str(entry.get("query", "")))
+        totals.append(int(_number(summary.get("total_results"), 0)))
+        selected.append(int(_number(summary.get("selected_results"), 0)))
+        latencies.append(_number(entry.get("latency_ms"), float("nan")))
+
+        counts = summary.get("source_counts") or {source: -1 for source in summary.get("sources", [])}
+        for source, count in counts.items():
+            source_rows.append(row)
+            source_names.append(str(source))
+            source_counts.append(int(_number(count, -1)))
+
+    return {
+        "timestamp": np.array(timestamps, dtype=np.float64),
+        "query": np.array(queries, dtype=str),
+        "total_results": np.array(totals, dtype=np.int64),
+        "selected_results": np.array(selected, dtype=np.int64),
+        "latency_ms": np.array(latencies, dtype=np.float64),
+        "source_row": np.array(source_rows, dtype=np.int64),
+        "source_name": np.array(source_names, dtype=str),
+        "source_count": np.array(source_counts, dtype=np.int64),
+    }
+
+def read_jsonl_segment(path: str) -> List[Dict[str, Any]]:
+    """
+    Read the entries of a JSON lines segment, skipping malformed lines.
+
+    Args:
+        path: Segment path
+
+    Returns:
+        List of entries
+    """
+    entries = []
+    with open(path) as f:
+        for line in f:
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return entries
+
+def write_columnar_segment(path: str, columns: Dict[str, np.ndarray]) -> None:
+    """
+    Write columns to a compressed .npz archive, atomically.
+
+    Args:
+        path: Destination path
+        columns: Dictionary of column name to array
+    """
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as f:
+        np.savez_compressed(f, **columns)
+    os.replace(temp_path, path)
+
+def read_columnar_segment(path: str) -> Dict[str, np.ndarray]:
+    """
+    Read the columns of a compressed .npz archive.
+
+    Args:
+        path: Archive path
+
+    Returns:
+        Dictionary of column name to array
+    """
+    with np.load(path, allow_pickle=False) as archive:
+        return {name: archive[name] for name in archive.files}
+
+class AnalyticsTable:
+    """Columnar view of analytics entries with the report queries"""
+
+    def __init__(self, segments: Sequence[Dict[str, np.ndarray]]):
+        """
+        Concatenate segments into one table.
+
+        Args:
+            segments: Column dictionaries as returned by entries_to_columns
+        """
+        segments = [segment for segment in segments if len(segment["timestamp"])]
+        if not segments:
+            segments = [entries_to_columns([])]
+
+        offsets = np.cumsum([0] + [len(segment["timestamp"]) for segment in segments[:-1]])
+        self.columns = {
+            name: np.concatenate([segment[name] for segment in segments])
+            for name in segments[0] if name != "source_row"
+        }
+        # Source rows index into their own segment, so shift them to the combined table
+        self.columns["source_row"] = np.concatenate([
+            segment["source_row"] + offset for segment, offset in zip(segments, offsets)
+        ])
+
+    def __len__(self) -> int:
+        return len(self.columns["timestamp"])
+
+    def _rows(self, since: Optional[float]) -> np.ndarray:
+        """Boolean mask of entries at or after a time."""
+        if since is None:
+            return np.ones(len(self), dtype=bool)
+        return self.columns["timestamp"] >= since
+
+    def top_queries(self, limit: int = 10, since: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Get the most frequent queries.
+
+        Queries are compared case-insensitively with whitespace collapsed.
+
+        Args:
+            limit: Number of queries to return
+            since: Optional start time in seconds since the epoch
+
+        Returns:
+            List of dictionaries with the query and its count, most frequent first
+        """
+        queries = self.columns["query"][self._rows(since)]
+        counts = Counter(" ".join(query.lower().split()) for query in queries)
+        return [{"query": query, "count": count} for query, count in counts.most_common(limit)]
+
+    def source_yield(self, since: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Get how many products each source contributed to queries.
+
+        Args:
+            since: Optional start time in seconds since the epoch
+
+        Returns:
+            Dictionary keyed by source with the number of queries it answered,
+            total and mean products, and the fraction of queries with no products.
+            Entries written before per-source counts were recorded only count
+            towards "queries".
+        """
+        in_range = self._rows(since)[self.columns["source_row"]]
+        names = self.columns["source_name"][in_range]
+        counts = self.columns["source_count"][in_range]
+
+        report = {}
+        for source in np.unique(names):
+            source_counts = counts[names == source]
+            known = source_counts[source_counts >= 0]
+            report[str(source)] = {
+                "queries": int(len(source_counts)),
+                "products": int(known.sum()),
+                "mean_products": round(float(known.mean()), 2) if len(known) else None,
+                "empty_rate": round(float((known == 0).mean()), 3) if len(known) else None,
+            }
+        return report
+
+    def latency_percentiles(self,
+                            percentiles: Sequence[float] = (50, 90, 95, 99),
+                            since: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Get query latency percentiles.
+
+        Args:
+            percentiles: Percentiles to compute
+            since: Optional start time in seconds since the epoch
+
+        Returns:
+            Dictionary with the number of timed queries and each percentile in
+            milliseconds (None when no query was timed)
+        """
+        latencies = self.columns["latency_ms"][self._rows(since)]
+        latencies = latencies[~np.isnan(latencies)]
+
+        report = {"count": int(len(latencies))}
+        for percentile in percentiles:
+            report[f"p{percentile:g}"] = round(float(np.percentile(latencies, percentile)), 1) if len(latencies) else None
+        return report
+
+class AnalyticsSink:
+    """Buffered analytics writer with a background flush thread, segment rotation and compaction"""
+
+    def __init__(self,
+                 path: str,
+                 buffer_size: int = 10000,
+                 flush_interval: float = 2,
+                 max_segment_bytes: int = 16 * 1024 * 1024,
+                 max_segment_age: float = 3600,
+                 compact_interval: float = 300):
+        """
+        Initialize the sink and start its background thread.
+
+        Entries are appended to path, the active segment. When it grows past
+        max_segment_bytes or gets older than max_segment_age it is renamed to
+        "<path>.<timestamp>.jsonl", and closed segments are later rewritten as
+        "<path>.<timestamp>.npz". Several processes may share the same path.
+
+        Args:
+            path: Active analytics segment
+            buffer_size: Maximum entries buffered in memory (the oldest are dropped when full)
+            flush_interval: Seconds between flushes of the buffer to disk
+            max_segment_bytes: Size at which the active segment is rotated
+            max_segment_age: Age in seconds at which the active segment is rotated
+            compact_interval: Seconds between compactions of closed segments, 0 to disable
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_age = max_segment_age
+        self.compact_interval = compact_interval
+
+        self._buffer = deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._segment_started = self._first_entry_time()
+        self._last_compaction = time.time()
+        self._stats = {"recorded": 0, "dropped": 0, "written": 0, "flushes": 0,
+                       "rotations": 0, "compactions": 0, "errors": 0}
+
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = threading.Thread(
+            target=AnalyticsSink._run,
+            args=(weakref.ref(self), self._stop, self._wake, flush_interval),
+            name="analytics-writer",
+            daemon=True
+        )
+        self._thread.start()
+
+    def record(self, entry: Dict[str, Any]) -> None:
+        """
+        Buffer an entry for writing. Never blocks on I/O.
+
+        Args:
+            entry: JSON-serializable analytics entry
+        """
+        with self._lock:
+            if len(self._buffer) == self._buffer.maxlen:
+                self._stats["dropped"] += 1
+            self._buffer.append(entry)
+            self._stats["recorded"] += 1
+
+    def flush(self) -> int:
+        """
+        Write buffered entries to the active segment, rotating it if due.
+
+        Returns:
+            Number of entries written
+        """
+        with self._lock:
+            entries = list(self._buffer)
+            self._buffer.clear()
+
+        with self._io_lock:
+            if entries:
+                try:
+                    lines = "".join(json.dumps(entry, default=str) + "\n" for entry in entries)
+                    with open(self.path, "a") as f:
+                        f.write(lines)
+                    if self._segment_started is None:
+                        self._segment_started = time.time()
+                except (OSError, TypeError, ValueError) as e:
+                    logger.error(f"Error writing analytics to {self.path}: {str(e)}")
+                    self._count("errors")
+                    return 0
+
+                with self._lock:
+                    self._stats["written"] += len(entries)
+                    self._stats["flushes"] += 1
+
+            self._rotate_if_due()
+        return len(entries)
+
+    def rotate(self) -> Optional[str]:
+        """
+        Close the active segment.
+
+        Returns:
+            Path of the closed segment, or None if there was nothing to rotate
+        """
+        with self._io_lock:
+            return self._rotate()
+
+    def compact(self) -> int:
+        """
+        Rewrite closed JSON lines segments as compressed columnar archives.
+
+        Each segment is claimed by renaming it first, so concurrent compactions
+        in other processes skip it. Claims older than the compaction interval
+        were left by a process that died mid-compaction and are taken back.
+
+        Returns:
+            Number of segments compacted
+        """
+        self._reclaim_stale_claims()
+
+        compacted = 0
+        for segment in sorted(glob.glob(f"{glob.escape(self.path)}.*.jsonl")):
+            claimed = f"{segment}.compacting"
+            try:
+                os.rename(segment, claimed)
+                # Renaming keeps the old modification time, so stamp the claim time for stale claim detection
+                os.utime(claimed)
+            except OSError:
+                continue
+
+            try:
+                columns = entries_to_columns(read_jsonl_segment(claimed))
+                write_columnar_segment(segment[:-len(".jsonl")] + ".npz", columns)
+                os.remove(claimed)
+                compacted += 1
+            except (OSError, ValueError) as e:
+                logger.error(f"Error compacting analytics segment {segment}: {str(e)}")
+                self._count("errors")
+                try:
+                    os.rename(claimed, segment)
+                except OSError:
+                    pass
+
+        self._last_compaction = time.time()
+        if compacted:
+            with self._lock:
+                self._stats["compactions"] += compacted
+            logger.info(f"Compacted {compacted} analytics segments")
+        return compacted
+
+    def table(self) -> AnalyticsTable:
+        """
+        Flush the buffer and load all segments for querying.
+
+        Returns:
+            AnalyticsTable over compacted, closed and active segments
+        """
+        self.flush()
+        return load_analytics(self.path)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get writer counters.
+
+        Returns:
+            Dictionary with recorded, dropped, written and buffered entry counts,
+            and flush, rotation, compaction and error counts
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["buffered"] = len(self._buffer)
+        return stats
+
+    def close(self) -> None:
+        """Stop the background thread and write any buffered entries."""
+        self._stop.set()
+        self._wake.set()
+        self.flush()
+
+    @staticmethod
+    def _run(sink_ref: "weakref.ref", stop: threading.Event, wake: threading.Event, interval: float) -> None:
+        """Background flush loop. Holds only a weak reference so the sink can be collected."""
+        while not stop.is_set():
+            wake.wait(interval)
+            wake.clear()
+            sink = sink_ref()
+            if sink is None:
+                return
+            try:
+                sink.flush()
+                if sink.compact_interval and time.time() - sink._last_compaction >= sink.compact_interval:
+                    sink.compact()
+            except Exception as e:
+                logger.error(f"Error in analytics writer: {str(e)}")
+            del sink
+
+    def _count(self, field: str) -> None:
+        with self._lock:
+            self._stats[field] += 1
+
+    def _first_entry_time(self) -> Optional[float]:
+        """Get the time of the active segment's first entry, None if the segment is empty."""
+        try:
+            with open(self.path) as f:
+                started = _timestamp(json.loads(f.readline()).get("timestamp"))
+        except (OSError, ValueError, AttributeError):
+            return None
+        return None if np.isnan(started) else started
+
+    def _reclaim_stale_claims(self) -> None:
+        """Return segments stranded by an interrupted compaction to the closed segments."""
+        stale_before = time.time() - max(self.compact_interval, self.flush_interval)
+        for claimed in glob.glob(f"{glob.escape(self.path)}.*.jsonl.compacting"):
+            segment = claimed[:-len(".compacting")]
+            try:
+                if os.path.getmtime(claimed) > stale_before:
+                    continue
+                if os.path.exists(segment[:-len(".jsonl")] + ".npz"):
+                    # The archive was written before the process died, only the removal is left
+                    os.remove(claimed)
+                else:
+                    os.rename(claimed, segment)
+                    logger.warning(f"Recovered analytics segment {segment} from an interrupted compaction")
+            except OSError:
+                continue
+
+    def _rotate_if_due(self) -> None:
+        """Rotate the active segment if it is too large or too old. Caller must hold the I/O lock."""
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return
+
+        too_old = self._segment_started is not None and time.time() - self._segment_started >= self.max_segment_age
+        if size >= self.max_segment_bytes or (too_old and size > 0):
+            self._rotate()
+
+    def _rotate(self) -> Optional[str]:
+        """Rename the active segment to a closed segment. Caller must hold the I/O lock."""
+        closed = f"{self.path}.{datetime.now().strftime('%Y%m%d%H%M%S%f')}.jsonl"
+        try:
+            os.rename(self.path, closed)
+        except OSError:
+            # Nothing written yet, or another process rotated it first
+            return None
+
+        self._segment_started = None
+        self._count("rotations")
+        logger.info(f"Rotated analytics segment to {closed}")
+        return closed
+
+def load_analytics(path: str) -> AnalyticsTable:
+    """
+    Load every segment of an analytics file for querying.
+
+    Args:
+        path: The active analytics segment path
+
+    Returns:
+        AnalyticsTable over compacted (.npz), closed (.jsonl), being compacted
+        (.jsonl.compacting) and active segments
+    """
+    segments = []
+    pattern = glob.escape(path)
+    for segment in sorted(glob.glob(f"{pattern}.*.npz")):
+        try:
+            segments.append(read_columnar_segment(segment))
+        except (OSError, ValueError) as e:
+            logger.error(f"Error reading analytics segment {segment}: {str(e)}")
+
+    # Segments being compacted, or stranded by an interrupted compaction, unless already archived
+    claimed = [
+        segment for segment in glob.glob(f"{pattern}.*.jsonl.compacting")
+        if not os.path.exists(segment[:-len(".jsonl.compacting")] + ".npz")
+    ]
+
+    for segment in sorted(glob.glob(f"{pattern}.*.jsonl") + claimed) + [path]:
+        try:
+            segments.append(entries_to_columns(read_jsonl_segment(segment)))
+        except OSError:
+            continue
+
+    return AnalyticsTable(segments)
+
+_sink = None
+_sink_lock = threading.Lock()
+
+def get_analytics_sink() -> AnalyticsSink:
+    """
+    Get the process-wide analytics sink, flushed at interpreter exit.
+
+    Returns:
+        The shared AnalyticsSink instance
+    """
+    global _sink
+    with _sink_lock:
+        if _sink is None:
+            _sink = AnalyticsSink(
+                path=config.ANALYTICS_FILE,
+                buffer_size=config.ANALYTICS_BUFFER_SIZE,
+                flush_interval=config.ANALYTICS_FLUSH_INTERVAL,
+                max_segment_bytes=config.ANALYTICS_SEGMENT_MAX_BYTES,
+                max_segment_age=config.ANALYTICS_SEGMENT_MAX_AGE,
+                compact_interval=config.ANALYTICS_COMPACT_INTERVAL
+            )
+            atexit.register(_sink.close)
+        return _sink
@@ -0,0 +1,311 @@
+"""
+Caching utilities for DealFinder AI.
+
+This module provides a size-bounded LRU cache with per-entry TTLs and an optional
+SQLite backing store, used to avoid repeating identical scraper searches and
+identical LLM prompts.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+from dealfinder import config
+from dealfinder.utils.logging import get_logger
+from dealfinder.utils.metrics import count_cache_lookup
+from dealfinder.utils.parsing import normalize_search_params
+
+logger = get_logger("Cache")
+
+class TTLCache:
+    """Thread-safe LRU cache with per-entry TTL and an optional SQLite backing store"""
+
+    # Number of writes between sweeps of expired rows from the SQLite store
+    PRUNE_INTERVAL = 100
+
+    def __init__(self,
+                 name: str,
+                 max_entries: int,
+                 default_ttl: float,
+                 db_path: Optional[str] = None):
+        """
+        Initialize the cache.
+
+        Values are stored JSON-encoded, so every get returns a fresh copy and
+        entries can be persisted without pickling.
+
+        Args:
+            name: Cache name used in logs and as the SQLite table name
+            max_entries: Maximum number of entries kept in memory and on disk
+            default_ttl: Time to live in seconds for entries set without an explicit TTL
+            db_path: Optional SQLite file used to persist entries across restarts
+        """
+        self.name = name
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+
+        self._entries = OrderedDict()  # key -> (expires_at, encoded value), oldest first
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+        self._writes = 0
+
+        self._db = None
+        if db_path:
+            try:
+                self._db = sqlite3.connect(db_path, check_same_thread=False)
+                self._db.execute(
+                    f"CREATE TABLE IF NOT EXISTS {self.name} "
+                    "(key TEXT PRIMARY KEY, expires_at REAL NOT NULL, value TEXT NOT NULL)"
+                )
+                self._db.commit()
+                logger.info(f"Cache '{self.name}' persisted to {db_path}")
+            except sqlite3.Error as e:
+                logger.error(f"Could not open cache store {db_path}, using memory only: {str(e)}")
+                self._db = None
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get a cached value.
+
+        Args:
+            key: The cache key
+
+        Returns:
+            The cached value, or None if it is missing or expired
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None and self._db is not None:
+                entry = self._load(key)
+                if entry is not None:
+                    self._entries[key] = entry
+                    self._evict()
+
+            if entry is None:
+                self._stats["misses"] += 1
+                count_cache_lookup(self.name, False)
+                return None
+
+            expires_at, encoded = entry
+            if expires_at <= now:
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                self._remove(key)
+                count_cache_lookup(self.name, False)
+                return None
+
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+
+        count_cache_lookup(self.name, True)
+        return json.loads(encoded)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Store a value in the cache.
+
+        Args:
+            key: The cache key
+            value: A JSON-serializable value
+            ttl: Optional time to live in seconds, defaults to the cache's default TTL
+        """
+        try:
+            encoded = json.dumps(value)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Value for cache '{self.name}' is not serializable, skipping: {str(e)}")
+            return
+
+        expires_at = time.time() + (ttl if ttl is not None else self.default_ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, encoded)
+            self._entries.move_to_end(key)
+            self._evict()
+
+            if self._db is not None:
+                self._store(key, expires_at, encoded)
+
+    def delete(self, key: str) -> None:
+        """
+        Remove a value from the cache.
+
+        Args:
+            key: The cache key
+        """
+        with self._lock:
+            self._remove(key)
+
+    def clear(self) -> None:
+        """Remove all values from the cache."""
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                try:
+                    self._db.execute(f"DELETE FROM {self.name}")
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    logger.error(f"Error clearing cache store: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters.
+
+        Returns:
+            Dictionary with hit, miss, eviction and expiration counts, size and hit rate
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._entries)
+
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        stats["persistent"] = self._db is not None
+        return stats
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _evict(self) -> None:
+        """Drop least recently used entries beyond the size bound. Caller must hold the lock."""
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _remove(self, key: str) -> None:
+        """Remove a key from memory and disk. Caller must hold the lock."""
+        self._entries.pop(key, None)
+        if self._db is not None:
+            try:
+                self._db.execute(f"DELETE FROM {self.name} WHERE key = ?", (key,))
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.error(f"Error deleting from cache store: {str(e)}")
+
+    def _load(self, key: str) -> Optional[Tuple[float, str]]:
+        """Load an entry from the SQLite store. Caller must hold the lock."""
+        try:
+            row = self._db.execute(
+                f"SELECT expires_at, value FROM {self.name} WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.error(f"Error reading cache store: {str(e)}")
+            return None
+
+        return (row[0], row[1]) if row else None
+
+    def _store(self, key: str, expires_at: float, encoded: str) -> None:
+        """Write an entry to the SQLite store. Caller must hold the lock."""
+        try:
+            self._db.execute(
+                f"INSERT OR REPLACE INTO {self.name} (key, expires_at, value) VALUES (?, ?, ?)",
+                (key, expires_at, encoded)
+            )
+
+            # Periodically drop expired rows and keep the store within the size bound
+            self._writes += 1
+            if self._writes % self.PRUNE_INTERVAL == 0:
+                self._db.execute(f"DELETE FROM {self.name} WHERE expires_at <= ?", (time.time(),))
+                self._db.execute(
+                    f"DELETE FROM {self.name} WHERE key NOT IN "
+                    f"(SELECT key FROM {self.name} ORDER BY expires_at DESC LIMIT ?)",
+                    (self.max_entries,)
+                )
+
+            self._db.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Error writing cache store: {str(e)}")
+
+def search_cache_key(source: str, search_params: Dict[str, Any]) -> str:
+    """
+    Build a content-addressed cache key for a scraper search.
+
+    The key is a hash of the source and the canonicalized normalized search
+    parameters, so equivalent searches map to the same entry.
+
+    Args:
+        source: Source name (e.g. "amazon")
+        search_params: The search parameters sent to the scraper
+
+    Returns:
+        Hex digest cache key
+    """
+    try:
+        normalized = normalize_search_params(search_params)
+    except (TypeError, ValueError):
+        normalized = dict(search_params)
+
+    canonical = {}
+    for field, value in normalized.items():
+        if isinstance(value, str):
+            value = value.lower()
+        elif isinstance(value, list):
+            value = [item.lower() if isinstance(item, str) else item for item in value]
+            # Brand and feature order does not change the search
+            if field in ("brands", "features"):
+                value = sorted(value)
+        canonical[field] = value
+
+    payload = json.dumps({"source": source.lower(), "params": canonical}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def llm_cache_key(model_name: str, prompt: str) -> str:
+    """
+    Build a cache key for an LLM prompt.
+
+    Args:
+        model_name: Name of the model the prompt is sent to
+        prompt: The full prompt text
+
+    Returns:
+        Hex digest cache key
+    """
+    digest = hashlib.sha256()
+    digest.update(model_name.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(prompt.encode("utf-8"))
+    return digest.hexdigest()
+
+_search_cache = None
+_llm_cache = None
+_cache_lock = threading.Lock()
+
+def get_search_cache() -> TTLCache:
+    """
+    Get the process-wide search result cache shared by all scraper agents.
+
+    Returns:
+        The shared TTLCache instance
+    """
+    global _search_cache
+    with _cache_lock:
+        if _search_cache is None:
+            _search_cache = TTLCache(
+                name="search_results",
+                max_entries=config.SEARCH_CACHE_MAX_ENTRIES,
+                default_ttl=config.SEARCH_CACHE_DEFAULT_TTL,
+                db_path=config.SEARCH_CACHE_DB_PATH
+            )
+        return _search_cache
+
+def get_llm_cache() -> TTLCache:
+    """
+    Get the process-wide LLM response cache shared by all Gemini agents.
+
+    Returns:
+        The shared TTLCache instance
+    """
+    global _llm_cache
+    with _cache_lock:
+        if _llm_cache is None:
+            _llm_cache = TTLCache(
+                name="llm_responses",
+                max_entries=config.LLM_CACHE_MAX_ENTRIES,
+                default_ttl=config.LLM_CACHE_TTL,
+                db_path=config.LLM_CACHE_DB_PATH
+            )
+        return _llm_cache
@@ -0,0 +1,211 @@
+"""
+Per-source circuit breakers for DealFinder AI.
+
+This module tracks the recent fetch outcomes of each retailer source. When too
+many recent fetches fail the source's circuit opens, and searches fail fast
+without spending retries, backoff or a Gemini call on a source that is known
+to be down. After a cool-down one probe request is let through (half-open):
+success closes the circuit, failure reopens it with a longer cool-down.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Dict, Any
+
+from dealfinder import config
+from dealfinder.utils.logging import get_logger
+from dealfinder.utils.metrics import observe_circuit_state, count_circuit_rejection
+
+logger = get_logger("CircuitBreaker")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a source is skipped because its circuit is open"""
+
+class CircuitBreaker:
+    """Thread-safe circuit breaker over a sliding window of recent outcomes"""
+
+    def __init__(self,
+                 name: str,
+                 window_size: int,
+                 window_seconds: float,
+                 min_requests: int,
+                 failure_rate: float,
+                 open_seconds: float,
+                 max_open_seconds: float):
+        """
+        Initialize the circuit breaker.
+
+        Args:
+            name: Source name (e.g. "amazon")
+            window_size: Number of recent outcomes considered
+            window_seconds: Outcomes older than this are ignored
+            min_requests: Outcomes needed in the window before the circuit can open
+            failure_rate: Fraction of failed outcomes that opens the circuit
+            open_seconds: Cool-down before the first probe after opening
+            max_open_seconds: Longest cool-down, reached by doubling after each failed probe
+        """
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_requests = min_requests
+        self.failure_rate = failure_rate
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+
+        self._outcomes = deque(maxlen=window_size)  # (time, succeeded)
+        self._state = CLOSED
+        self._cooldown = open_seconds
+        self._opened_at = 0.0
+        self._probe_started = None
+        self._lock = threading.Lock()
+        self._stats = {"successes": 0, "failures": 0, "rejected": 0, "opened": 0, "probes": 0}
+
+    @property
+    def state(self) -> str:
+        """Current circuit state: "closed", "open" or "half_open"."""
+        with self._lock:
+            return self._state
+
+    def check(self) -> None:
+        """
+        Let a request through, or fail fast if the circuit is open.
+
+        Once the cool-down has passed, one request at a time is let through as
+        a half-open probe.
+
+        Raises:
+            CircuitOpenError: If the source is being skipped
+        """
+        if not config.CIRCUIT_BREAKER_ENABLED:
+            return
+
+        now = time.monotonic()
+        with self._lock:
+            if self._state == CLOSED:
+                return
+
+            # Let a probe through after the cool-down, or replace a probe that never reported back
+            if self._probe_started is None:
+                if now - self._opened_at >= self._cooldown:
+                    self._start_probe(now)
+                    return
+            elif now - self._probe_started >= self._cooldown:
+                self._start_probe(now)
+                return
+
+            retry_in = max(0.0, self._opened_at + self._cooldown - now)
+            self._stats["rejected"] += 1
+
+        count_circuit_rejection(self.name)
+        raise CircuitOpenError(f"{self.name} is temporarily unavailable (circuit open, next probe in {retry_in:.0f}s)")
+
+    def record_success(self) -> None:
+        """Record a successful fetch, closing the circuit if it was a probe."""
+        with self._lock:
+            self._stats["successes"] += 1
+            self._outcomes.append((time.monotonic(), True))
+            if self._state != CLOSED:
+                self._outcomes.clear()
+                self._cooldown = self.open_seconds
+                self._probe_started = None
+                self._transition(CLOSED)
+
+    def record_failure(self) -> None:
+        """Record a failed fetch, opening the circuit if the failure rate is too high."""
+        now = time.monotonic()
+        with self._lock:
+            self._stats["failures"] += 1
+            self._outcomes.append((now, False))
+
+            if self._state == HALF_OPEN:
+                # The probe failed: stay away for longer
+                self._cooldown = min(self.max_open_seconds, self._cooldown * 2)
+                self._open(now)
+            elif self._state == CLOSED:
+                recent = [succeeded for at, succeeded in self._outcomes if at >= now - self.window_seconds]
+                failures = recent.count(False)
+                if len(recent) >= self.min_requests and failures / len(recent) >= self.failure_rate:
+                    self._open(now)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the circuit state and counters.
+
+        Returns:
+            Dictionary with the state, recent failure rate, current cool-down
+            and success, failure, rejection, open and probe counts
+        """
+        now = time.monotonic()
+        with self._lock:
+            recent = [succeeded for at, succeeded in self._outcomes if at >= now - self.window_seconds]
+            stats = dict(self._stats)
+            stats["state"] = self._state
+            stats["recent_requests"] = len(recent)
+            stats["recent_failure_rate"] = round(recent.count(False) / len(recent), 3) if recent else 0.0
+            stats["cooldown_seconds"] = self._cooldown
+        return stats
+
+    def _open(self, now: float) -> None:
+        """Open the circuit. Caller must hold the lock."""
+        self._opened_at = now
+        self._probe_started = None
+        self._stats["opened"] += 1
+        self._transition(OPEN)
+        logger.warning(f"Circuit for {self.name} opened, failing fast for {self._cooldown:.0f}s")
+
+    def _start_probe(self, now: float) -> None:
+        """Let one request through as a probe. Caller must hold the lock."""
+        self._probe_started = now
+        self._stats["probes"] += 1
+        self._transition(HALF_OPEN)
+        logger.info(f"Circuit for {self.name} half-open, probing")
+
+    def _transition(self, state: str) -> None:
+        """Record a state change. Caller must hold the lock."""
+        if state != self._state and state == CLOSED:
+            logger.info(f"Circuit for {self.name} closed")
+        self._state = state
+        observe_circuit_state(self.name, state)
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+def get_circuit_breaker(source: str) -> CircuitBreaker:
+    """
+    Get the process-wide circuit breaker for a source.
+
+    Args:
+        source: Source name (e.g. "amazon")
+
+    Returns:
+        The shared CircuitBreaker for the source
+    """
+    with _breakers_lock:
+        breaker = _breakers.get(source)
+        if breaker is None:
+            breaker = _breakers[source] = CircuitBreaker(
+                name=source,
+                window_size=config.CIRCUIT_WINDOW_SIZE,
+                window_seconds=config.CIRCUIT_WINDOW_SECONDS,
+                min_requests=config.CIRCUIT_MIN_REQUESTS,
+                failure_rate=config.CIRCUIT_FAILURE_RATE,
+                open_seconds=config.CIRCUIT_OPEN_SECONDS,
+                max_open_seconds=config.CIRCUIT_MAX_OPEN_SECONDS
+            )
+            observe_circuit_state(source, CLOSED)
+        return breaker
+
+def circuit_breaker_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Get the state and counters of every source's circuit breaker.
+
+    Returns:
+        Dictionary keyed by source name
+    """
+    with _breakers_lock:
+        breakers = dict(_breakers)
+    return {source: breaker.stats() for source, breaker in breakers.items()}
@@ -0,0 +1,233 @@
+"""
+Local follow-up classification for DealFinder AI.
+
+This module decides whether a query is a follow-up about previously shown
+products or a new search using explicit product references, follow-up phrasing
+and word overlap with the stored product titles. Only queries it cannot decide
+confidently are escalated to Gemini.
+"""
+
+import re
+import threading
+from typing import Dict, Any, List, Optional, Set
+
+from dealfinder import config
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*")
+
+ORDINALS = ["first", "second", "third", "fourth", "fifth", "sixth", "seventh", "eighth", "ninth", "tenth"]
+PRODUCT_NOUNS = r"(?:one|product|item|option|deal|result|listing)"
+
+# Explicit references to a shown product by number: "product 2", "2nd item"
+PRODUCT_NUMBER_PATTERN = re.compile(r"\b(?:product|item|option|deal|result)\s+#?(\d+)\b")
+NUMBERED_PRODUCT_PATTERN = re.compile(r"\b(\d+)(?:st|nd|rd|th)\s+" + PRODUCT_NOUNS + r"\b")
+
+# References by position: "the third one", "last one", "best deal". These phrases also
+# appear in new searches ("the best deal on a 4k tv", "the first edition"), so they only
+# count when the query neither asks for a search nor names new products
+ORDINAL_PATTERN = re.compile(
+    r"\b(?:the\s+(" + "|".join(ORDINALS + ["last"]) + r")\b|(" + "|".join(ORDINALS + ["last"]) + r")\s+" + PRODUCT_NOUNS + r"\b)"
+)
+BEST_DEAL_PATTERN = re.compile(r"\bbest\s+(?:deal|option|choice|product|one)\b")
+
+PRONOUN_PATTERN = re.compile(r"\b(it|its|this|that|these|those|they|them|their)\b")
+
+FOLLOW_UP_PHRASES = [
+    "more info", "tell me more", "more details", "specifications", "specs",
+    "reviews", "ratings", "shipping", "delivery", "warranty", "features",
+    "cheaper", "price", "discount", "compare", "difference", "vs", "versus",
+    "which one", "which is", "how is", "what about", "top pick", "tell me about", "more about",
+]
+FOLLOW_UP_PATTERN = re.compile(r"\b(?:" + "|".join(re.escape(phrase) for phrase in FOLLOW_UP_PHRASES) + r")\b")
+
+SEARCH_PATTERN = re.compile(r"\b(?:find|search|looking for|look for|show me|i need|i want|get me)\b")
+
+# Words that say nothing about which products the user means
+NON_CONTENT_WORDS = {
+    "a", "an", "the", "and", "or", "of", "for", "to", "in", "on", "with", "under", "over", "below", "above",
+    "is", "are", "was", "be", "does", "do", "did", "can", "could", "would", "should", "will", "has", "have",
+    "i", "me", "my", "you", "your", "we", "it", "its", "this", "that", "these", "those", "they", "them", "their",
+    "what", "which", "how", "why", "when", "where", "who", "any", "some", "all", "there", "than", "then",
+    "more", "most", "less", "much", "many", "very", "really", "about", "tell", "show", "find", "search",
+    "looking", "look", "need", "want", "get", "like", "please", "also", "just", "good", "best", "better",
+    "one", "ones", "product", "products", "item", "items", "option", "options", "deal", "deals", "price",
+    "cheap", "cheaper", "cheapest", "buy", "new", "latest", "info", "details", "compare", "vs", "versus",
+    "specifications", "specs", "reviews", "review", "ratings", "rating", "shipping", "delivery",
+    "warranty", "features", "discount", "difference", "last",
+} | set(ORDINALS)
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+def content_words(tokens: List[str]) -> Set[str]:
+    """Get the tokens that describe products rather than phrasing."""
+    return {token for token in tokens if token not in NON_CONTENT_WORDS and not token.isdigit() and len(token) > 1}
+
+def _title_words(title: str) -> Set[str]:
+    """Get a title's content words, with hyphenated model names also split into parts."""
+    words = content_words(tokenize(title))
+    for word in list(words):
+        if "-" in word:
+            words.update(part for part in word.split("-") if len(part) > 1)
+    return words
+
+def _unique_indices(indices: List[int], count: int) -> List[int]:
+    """Drop out of range and repeated indices, keeping the first occurrence order."""
+    unique = []
+    for index in indices:
+        if 0 <= index < count and index not in unique:
+            unique.append(index)
+    return unique
+
+class FollowUpClassifier:
+    """Rule and word-overlap based follow-up classifier with per-tier decision counters"""
+
+    TIERS = ("no_context", "local_follow_up", "local_new_search", "gemini", "legacy_fallback")
+
+    def __init__(self, overlap_threshold: float = 0.5):
+        """
+        Initialize the classifier.
+
+        Args:
+            overlap_threshold: Fraction of the query's content words found in stored
+                titles at or above which the query is about the stored products
+        """
+        self.overlap_threshold = overlap_threshold
+        self._counts = {tier: 0 for tier in self.TIERS}
+        self._lock = threading.Lock()
+
+    def classify(self, query: str, titles: List[str], focused_product: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Classify a query against the stored product titles.
+
+        Args:
+            query: The user's query
+            titles: Titles of the stored products, in display order
+            focused_product: Index of the product currently in focus, if any
+
+        Returns:
+            Dictionary with "decision" ("follow_up", "new_search" or "ambiguous"),
+            "referenced_indices" and "reason"
+        """
+        text = query.lower()
+        tokens = tokenize(text)
+        query_words = content_words(tokens)
+
+        title_words = [_title_words(title) for title in titles]
+        known_words = set().union(*title_words) if title_words else set()
+        overlap = len(query_words & known_words) / len(query_words) if query_words else 0.0
+        is_search = SEARCH_PATTERN.search(text) is not None
+
+        referenced = self._explicit_references(text, len(titles))
+        if referenced:
+            return self._decision("follow_up", referenced, "explicit product reference")
+
+        positional = self._positional_references(text, len(titles))
+        if positional:
+            if is_search or query_words - known_words:
+                return self._decision("ambiguous", [], "positional reference in a possible new search")
+            return self._decision("follow_up", positional, "positional product reference")
+
+        has_pronoun = PRONOUN_PATTERN.search(text) is not None
+        has_follow_up_phrase = FOLLOW_UP_PATTERN.search(text) is not None
+
+        # New product words and search phrasing with nothing pointing back at the results
+        # (a query without product words, e.g. "find me a cheaper one", names no new products)
+        if is_search and query_words and not has_pronoun and overlap < self.overlap_threshold and len(tokens) > 3:
+            return self._decision("new_search", [], "search request for products not shown")
+
+        # A pronoun points back at the results; follow-up phrasing must also stay on the shown products
+        if not is_search and (has_pronoun or (
+                has_follow_up_phrase and (not query_words or overlap >= self.overlap_threshold))):
+            indices = self._lexical_references(query_words, title_words)
+            if not indices and focused_product is not None and 0 <= focused_product < len(titles):
+                indices = [focused_product]
+            return self._decision("follow_up", indices, "follow-up phrasing about shown products")
+
+        # Several product words, none of which appear in the shown titles
+        if not has_pronoun and not has_follow_up_phrase and len(query_words) >= 2 and overlap == 0:
+            return self._decision("new_search", [], "no overlap with shown products")
+
+        return self._decision("ambiguous", [], "no confident local decision")
+
+    def record(self, tier: str) -> None:
+        """
+        Count a decision made by a tier.
+
+        Args:
+            tier: One of TIERS
+        """
+        with self._lock:
+            self._counts[tier] = self._counts.get(tier, 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get decision counters.
+
+        Returns:
+            Dictionary with the number of decisions per tier, the total and the
+            fraction of classified queries decided locally
+        """
+        with self._lock:
+            stats = dict(self._counts)
+
+        classified = sum(stats[tier] for tier in ("local_follow_up", "local_new_search", "gemini", "legacy_fallback"))
+        local = stats["local_follow_up"] + stats["local_new_search"]
+        stats["total"] = classified + stats["no_context"]
+        stats["local_rate"] = round(local / classified, 3) if classified else 0.0
+        return stats
+
+    @staticmethod
+    def _decision(decision: str, indices: List[int], reason: str) -> Dict[str, Any]:
+        return {"decision": decision, "referenced_indices": indices, "reason": reason}
+
+    @staticmethod
+    def _explicit_references(text: str, count: int) -> List[int]:
+        """Find zero-based indices of products referenced by number."""
+        indices = []
+        for match in PRODUCT_NUMBER_PATTERN.finditer(text):
+            indices.append(int(match.group(1)) - 1)
+        for match in NUMBERED_PRODUCT_PATTERN.finditer(text):
+            indices.append(int(match.group(1)) - 1)
+        return _unique_indices(indices, count)
+
+    @staticmethod
+    def _positional_references(text: str, count: int) -> List[int]:
+        """Find zero-based indices of products referenced by ordinal or as the best deal."""
+        indices = []
+        for match in ORDINAL_PATTERN.finditer(text):
+            word = match.group(1) or match.group(2)
+            indices.append(count - 1 if word == "last" else ORDINALS.index(word))
+        if BEST_DEAL_PATTERN.search(text):
+            # Products are shown best deal first
+            indices.append(0)
+        return _unique_indices(indices, count)
+
+    @staticmethod
+    def _lexical_references(query_words: Set[str], title_words: List[Set[str]]) -> List[int]:
+        """Find the single stored product whose title best matches the query's content words."""
+        if not query_words:
+            return []
+
+        scores = [len(query_words & words) for words in title_words]
+        best = max(scores, default=0)
+        if best == 0 or scores.count(best) > 1:
+            return []
+        return [scores.index(best)]
+
+_classifier = None
+_classifier_lock = threading.Lock()
+
+def get_follow_up_classifier() -> FollowUpClassifier:
+    """
+    Get the process-wide follow-up classifier shared by all chat memory agents.
+
+    Returns:
+        The shared FollowUpClassifier instance
+    """
+    global _classifier
+    with _classifier_lock:
+        if _classifier is None:
+            _classifier = FollowUpClassifier(overlap_threshold=config.FOLLOW_UP_OVERLAP_THRESHOLD)
+        return _classifier
@@ -0,0 +1,327 @@
+"""
+Shared HTTP transport for DealFinder AI.
+
+This module provides a pooled, keep-alive HTTP layer used by all scraper agents,
+so repeated requests to the same retailer reuse open TCP/TLS connections.
+Both a blocking (requests) and an asyncio (aiohttp) transport are available,
+and both pace requests through the shared per-host rate limiter.
+"""
+
+import asyncio
+import threading
+import time
+import weakref
+from typing import Dict, Any, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+
+from dealfinder import config
+from dealfinder.utils.logging import get_logger
+from dealfinder.utils.metrics import observe_http
+from dealfinder.utils.rate_limit import HostRateLimiter, RateLimitExceeded, get_rate_limiter
+from dealfinder.utils.tracing import traced, set_span_attribute
+
+logger = get_logger("HTTP")
+
+class HttpTransport:
+    """Per-host pooled HTTP sessions with retry/backoff and connection reuse counters"""
+
+    def __init__(self,
+                 pool_connections: int = config.HTTP_POOL_CONNECTIONS,
+                 pool_maxsize: int = config.HTTP_POOL_MAXSIZE,
+                 max_retries: int = config.HTTP_MAX_RETRIES,
+                 backoff_factor: float = config.HTTP_BACKOFF_FACTOR,
+                 timeout: float = config.SCRAPING_TIMEOUT,
+                 rate_limiter: Optional[HostRateLimiter] = None):
+        """
+        Initialize the transport.
+
+        Args:
+            pool_connections: Number of connection pools to cache per session
+            pool_maxsize: Maximum number of connections kept open per host
+            max_retries: Number of attempts made before giving up on a request
+            backoff_factor: Base delay in seconds, doubled after every failed attempt
+            timeout: Default request timeout in seconds
+            rate_limiter: Per-host rate limiter (default: the shared one)
+        """
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+
+        self._sessions = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _session_for(self, host: str) -> requests.Session:
+        """Get or create the pooled session for a host."""
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=self.pool_connections,
+                    pool_maxsize=self.pool_maxsize,
+                    max_retries=0  # Retries are handled in get() so they can be logged and counted
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._sessions[host] = session
+                self._stats[host] = {"requests": 0, "retries": 0, "errors": 0, "rate_limited": 0}
+            return session
+
+    def _count(self, host: str, field: str) -> None:
+        with self._lock:
+            self._stats[host][field] += 1
+
+    @traced("http.get")
+    def get(self,
+            url: str,
+            params: Optional[Dict[str, Any]] = None,
+            headers: Optional[Dict[str, str]] = None,
+            timeout: Optional[float] = None) -> Optional[requests.Response]:
+        """
+        Perform a GET request over the pooled session for the URL's host.
+
+        Every attempt first waits for the host's rate limit. Non-200 responses
+        and request errors are retried with exponential backoff.
+
+        Args:
+            url: The URL to fetch
+            params: Optional query string parameters
+            headers: Optional request headers
+            timeout: Optional timeout override in seconds
+
+        Returns:
+            The successful response, or None if all attempts failed
+
+        Raises:
+            RateLimitExceeded: If the host's rate limit slot is more than the maximum wait away
+        """
+        host = urlsplit(url).netloc
+        session = self._session_for(host)
+
+        for attempt in range(self.max_retries):
+            if attempt:
+                self._count(host, "retries")
+            try:
+                set_span_attribute("http.rate_limit_wait", self.rate_limiter.acquire(host))
+            except RateLimitExceeded as e:
+                # Local load shedding says nothing about the host's health, so let callers tell it apart
+                self._count(host, "rate_limited")
+                logger.warning(str(e))
+                raise
+            started = time.perf_counter()
+            try:
+                self._count(host, "requests")
+                response = session.get(
+                    url,
+                    params=params,
+                    headers=headers,
+                    timeout=timeout or self.timeout
+                )
+
+                self.rate_limiter.record_response(host, response.status_code, response.headers.get("Retry-After"))
+                if response.status_code == 200:
+                    observe_http(host, 200, time.perf_counter() - started, len(response.content))
+                    return response
+
+                observe_http(host, response.status_code, time.perf_counter() - started)
+                logger.warning(f"Request to {host} failed with status {response.status_code}, retrying")
+            except requests.RequestException as e:
+                self._count(host, "errors")
+                observe_http(host, "error", time.perf_counter() - started)
+                logger.warning(f"Request error for {host}: {str(e)}, retrying")
+
+            time.sleep(self.backoff_factor * (2 ** attempt))
+
+        return None
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Get request and connection counters per host.
+
+        Returns:
+            Dictionary keyed by host with request, retry, error, rate limit rejection,
+            connection and reuse counts
+        """
+        with self._lock:
+            sessions = dict(self._sessions)
+            stats = {host: dict(counts) for host, counts in self._stats.items()}
+
+        for host, session in sessions.items():
+            connections = 0
+            for adapter in set(session.adapters.values()):
+                pools = adapter.poolmanager.pools
+                for key in list(pools.keys()):
+                    pool = pools.get(key)
+                    if pool is not None:
+                        connections += getattr(pool, "num_connections", 0)
+
+            stats[host]["connections_opened"] = connections
+            stats[host]["connections_reused"] = max(0, stats[host]["requests"] - stats[host]["errors"] - connections)
+
+        return stats
+
+    def close(self) -> None:
+        """Close all pooled sessions."""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+class AsyncHttpTransport:
+    """Pooled aiohttp sessions with the same retry/backoff policy as HttpTransport"""
+
+    def __init__(self,
+                 pool_maxsize: int = config.HTTP_POOL_MAXSIZE,
+                 max_retries: int = config.HTTP_MAX_RETRIES,
+                 backoff_factor: float = config.HTTP_BACKOFF_FACTOR,
+                 timeout: float = config.SCRAPING_TIMEOUT,
+                 rate_limiter: Optional[HostRateLimiter] = None):
+        """
+        Initialize the async transport.
+
+        Args:
+            pool_maxsize: Maximum number of connections kept open per host
+            max_retries: Number of attempts made before giving up on a request
+            backoff_factor: Base delay in seconds, doubled after every failed attempt
+            timeout: Default request timeout in seconds
+            rate_limiter: Per-host rate limiter (default: the shared one)
+        """
+        self.pool_maxsize = pool_maxsize
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+
+        # aiohttp sessions are bound to an event loop, so keep one per running loop
+        self._sessions = weakref.WeakKeyDictionary()
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _session(self) -> aiohttp.ClientSession:
+        """Get or create the pooled session for the running event loop."""
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(limit_per_host=self.pool_maxsize)
+            session = aiohttp.ClientSession(connector=connector)
+            self._sessions[loop] = session
+        return session
+
+    def _count(self, host: str, field: str) -> None:
+        with self._lock:
+            counts = self._stats.setdefault(host, {"requests": 0, "retries": 0, "errors": 0, "rate_limited": 0})
+            counts[field] += 1
+
+    @traced("http.get")
+    async def get(self,
+                  url: str,
+                  params: Optional[Dict[str, Any]] = None,
+                  headers: Optional[Dict[str, str]] = None,
+                  timeout: Optional[float] = None) -> Optional[str]:
+        """
+        Perform a GET request over the pooled session for the running event loop.
+
+        Every attempt first waits for the host's rate limit. Non-200 responses
+        and request errors are retried with exponential backoff.
+
+        Args:
+            url: The URL to fetch
+            params: Optional query string parameters
+            headers: Optional request headers
+            timeout: Optional timeout override in seconds
+
+        Returns:
+            The response body text, or None if all attempts failed
+
+        Raises:
+            RateLimitExceeded: If the host's rate limit slot is more than the maximum wait away
+        """
+        host = urlsplit(url).netloc
+        session = self._session()
+        query = {key: str(value) for key, value in (params or {}).items()}
+        client_timeout = aiohttp.ClientTimeout(total=timeout or self.timeout)
+
+        for attempt in range(self.max_retries):
+            if attempt:
+                self._count(host, "retries")
+            try:
+                set_span_attribute("http.rate_limit_wait", await self.rate_limiter.async_acquire(host))
+            except RateLimitExceeded as e:
+                # Local load shedding says nothing about the host's health, so let callers tell it apart
+                self._count(host, "rate_limited")
+                logger.warning(str(e))
+                raise
+            started = time.perf_counter()
+            try:
+                self._count(host, "requests")
+                async with session.get(url, params=query, headers=headers, timeout=client_timeout) as response:
+                    self.rate_limiter.record_response(host, response.status, response.headers.get("Retry-After"))
+                    if response.status == 200:
+                        body = await response.read()
+                        observe_http(host, 200, time.perf_counter() - started, len(body))
+                        return body.decode(response.get_encoding(), errors="replace")
+
+                    observe_http(host, response.status, time.perf_counter() - started)
+                    logger.warning(f"Request to {host} failed with status {response.status}, retrying")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self._count(host, "errors")
+                observe_http(host, "error", time.perf_counter() - started)
+                logger.warning(f"Request error for {host}: {str(e)}, retrying")
+
+            await asyncio.sleep(self.backoff_factor * (2 ** attempt))
+
+        return None
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Get request counters per host.
+
+        Returns:
+            Dictionary keyed by host with request, retry, error and rate limit rejection counts
+        """
+        with self._lock:
+            return {host: dict(counts) for host, counts in self._stats.items()}
+
+    async def close(self) -> None:
+        """Close the session bound to the running event loop."""
+        session = self._sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None:
+            await session.close()
+
+_transport = None
+_async_transport = None
+_transport_lock = threading.Lock()
+
+def get_transport() -> HttpTransport:
+    """
+    Get the process-wide HTTP transport shared by all scraper agents.
+
+    Returns:
+        The shared HttpTransport instance
+    """
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = HttpTransport()
+        return _transport
+
+def get_async_transport() -> AsyncHttpTransport:
+    """
+    Get the process-wide async HTTP transport shared by all scraper agents.
+
+    Returns:
+        The shared AsyncHttpTransport instance
+    """
+    global _async_transport
+    with _transport_lock:
+        if _async_transport is None:
+            _async_transport = AsyncHttpTransport()
+        return _async_transport
@@ -0,0 +1,299 @@
+"""
+Background query jobs for DealFinder AI.
+
+This module runs long queries on a bounded worker pool so web requests can
+submit a query, return a job ID straight away and collect the result later by
+polling or long-polling. Finished jobs are kept for a retention period and
+then expired.
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, List, Optional
+
+from dealfinder import config
+from dealfinder.utils.logging import get_logger
+
+logger = get_logger("Jobs")
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATES = (COMPLETED, FAILED, CANCELLED)
+
+class JobQueueFull(RuntimeError):
+    """Raised when a job is submitted while the queue is at capacity"""
+
+class Job:
+    """State of one submitted job"""
+
+    def __init__(self, job_id: str, owner: Optional[str] = None):
+        self.id = job_id
+        self.owner = owner
+        self.status = QUEUED
+        self.stage = None
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.future = None
+        self.done = threading.Event()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get the job's public state.
+
+        Returns:
+            Dictionary with the job ID, status, current stage, timestamps and,
+            once finished, the result or error
+        """
+        data = {
+            "job_id": self.id,
+            "status": self.status,
+            "stage": self.stage,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if self.status == COMPLETED:
+            data["result"] = self.result
+        elif self.status in (FAILED, CANCELLED):
+            data["error"] = self.error
+        return data
+
+class JobManager:
+    """Thread-safe job queue executed by a bounded worker pool, with result retention"""
+
+    def __init__(self,
+                 max_workers: int,
+                 max_queued: int,
+                 retention: float,
+                 max_retained: int):
+        """
+        Initialize the job manager.
+
+        Args:
+            max_workers: Number of worker threads running jobs
+            max_queued: Maximum number of jobs waiting for a worker
+            retention: Seconds a finished job's result is kept
+            max_retained: Maximum number of finished jobs kept (oldest are expired first)
+        """
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.retention = retention
+        self.max_retained = max_retained
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job-worker")
+        self._jobs = OrderedDict()  # job id -> Job, in submission order
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._stats = {
+            "submitted": 0, "completed": 0, "failed": 0,
+            "cancelled": 0, "rejected": 0, "expired": 0,
+        }
+
+    def submit(self, task: Callable[[Callable[[str, Dict[str, Any]], None]], Any], owner: Optional[str] = None) -> Job:
+        """
+        Queue a task to run on the worker pool.
+
+        The task is called with a progress callback taking (event, data), which
+        records the event name as the job's current stage.
+
+        Args:
+            task: The function to run
+            owner: Optional owner (e.g. session ID) allowed to read and cancel the job
+
+        Returns:
+            The queued Job
+
+        Raises:
+            JobQueueFull: If max_queued jobs are already waiting
+        """
+        job = Job(uuid.uuid4().hex, owner)
+        with self._lock:
+            self._expire()
+            if self._queued >= self.max_queued:
+                self._stats["rejected"] += 1
+                raise JobQueueFull(f"Job queue is full ({self.max_queued} jobs waiting)")
+            self._jobs[job.id] = job
+            self._queued += 1
+            self._stats["submitted"] += 1
+
+        job.future = self._executor.submit(self._run, job, task)
+        return job
+
+    def get(self, job_id: str, owner: Optional[str] = None) -> Optional[Job]:
+        """
+        Get a job.
+
+        Args:
+            job_id: The job ID
+            owner: The requester; jobs submitted with an owner are only visible to that owner
+
+        Returns:
+            The Job, or None if it does not exist, has expired or belongs to someone else
+        """
+        with self._lock:
+            self._expire()
+            job = self._jobs.get(job_id)
+        if job is None or (job.owner is not None and job.owner != owner):
+            return None
+        return job
+
+    def wait(self, job_id: str, timeout: float, owner: Optional[str] = None) -> Optional[Job]:
+        """
+        Get a job, waiting up to a timeout for it to finish (long-poll).
+
+        Args:
+            job_id: The job ID
+            timeout: Maximum seconds to wait, capped at JOB_MAX_WAIT
+            owner: The requester
+
+        Returns:
+            The Job in whatever state it reached, or None if it does not exist
+        """
+        job = self.get(job_id, owner)
+        if job is not None and timeout > 0:
+            job.done.wait(min(timeout, config.JOB_MAX_WAIT))
+        return job
+
+    def cancel(self, job_id: str, owner: Optional[str] = None) -> Optional[Job]:
+        """
+        Cancel a job.
+
+        A queued job is removed from the queue. A running job cannot be
+        interrupted: it is marked cancelled at once and its result is
+        discarded when it finishes.
+
+        Args:
+            job_id: The job ID
+            owner: The requester
+
+        Returns:
+            The Job, or None if it does not exist
+        """
+        job = self.get(job_id, owner)
+        if job is None:
+            return None
+
+        with self._lock:
+            if job.status in FINISHED_STATES:
+                return job
+            if job.status == QUEUED and job.future is not None and job.future.cancel():
+                self._queued -= 1
+            self._finish(job, CANCELLED, error="Job was cancelled")
+        return job
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get queue depth and job counters.
+
+        Returns:
+            Dictionary with queued and running job counts, the age of the oldest
+            queued job, retained jobs, limits, and submission, outcome,
+            rejection and expiry counts
+        """
+        now = time.time()
+        with self._lock:
+            self._expire()
+            stats = dict(self._stats)
+            stats["queued"] = self._queued
+            stats["running"] = self._running
+            stats["retained"] = len(self._jobs)
+            oldest = min((job.created_at for job in self._jobs.values() if job.status == QUEUED), default=None)
+
+        stats["oldest_queued_seconds"] = round(now - oldest, 3) if oldest is not None else 0.0
+        stats["max_workers"] = self.max_workers
+        stats["max_queued"] = self.max_queued
+        return stats
+
+    def close(self) -> None:
+        """Cancel queued jobs and stop accepting work. Running jobs finish in the background."""
+        with self._lock:
+            queued = [job for job in self._jobs.values() if job.status == QUEUED]
+        for job in queued:
+            self.cancel(job.id, job.owner)
+        self._executor.shutdown(wait=False)
+
+    def _run(self, job: Job, task: Callable) -> None:
+        """Execute a job on a worker thread."""
+        with self._lock:
+            self._queued -= 1
+            if job.status != QUEUED:
+                # Cancelled after the executor had already picked it up
+                return
+            job.status = RUNNING
+            job.started_at = time.time()
+            self._running += 1
+
+        def on_event(event: str, data: Dict[str, Any]) -> None:
+            job.stage = event
+
+        try:
+            result = task(on_event)
+        except Exception as e:
+            logger.error(f"Job {job.id} failed: {str(e)}")
+            with self._lock:
+                self._running -= 1
+                if job.status == RUNNING:
+                    self._finish(job, FAILED, error=str(e))
+            return
+
+        with self._lock:
+            self._running -= 1
+            if job.status == RUNNING:
+                self._finish(job, COMPLETED, result=result)
+
+    def _finish(self, job: Job, status: str, result: Any = None, error: Optional[str] = None) -> None:
+        """Record a job's outcome and wake long-pollers. Caller must hold the lock."""
+        job.status = status
+        job.result = result
+        job.error = error
+        job.finished_at = time.time()
+        self._stats[status] += 1
+        job.done.set()
+
+    def _expire(self) -> None:
+        """Drop finished jobs past retention or over the retained limit. Caller must hold the lock."""
+        now = time.time()
+        finished = [job for job in self._jobs.values() if job.status in FINISHED_STATES]
+        finished.sort(key=lambda job: job.finished_at)
+
+        overflow = len(finished) - self.max_retained
+        expired: List[Job] = []
+        for index, job in enumerate(finished):
+            if index < overflow or job.finished_at + self.retention <= now:
+                expired.append(job)
+
+        for job in expired:
+            del self._jobs[job.id]
+        self._stats["expired"] += len(expired)
+
+_job_manager = None
+_job_manager_lock = threading.Lock()
+
+def get_job_manager() -> JobManager:
+    """
+    Get the process-wide job manager.
+
+    Returns:
+        The shared JobManager instance
+    """
+    global _job_manager
+    with _job_manager_lock:
+        if _job_manager is None:
+            _job_manager = JobManager(
+                max_workers=config.JOB_MAX_WORKERS,
+                max_queued=config.JOB_MAX_QUEUED,
+                retention=config.JOB_RESULT_TTL,
+                max_retained=config.JOB_MAX_RETAINED
+            )
+        return _job_manager
@@ -0,0 +1,307 @@
+"""
+Shared Gemini client registry for DealFinder AI.
+
+This module hands out one GenerativeModel handle per model name for the whole
+process and gates every Gemini request through a global concurrency limit and
+a rolling per-minute request budget, so agents can be created freely without
+configuring new clients or exceeding the API quota under load.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, asynccontextmanager
+from typing import Dict, Any, Optional
+
+from dealfinder import config
+from dealfinder.utils.logging import get_logger
+
+logger = get_logger("LLMClients")
+
+class LLMBudgetExceeded(RuntimeError):
+    """Raised when a request cannot get a concurrency slot or budget within the maximum wait"""
+
+def _resolve(future: "asyncio.Future") -> None:
+    """Complete an async waiter's future. Runs on the waiter's event loop."""
+    if not future.done():
+        future.set_result(None)
+
+class _Waiter:
+    """A request waiting for admission, woken when it may be next to be admitted"""
+
+    def __init__(self, lock: threading.Lock, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.loop = loop
+        self.condition = threading.Condition(lock) if loop is None else None
+        self.future = None
+
+    def wake(self) -> None:
+        """Wake the waiter. Caller must hold the registry lock."""
+        if self.condition is not None:
+            self.condition.notify()
+        elif self.future is not None:
+            try:
+                self.loop.call_soon_threadsafe(_resolve, self.future)
+            except RuntimeError:
+                # The waiter's event loop is closed
+                pass
+
+class LLMClientRegistry:
+    """Thread-safe registry of shared Gemini model handles with request admission control"""
+
+    def __init__(self,
+                 max_concurrency: int,
+                 requests_per_minute: int,
+                 max_wait: float):
+        """
+        Initialize the registry.
+
+        Args:
+            max_concurrency: Maximum number of requests in flight across all agents and threads
+            requests_per_minute: Maximum number of requests started in any rolling 60 seconds, 0 for no budget
+            max_wait: Seconds a request may wait for admission before LLMBudgetExceeded is raised
+        """
+        self.max_concurrency = max_concurrency
+        self.requests_per_minute = requests_per_minute
+        self.max_wait = max_wait
+
+        self._models = {}
+        self._configured_key = None
+        self._lock = threading.Lock()
+
+        self._started = deque()  # start times of requests in the last minute
+        self._in_flight = 0
+        self._waiting = 0
+        self._waiters = deque()  # requests waiting for admission, admitted in arrival order
+        self._stats = {
+            "requests": 0, "throttled": 0, "rejected": 0,
+            "errors": 0, "quota_errors": 0, "peak_in_flight": 0,
+        }
+
+    def get_model(self, model_name: str, api_key: str):
+        """
+        Get the shared model handle for a model name, configuring the client on first use.
+
+        Args:
+            model_name: Gemini model name
+            api_key: Gemini API key
+
+        Returns:
+            The shared GenerativeModel
+        """
+        import google.generativeai as genai
+
+        with self._lock:
+            if self._configured_key != api_key:
+                if self._configured_key is not None:
+                    # The Gemini client is process-global, so the last key configured wins
+                    logger.warning("Reconfiguring the Gemini client with a different API key")
+                    self._models.clear()
+                genai.configure(api_key=api_key)
+                self._configured_key = api_key
+
+            model = self._models.get(model_name)
+            if model is None:
+                model = genai.GenerativeModel(model_name)
+                self._models[model_name] = model
+                logger.info(f"Created shared Gemini model handle for {model_name}")
+            return model
+
+    @contextmanager
+    def request_slot(self):
+        """
+        Hold a concurrency slot and budget unit for one synchronous request.
+
+        Waiters sleep until a slot is released or the oldest budget unit
+        expires, and are admitted in arrival order.
+
+        Raises:
+            LLMBudgetExceeded: If no slot is available within the maximum wait
+        """
+        deadline = time.monotonic() + self.max_wait
+        throttled = False
+        admitted = False
+        with self._lock:
+            waiter = self._enqueue()
+            try:
+                while True:
+                    now = time.monotonic()
+                    delay = self._admit(waiter, now)
+                    if delay == 0:
+                        admitted = True
+                        break
+                    throttled = True
+                    if now >= deadline:
+                        break
+                    waiter.condition.wait(min(delay, deadline - now) if delay is not None else deadline - now)
+            finally:
+                self._dequeue(waiter)
+
+        if not admitted:
+            self._reject()
+        self._admitted(throttled)
+        try:
+            yield
+        except Exception as e:
+            self._failed(e)
+            raise
+        finally:
+            self._release()
+
+    @asynccontextmanager
+    async def async_request_slot(self):
+        """
+        Hold a concurrency slot and budget unit for one async request without blocking the event loop.
+
+        Waiters sleep until a slot is released or the oldest budget unit
+        expires, and are admitted in arrival order with synchronous waiters.
+
+        Raises:
+            LLMBudgetExceeded: If no slot is available within the maximum wait
+        """
+        loop = asyncio.get_running_loop()
+        deadline = time.monotonic() + self.max_wait
+        throttled = False
+        admitted = False
+        with self._lock:
+            waiter = self._enqueue(loop)
+        try:
+            while True:
+                with self._lock:
+                    now = time.monotonic()
+                    delay = self._admit(waiter, now)
+                    if delay == 0:
+                        admitted = True
+                        break
+                    throttled = True
+                    if now >= deadline:
+                        break
+                    # A fresh future per round, created under the lock so a wake-up cannot be missed
+                    waiter.future = loop.create_future()
+                timeout = min(delay, deadline - now) if delay is not None else deadline - now
+                await asyncio.wait([waiter.future], timeout=timeout)
+        finally:
+            with self._lock:
+                self._dequeue(waiter)
+
+        if not admitted:
+            self._reject()
+        self._admitted(throttled)
+        try:
+            yield
+        except Exception as e:
+            self._failed(e)
+            raise
+        finally:
+            self._release()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get request gauges and counters.
+
+        Returns:
+            Dictionary with in-flight and waiting gauges, requests started in the
+            last minute, limits, and request, throttle, rejection and error counts
+        """
+        with self._lock:
+            self._prune(time.monotonic())
+            stats = dict(self._stats)
+            stats["in_flight"] = self._in_flight
+            stats["waiting"] = self._waiting
+            stats["last_minute"] = len(self._started)
+            stats["models"] = sorted(self._models)
+
+        stats["max_concurrency"] = self.max_concurrency
+        stats["requests_per_minute"] = self.requests_per_minute
+        return stats
+
+    def _prune(self, now: float) -> None:
+        """Drop request start times older than a minute. Caller must hold the lock."""
+        while self._started and self._started[0] <= now - 60:
+            self._started.popleft()
+
+    def _enqueue(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> _Waiter:
+        """Add a waiter at the back of the admission queue. Caller must hold the lock."""
+        waiter = _Waiter(self._lock, loop)
+        self._waiters.append(waiter)
+        self._waiting += 1
+        return waiter
+
+    def _dequeue(self, waiter: _Waiter) -> None:
+        """Remove an admitted or timed out waiter and wake the next one. Caller must hold the lock."""
+        self._waiters.remove(waiter)
+        self._waiting -= 1
+        self._wake_next()
+
+    def _wake_next(self) -> None:
+        """Wake the waiter at the front of the admission queue. Caller must hold the lock."""
+        if self._waiters:
+            self._waiters[0].wake()
+
+    def _admit(self, waiter: _Waiter, now: float) -> Optional[float]:
+        """
+        Take a slot and budget unit for a waiter if it is first in line and both are available.
+
+        Caller must hold the lock.
+
+        Returns:
+            0 if admitted, seconds until the oldest budget unit expires if only
+            the budget is exhausted, or None to wait for a wake-up
+        """
+        if self._waiters[0] is not waiter or self._in_flight >= self.max_concurrency:
+            return None
+
+        self._prune(now)
+        if self.requests_per_minute and len(self._started) >= self.requests_per_minute:
+            return max(0.001, self._started[0] + 60 - now)
+
+        self._in_flight += 1
+        self._started.append(now)
+        self._stats["peak_in_flight"] = max(self._stats["peak_in_flight"], self._in_flight)
+        return 0
+
+    def _admitted(self, throttled: bool) -> None:
+        with self._lock:
+            self._stats["requests"] += 1
+            if throttled:
+                self._stats["throttled"] += 1
+
+    def _reject(self) -> None:
+        with self._lock:
+            self._stats["rejected"] += 1
+        raise LLMBudgetExceeded(
+            f"No Gemini request slot within {self.max_wait}s "
+            f"(limit {self.max_concurrency} concurrent, {self.requests_per_minute}/min)"
+        )
+
+    def _failed(self, error: Exception) -> None:
+        with self._lock:
+            self._stats["errors"] += 1
+            # google.api_core ResourceExhausted (HTTP 429) means the API quota was hit anyway
+            if type(error).__name__ == "ResourceExhausted" or "429" in str(error):
+                self._stats["quota_errors"] += 1
+
+    def _release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._wake_next()
+
+_registry = None
+_registry_lock = threading.Lock()
+
+def get_llm_registry() -> LLMClientRegistry:
+    """
+    Get the process-wide Gemini client registry shared by all agents.
+
+    Returns:
+        The shared LLMClientRegistry instance
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = LLMClientRegistry(
+                max_concurrency=config.GEMINI_MAX_CONCURRENCY,
+                requests_per_minute=config.GEMINI_REQUESTS_PER_MINUTE,
+                max_wait=config.GEMINI_BUDGET_MAX_WAIT
+            )
+        return _registry
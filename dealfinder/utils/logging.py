@@ -2,55 +2,294 @@
 Logging configuration for DealFinder AI.
 
 This module provides utilities for configuring logging across the application.
+
+By default records are handed to a queue and written by a background listener
+thread, so file and console I/O stay off the request path. Messages can be
+rate limited per logger and message template, and the log file can be written
+as structlog JSON lines.
 """
 
+import atexit
+import copy
 import logging
 import logging.config
+import logging.handlers
 import os
+import queue
+import threading
+import time
+from collections import Counter, OrderedDict
 from typing import Optional, Dict, Any
 
 from dealfinder import config
 
-def setup_logging(log_file: Optional[str] = None, log_level: int = logging.INFO) -> None:
+try:
+    import structlog
+except ImportError:
+    structlog = None
+
+# Argument types that cannot change between logging a record and the listener formatting it
+_IMMUTABLE_ARGS = (str, int, float, bool, bytes, type(None))
+
+class RateLimitFilter(logging.Filter):
+    """
+    Token bucket rate limiting per logger and message template.
+
+    Each (logger name, unformatted message) pair gets its own bucket, so a
+    message logged in a hot loop is throttled while other messages from the
+    same logger still pass. Records at ERROR and above are never dropped. The
+    next record to pass after some were dropped carries their count in its
+    "suppressed" attribute.
+    """
+
+    # Maximum number of buckets kept (least recently used are dropped first)
+    MAX_BUCKETS = 1024
+
+    def __init__(self, limits: Dict[str, Dict[str, float]]):
+        """
+        Initialize the filter.
+
+        Args:
+            limits: Rules keyed by logger name, applying to that logger and its
+                    children (the longest matching name wins). Each rule may set
+                    "rate" (records per second), "burst" (bucket size, default
+                    rate) and "every" (keep only every Nth record).
+        """
+        super().__init__()
+        self.limits = limits
+        self._rules = {}  # logger name -> matching rule, or None
+        self._buckets = OrderedDict()  # (logger name, template) -> [tokens, last refill, seen, suppressed]
+        self._suppressed = Counter()
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        # When the filter is shared by several handlers, decide once per record
+        decision = record.__dict__.get("_rate_limit_keep")
+        if decision is None:
+            decision = record._rate_limit_keep = self._decide(record)
+        return decision
+
+    def _decide(self, record: logging.LogRecord) -> bool:
+        """Apply the matching rule to a record, consuming a token if it passes."""
+        if record.levelno >= logging.ERROR:
+            return True
+
+        rule = self._rule(record.name)
+        if rule is None:
+            return True
+
+        rate = rule.get("rate", 0)
+        burst = rule.get("burst", rate or 1)
+        every = int(rule.get("every", 1))
+        key = (record.name, record.msg if isinstance(record.msg, str) else type(record.msg).__name__)
+        now = time.monotonic()
+
+        with self._lock:
+            state = self._buckets.get(key)
+            if state is None:
+                state = self._buckets[key] = [burst, now, 0, 0]
+                if len(self._buckets) > self.MAX_BUCKETS:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+
+            state[2] += 1
+            keep = every <= 1 or (state[2] - 1) % every == 0
+            if keep and rate:
+                state[0] = min(burst, state[0] + (now - state[1]) * rate)
+                state[1] = now
+                keep = state[0] >= 1
+                if keep:
+                    state[0] -= 1
+
+            if not keep:
+                state[3] += 1
+                self._suppressed[record.name] += 1
+                return False
+
+            suppressed, state[3] = state[3], 0
+
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the number of records dropped per logger.
+
+        Returns:
+            Dictionary of logger name to suppressed record count
+        """
+        with self._lock:
+            return dict(self._suppressed)
+
+    def _rule(self, name: str) -> Optional[Dict[str, float]]:
+        """Find the rule for a logger by its longest matching configured name."""
+        if name not in self._rules:
+            matches = [prefix for prefix in self.limits if name == prefix or name.startswith(prefix + ".")]
+            self._rules[name] = self.limits[max(matches, key=len)] if matches else None
+        return self._rules[name]
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records when the queue is full and defers formatting to the listener"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Prepare a record for the queue without formatting it.
+
+        The listener runs in this process, so the record can be passed as is.
+        The message is only merged here when an argument is mutable and could
+        change before the listener formats it.
+        """
+        args = record.args
+        if args and not (isinstance(args, tuple) and all(isinstance(arg, _IMMUTABLE_ARGS) for arg in args)):
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+_listener = None
+_queue_handler = None
+_rate_limit_filter = None
+_setup_lock = threading.Lock()
+
+def _add_suppressed_count(logger, method_name, event_dict):
+    """structlog processor copying a record's suppressed count into the event."""
+    suppressed = getattr(event_dict.get("_record"), "suppressed", 0)
+    if suppressed:
+        event_dict["suppressed"] = suppressed
+    return event_dict
+
+def _json_formatter() -> Dict[str, Any]:
+    """Build the dictConfig entry for the structlog JSON formatter."""
+    return {
+        "()": structlog.stdlib.ProcessorFormatter,
+        "foreign_pre_chain": [
+            structlog.stdlib.add_log_level,
+            structlog.stdlib.add_logger_name,
+            structlog.processors.TimeStamper(fmt="iso"),
+            _add_suppressed_count,
+        ],
+        "processors": [
+            structlog.stdlib.ProcessorFormatter.remove_processors_meta,
+            structlog.processors.format_exc_info,
+            structlog.processors.JSONRenderer(),
+        ],
+    }
+
+def _stop_listener() -> None:
+    """Stop the queue listener, writing any queued records."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+def setup_logging(log_file: Optional[str] = None,
+                  log_level: int = logging.INFO,
+                  async_logging: Optional[bool] = None) -> None:
     """
     Set up logging for the application.
-    
+
     Args:
         log_file: Optional path to log file. If not provided, uses the default from config.
         log_level: Log level to use (default: INFO)
+        async_logging: Write records from a background thread; defaults to config.LOG_ASYNC
     """
+    global _listener, _queue_handler, _rate_limit_filter
+
+    if async_logging is None:
+        async_logging = config.LOG_ASYNC
+
     # Create a custom logging configuration based on the config
-    logging_config = config.LOGGING_CONFIG.copy()
-    
+    logging_config = copy.deepcopy(config.LOGGING_CONFIG)
+
     # Override log file if provided
     if log_file:
         logging_config["handlers"]["file"]["filename"] = log_file
-    
+
     # Override log level if different from default
     if log_level != logging.INFO:
         logging_config["handlers"]["console"]["level"] = log_level
         logging_config["handlers"]["file"]["level"] = log_level
         logging_config["loggers"]["DealFinderAI"]["level"] = log_level
-    
+
+    # Write the log file as JSON lines when structlog is available
+    if config.LOG_FILE_FORMAT == "json" and structlog is not None:
+        logging_config["formatters"]["json"] = _json_formatter()
+        logging_config["handlers"]["file"]["formatter"] = "json"
+
     # Create log directory if it doesn't exist
     log_path = os.path.dirname(logging_config["handlers"]["file"]["filename"])
     if log_path and not os.path.exists(log_path):
         os.makedirs(log_path)
-    
-    # Configure logging with the updated config
-    logging.config.dictConfig(logging_config)
-    
+
+    with _setup_lock:
+        _stop_listener()
+
+        # Configure logging with the updated config
+        logging.config.dictConfig(logging_config)
+
+        app_logger = logging.getLogger("DealFinderAI")
+        _rate_limit_filter = RateLimitFilter(config.LOG_RATE_LIMITS)
+
+        if async_logging:
+            # Move the configured handlers behind a queue drained by a listener thread
+            handlers = list(app_logger.handlers)
+            for handler in handlers:
+                app_logger.removeHandler(handler)
+
+            _queue_handler = NonBlockingQueueHandler(queue.Queue(config.LOG_QUEUE_SIZE))
+            _queue_handler.addFilter(_rate_limit_filter)
+            app_logger.addHandler(_queue_handler)
+
+            _listener = logging.handlers.QueueListener(_queue_handler.queue, *handlers, respect_handler_level=True)
+            _listener.start()
+        else:
+            _queue_handler = None
+            for handler in app_logger.handlers:
+                handler.addFilter(_rate_limit_filter)
+
+    if config.LOG_FILE_FORMAT == "json" and structlog is None:
+        app_logger.warning("structlog is not installed, writing the log file as text")
+
     # Log that logging has been set up
-    logging.getLogger("DealFinderAI").info("Logging initialized")
+    app_logger.info("Logging initialized")
+
+def get_logging_stats() -> Dict[str, Any]:
+    """
+    Get logging pipeline counters.
+
+    Returns:
+        Dictionary with whether logging is asynchronous, queued and dropped
+        record counts, and rate limited record counts per logger
+    """
+    handler = _queue_handler
+    return {
+        "async": handler is not None,
+        "queued": handler.queue.qsize() if handler is not None else 0,
+        "dropped": handler.dropped if handler is not None else 0,
+        "suppressed": _rate_limit_filter.stats() if _rate_limit_filter is not None else {},
+    }
 
 def get_logger(name: str) -> logging.Logger:
     """
     Get a logger with the specified name, prefixed with 'DealFinderAI'.
-    
+
     Args:
         name: The name of the logger (without the 'DealFinderAI' prefix)
-        
+
     Returns:
         A configured logger instance
     """
-    return logging.getLogger(f"DealFinderAI.{name}")
\ No newline at end of file
+    return logging.getLogger(f"DealFinderAI.{name}")
+
+atexit.register(_stop_listener)
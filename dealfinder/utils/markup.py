@@ -0,0 +1,162 @@
+"""
+HTML parsing and reduction utilities for DealFinder AI.
+
+This module provides the parser used by the scrapers, with partial parsing of
+search result pages, and strips non-semantic markup from product listing
+fragments before they are sent to Gemini.
+"""
+
+import re
+from typing import Optional
+
+from bs4 import BeautifulSoup, Comment, FeatureNotFound, SoupStrainer
+
+from dealfinder import config
+from dealfinder.utils.logging import get_logger
+from dealfinder.utils.tracing import traced
+
+logger = get_logger("Markup")
+
+def _has_class(name: str):
+    """
+    Build a SoupStrainer attribute matcher for one class token.
+
+    While parsing, SoupStrainer sees the whole class attribute string, so a
+    plain string only matches elements whose class is exactly that name.
+    """
+    return lambda value: value is not None and name in value.split()
+
+# Elements materialized when partially parsing each source's search results page
+SEARCH_RESULT_STRAINERS = {
+    "amazon": SoupStrainer("div", attrs={"data-component-type": "s-search-result"}),
+    "ebay": SoupStrainer("li", attrs={"class": _has_class("s-item")}),
+    "walmart": SoupStrainer("script", attrs={"type": "application/json"}),
+}
+
+# Elements that never carry product information
+NON_SEMANTIC_TAGS = [
+    "script", "style", "svg", "noscript", "iframe", "link", "meta",
+    "template", "canvas", "video", "audio", "button", "form", "input",
+]
+
+# Attributes kept on every element
+KEEP_ATTRIBUTES = {
+    "href", "src", "alt", "title", "aria-label", "itemprop", "content", "datetime",
+    "data-asin", "data-item-id", "data-product-id", "data-listingid",
+}
+
+# Structural wrappers that are dropped (keeping their contents) once they have no attributes
+UNWRAP_TAGS = ["div", "span", "section", "article", "ul", "ol", "li", "p", "i", "b", "em", "strong", "small"]
+
+PRICE_PATTERN = re.compile(r'[$€£]\s?\d|\d+\.\d{2}\b')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+# Rough characters-per-token ratio used to enforce the token budget
+CHARS_PER_TOKEN = 4
+
+_parser_fallback_logged = False
+
+def parse_html(html: str, parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+    """
+    Parse HTML with the configured parser backend.
+
+    Falls back to the pure-Python html.parser if the configured backend
+    (lxml by default) is not installed.
+
+    Args:
+        html: The HTML to parse
+        parse_only: Optional SoupStrainer limiting which elements are materialized
+
+    Returns:
+        The parsed BeautifulSoup tree
+    """
+    global _parser_fallback_logged
+    try:
+        return BeautifulSoup(html, config.HTML_PARSER, parse_only=parse_only)
+    except FeatureNotFound:
+        if not _parser_fallback_logged:
+            logger.warning(f"HTML parser '{config.HTML_PARSER}' is not available, using html.parser")
+            _parser_fallback_logged = True
+        return BeautifulSoup(html, "html.parser", parse_only=parse_only)
+
+@traced("parse_search_page")
+def parse_search_page(html: str, source: str) -> BeautifulSoup:
+    """
+    Parse a search results page, materializing only the source's result elements.
+
+    Args:
+        html: The search results page HTML
+        source: Source name (e.g. "amazon")
+
+    Returns:
+        The parsed BeautifulSoup tree, partial when HTML_PARTIAL_PARSING is enabled
+    """
+    strainer = SEARCH_RESULT_STRAINERS.get(source) if config.HTML_PARTIAL_PARSING else None
+    return parse_html(html, parse_only=strainer)
+
+def _keep_attribute(name: str, value) -> bool:
+    """Decide whether an attribute carries information worth sending to the model."""
+    if isinstance(value, list):
+        value = " ".join(value)
+
+    if name in KEEP_ATTRIBUTES:
+        # Inline data URIs are large and useless as image URLs
+        return not (name == "src" and str(value).startswith("data:"))
+
+    if "price" in name:
+        return True
+
+    # Other data-* attributes are only kept when they hold a price
+    return name.startswith("data-") and bool(PRICE_PATTERN.search(str(value)))
+
+def minify_html_fragment(html: str, token_budget: Optional[int] = None) -> str:
+    """
+    Reduce an HTML fragment to its text and extraction-relevant attributes.
+
+    Scripts, styles, SVGs, comments, class lists and tracking attributes are
+    removed; href/src/alt and price-bearing attributes are kept. The result is
+    truncated to fit the token budget.
+
+    Args:
+        html: The HTML fragment to reduce
+        token_budget: Approximate maximum number of tokens, defaults to GEMINI_FRAGMENT_TOKEN_BUDGET
+
+    Returns:
+        The reduced fragment
+    """
+    if not html:
+        return ""
+
+    budget = token_budget if token_budget is not None else config.GEMINI_FRAGMENT_TOKEN_BUDGET
+    soup = parse_html(html)
+
+    for tag in soup(NON_SEMANTIC_TAGS):
+        # Nested matches are already gone with their ancestor
+        if not tag.decomposed:
+            tag.decompose()
+
+    for comment in soup.find_all(string=lambda text: isinstance(text, Comment)):
+        comment.extract()
+
+    for tag in soup.find_all(True):
+        tag.attrs = {name: value for name, value in tag.attrs.items() if _keep_attribute(name, value)}
+
+    # Unwrap bare wrappers innermost first, keeping a space so adjacent text stays separated
+    for tag in reversed(soup.find_all(UNWRAP_TAGS)):
+        if tag.attrs:
+            continue
+        if tag.get_text(strip=True) or tag.find(True):
+            tag.append(" ")
+            tag.unwrap()
+        else:
+            tag.decompose()
+
+    # lxml wraps fragments in <html><body>, which would only cost tokens
+    root = soup.body if soup.body is not None else soup
+    reduced = WHITESPACE_PATTERN.sub(" ", root.decode_contents()).strip()
+
+    max_chars = budget * CHARS_PER_TOKEN
+    if budget > 0 and len(reduced) > max_chars:
+        reduced = reduced[:max_chars]
+
+    return reduced
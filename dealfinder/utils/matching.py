@@ -0,0 +1,168 @@
+"""
+Product title matching utilities for DealFinder AI.
+
+This module groups listings of the same product using indexes instead of
+comparing every pair of titles: a model-number index for the first pass and
+token blocking for the title-similarity pass, so only candidate pairs are scored.
+"""
+
+import difflib
+import re
+from collections import defaultdict
+from typing import Dict, List, Set
+
+MODEL_NUMBER_PATTERN = re.compile(r'[a-zA-Z]+[-]?\d+[a-zA-Z0-9]*')
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+# Tokens too generic to use as blocking keys
+BLOCKING_STOPWORDS = {"the", "and", "for", "with", "new", "in", "of", "to", "by", "on", "a", "an"}
+
+TITLE_SIMILARITY_THRESHOLD = 0.6  # SequenceMatcher ratio above which titles are grouped
+TERM_OVERLAP_THRESHOLD = 0.5  # Shared significant-term ratio above which titles are grouped
+
+# Blocking keys shared by more than this fraction of products are skipped, unless the
+# block is smaller than MIN_BLOCK_SIZE (small inputs are effectively compared exhaustively)
+MAX_BLOCK_FRACTION = 0.5
+MIN_BLOCK_SIZE = 50
+
+class ModelNumberIndex:
+    """Inverted index answering "which products have a model number containing, or contained in, this one" """
+
+    def __init__(self, model_numbers: List[List[str]]):
+        """
+        Build the index.
+
+        Args:
+            model_numbers: Model numbers found in each product title, by product index
+        """
+        self.products_by_model = defaultdict(set)
+        self.models_by_bigram = defaultdict(set)
+
+        for index, models in enumerate(model_numbers):
+            for model in models:
+                self.products_by_model[model].add(index)
+                for position in range(len(model) - 1):
+                    self.models_by_bigram[model[position:position + 2]].add(model)
+
+    def related_products(self, model: str) -> Set[int]:
+        """
+        Find products with a model number that contains or is contained in the given one.
+
+        Args:
+            model: A lowercase model number
+
+        Returns:
+            Set of product indexes
+        """
+        related = set()
+
+        # Models containing this one: scan the smallest bigram posting list and verify
+        postings = [self.models_by_bigram.get(model[position:position + 2], ()) for position in range(len(model) - 1)]
+        if postings:
+            related.update(other for other in min(postings, key=len) if model in other)
+
+        # Models contained in this one: look up each of its substrings
+        for start in range(len(model) - 1):
+            for end in range(start + 2, len(model) + 1):
+                if model[start:end] in self.products_by_model:
+                    related.add(model[start:end])
+
+        products = set()
+        for other in related:
+            products |= self.products_by_model[other]
+        return products
+
+def _blocking_keys(title: str, significant_terms: List[str]) -> Set[str]:
+    """Get the blocking keys for a lowercase title."""
+    keys = {token for token in TOKEN_PATTERN.findall(title) if len(token) >= 2 and token not in BLOCKING_STOPWORDS}
+    keys.update(significant_terms)
+    return keys
+
+def _titles_match(title: str, other_title: str, terms: List[str], other_terms: List[str]) -> bool:
+    """Score a candidate pair with the same criteria as the original pairwise comparison."""
+    shared_terms = set(terms) & set(other_terms)
+    term_ratio = len(shared_terms) / max(len(terms), len(other_terms), 1)
+    if term_ratio > TERM_OVERLAP_THRESHOLD:
+        return True
+
+    # quick_ratio and real_quick_ratio are cheap upper bounds on ratio
+    matcher = difflib.SequenceMatcher(None, title, other_title)
+    return (matcher.real_quick_ratio() > TITLE_SIMILARITY_THRESHOLD
+            and matcher.quick_ratio() > TITLE_SIMILARITY_THRESHOLD
+            and matcher.ratio() > TITLE_SIMILARITY_THRESHOLD)
+
+def group_similar_titles(titles: List[str]) -> List[List[int]]:
+    """
+    Group titles that describe the same product.
+
+    The first pass groups titles sharing a model number (one contained in the
+    other, e.g. "m50" and "m50xbt2"). The second pass groups the remaining titles
+    by SequenceMatcher ratio or shared significant terms, scoring only pairs that
+    share a blocking token. Both passes are greedy in input order.
+
+    Args:
+        titles: Product titles
+
+    Returns:
+        Groups of title indexes: multi-title groups first, then single titles in input order
+    """
+    lowered = [title.lower() for title in titles]
+    model_numbers = [MODEL_NUMBER_PATTERN.findall(title) for title in lowered]
+    significant_terms = [[word for word in title.split() if len(word) >= 4] for title in lowered]
+
+    assigned = [False] * len(titles)
+    groups = []
+
+    # First pass: group by model number
+    model_index = ModelNumberIndex(model_numbers)
+    for i, models in enumerate(model_numbers):
+        if assigned[i] or not models:
+            continue
+
+        candidates = set()
+        for model in models:
+            candidates |= model_index.related_products(model)
+
+        members = [j for j in sorted(candidates) if j != i and not assigned[j]]
+        if members:
+            assigned[i] = True
+            for j in members:
+                assigned[j] = True
+            groups.append([i] + members)
+
+    # Second pass: group the rest by title similarity within shared blocks
+    blocks: Dict[str, List[int]] = defaultdict(list)
+    keys_by_title = {}
+    for i, title in enumerate(lowered):
+        if assigned[i]:
+            continue
+        keys_by_title[i] = _blocking_keys(title, significant_terms[i])
+        for key in keys_by_title[i]:
+            blocks[key].append(i)
+
+    max_block_size = max(MIN_BLOCK_SIZE, int(MAX_BLOCK_FRACTION * len(titles)))
+    singles = []
+    for i in sorted(keys_by_title):
+        if assigned[i]:
+            continue
+        assigned[i] = True
+
+        candidates = set()
+        for key in keys_by_title[i]:
+            if len(blocks[key]) <= max_block_size:
+                candidates.update(blocks[key])
+
+        group = [i]
+        for j in sorted(candidates):
+            if assigned[j]:
+                continue
+            if _titles_match(lowered[i], lowered[j], significant_terms[i], significant_terms[j]):
+                group.append(j)
+                assigned[j] = True
+
+        if len(group) > 1:
+            groups.append(group)
+        else:
+            singles.append(group)
+
+    return groups + singles
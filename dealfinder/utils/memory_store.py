@@ -0,0 +1,837 @@
+"""
+Conversation state storage for DealFinder AI.
+
+This module provides bounded stores for per-conversation state (recent
+queries, stored products, context, focused product) and web sessions.
+Conversations expire after a period of inactivity and the least recently used
+ones are evicted when the store exceeds its conversation or memory budget.
+
+ConversationStore keeps state in process memory. SharedConversationStore keeps
+it in a SQLite database in WAL mode, so every worker process on a host sees the
+same conversations, with a small cache of decoded values in each process.
+"""
+
+import json
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+import weakref
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Dict, Any, Iterator, List, Optional
+
+from dealfinder import config
+from dealfinder.utils.logging import get_logger
+
+logger = get_logger("MemoryStore")
+
+# Returned by store lookups when a field is not stored, so None can be a stored value
+_MISSING = object()
+
+def estimate_size(value: Any) -> int:
+    """
+    Estimate the memory held by a stored value.
+
+    Uses the length of the value's JSON encoding, which tracks the size of the
+    nested dicts, lists and strings conversation state is made of.
+
+    Args:
+        value: The value to measure
+
+    Returns:
+        Approximate size in bytes
+    """
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return sys.getsizeof(value)
+
+class _Conversation:
+    """State and bookkeeping for one conversation"""
+
+    __slots__ = ("fields", "sizes", "expires_at")
+
+    def __init__(self):
+        self.fields = {}
+        self.sizes = {}
+        self.expires_at = 0.0
+
+class ConversationStore:
+    """Thread-safe per-conversation store with inactivity TTL, LRU eviction and background expiry"""
+
+    def __init__(self,
+                 name: str,
+                 ttl: float,
+                 max_conversations: int,
+                 max_bytes: int,
+                 sweep_interval: float = 0):
+        """
+        Initialize the store.
+
+        Sizes are measured when a field is set, so values should be replaced
+        rather than mutated in place for the memory budget to see them.
+
+        Args:
+            name: Store name used in logs
+            ttl: Seconds of inactivity after which a conversation expires
+            max_conversations: Maximum number of conversations kept
+            max_bytes: Approximate memory budget for all stored values
+            sweep_interval: Seconds between background expiry sweeps, 0 to only expire on access
+        """
+        self.name = name
+        self.ttl = ttl
+        self.max_conversations = max_conversations
+        self.max_bytes = max_bytes
+
+        self._conversations = OrderedDict()  # conversation id -> _Conversation, least recently used first
+        self._lock = threading.RLock()
+        self._bytes = 0
+        self._stats = {"evictions": 0, "expirations": 0}
+
+        self._stop = threading.Event()
+        if sweep_interval > 0:
+            sweeper = threading.Thread(
+                target=ConversationStore._sweep,
+                args=(weakref.ref(self), self._stop, sweep_interval),
+                name=f"{name}-expiry",
+                daemon=True
+            )
+            sweeper.start()
+
+    @staticmethod
+    def _sweep(store_ref: "weakref.ref", stop: threading.Event, interval: float) -> None:
+        """Background expiry loop. Holds only a weak reference so the store can be collected."""
+        while not stop.wait(interval):
+            store = store_ref()
+            if store is None:
+                return
+            try:
+                store.expire()
+            except Exception as e:
+                logger.error(f"Error expiring conversations in '{store.name}': {str(e)}")
+            del store
+
+    def get(self, conversation_id: str, field: str, default: Any = None) -> Any:
+        """
+        Get a field of a conversation, refreshing the conversation's TTL.
+
+        Args:
+            conversation_id: The conversation ID
+            field: The field name
+            default: Value returned if the field is not stored
+
+        Returns:
+            The stored value, or the default
+        """
+        with self._lock:
+            conversation = self._touch(conversation_id)
+            if conversation is None or field not in conversation.fields:
+                return default
+            return conversation.fields[field]
+
+    def contains(self, conversation_id: str, field: str) -> bool:
+        """
+        Check whether a conversation has a field stored.
+
+        Args:
+            conversation_id: The conversation ID
+            field: The field name
+
+        Returns:
+            True if the field is stored and the conversation has not expired
+        """
+        with self._lock:
+            conversation = self._live(conversation_id)
+            return conversation is not None and field in conversation.fields
+
+    def set(self, conversation_id: str, field: str, value: Any) -> None:
+        """
+        Store a field of a conversation, evicting other conversations if over budget.
+
+        Args:
+            conversation_id: The conversation ID
+            field: The field name
+            value: The value to store
+        """
+        size = estimate_size(value)
+        with self._lock:
+            conversation = self._touch(conversation_id)
+            if conversation is None:
+                conversation = _Conversation()
+                conversation.expires_at = time.time() + self.ttl
+                self._conversations[conversation_id] = conversation
+
+            self._bytes += size - conversation.sizes.get(field, 0)
+            conversation.fields[field] = value
+            conversation.sizes[field] = size
+            self._enforce_budget()
+
+    def delete(self, conversation_id: str, field: str) -> None:
+        """
+        Remove a field of a conversation.
+
+        Args:
+            conversation_id: The conversation ID
+            field: The field name
+        """
+        with self._lock:
+            conversation = self._conversations.get(conversation_id)
+            if conversation is None or field not in conversation.fields:
+                return
+            del conversation.fields[field]
+            self._bytes -= conversation.sizes.pop(field)
+            if not conversation.fields:
+                del self._conversations[conversation_id]
+
+    def clear(self, conversation_id: Optional[str] = None) -> None:
+        """
+        Remove one conversation, or all conversations.
+
+        Args:
+            conversation_id: The conversation to remove, or None to remove all
+        """
+        with self._lock:
+            if conversation_id is None:
+                self._conversations.clear()
+                self._bytes = 0
+            else:
+                self._remove(conversation_id)
+
+    def expire(self) -> int:
+        """
+        Remove all conversations whose TTL has passed.
+
+        Returns:
+            Number of conversations removed
+        """
+        now = time.time()
+        with self._lock:
+            expired = [cid for cid, conversation in self._conversations.items() if conversation.expires_at <= now]
+            for conversation_id in expired:
+                self._remove(conversation_id)
+            self._stats["expirations"] += len(expired)
+
+        if expired:
+            logger.info(f"Expired {len(expired)} conversations from '{self.name}'")
+        return len(expired)
+
+    def field(self, name: str) -> "ConversationField":
+        """
+        Get a dictionary-like view of one field across conversations.
+
+        Args:
+            name: The field name
+
+        Returns:
+            A mapping of conversation ID to the field's value
+        """
+        return ConversationField(self, name)
+
+    def conversation_ids(self, field: str) -> List[str]:
+        """
+        List the conversations that have a field stored.
+
+        Args:
+            field: The field name
+
+        Returns:
+            Conversation IDs, least recently used first
+        """
+        with self._lock:
+            return [cid for cid, conversation in self._conversations.items() if field in conversation.fields]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get memory usage metrics.
+
+        Returns:
+            Dictionary with conversation count, approximate bytes held, budgets,
+            eviction and expiration counts
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["conversations"] = len(self._conversations)
+            stats["approx_bytes"] = self._bytes
+
+        stats["max_conversations"] = self.max_conversations
+        stats["max_bytes"] = self.max_bytes
+        stats["ttl"] = self.ttl
+        stats["shared"] = False
+        return stats
+
+    def close(self) -> None:
+        """Stop the background expiry thread."""
+        self._stop.set()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._conversations)
+
+    def _live(self, conversation_id: str) -> Optional[_Conversation]:
+        """Get a conversation, removing it if expired. Caller must hold the lock."""
+        conversation = self._conversations.get(conversation_id)
+        if conversation is not None and conversation.expires_at <= time.time():
+            self._remove(conversation_id)
+            self._stats["expirations"] += 1
+            return None
+        return conversation
+
+    def _touch(self, conversation_id: str) -> Optional[_Conversation]:
+        """Get a live conversation and mark it as recently used. Caller must hold the lock."""
+        conversation = self._live(conversation_id)
+        if conversation is not None:
+            conversation.expires_at = time.time() + self.ttl
+            self._conversations.move_to_end(conversation_id)
+        return conversation
+
+    def _remove(self, conversation_id: str) -> None:
+        """Remove a conversation. Caller must hold the lock."""
+        conversation = self._conversations.pop(conversation_id, None)
+        if conversation is not None:
+            self._bytes -= sum(conversation.sizes.values())
+
+    def _enforce_budget(self) -> None:
+        """Evict least recently used conversations until within budget. Caller must hold the lock."""
+        # The most recently used conversation is always kept, even if it alone exceeds the budget
+        while len(self._conversations) > 1 and (
+                len(self._conversations) > self.max_conversations or self._bytes > self.max_bytes):
+            conversation_id = next(iter(self._conversations))
+            self._remove(conversation_id)
+            self._stats["evictions"] += 1
+
+class SharedConversationStore:
+    """Per-conversation store in a SQLite database shared by all worker processes on a host"""
+
+    # Number of writes between conversation and memory budget checks
+    PRUNE_INTERVAL = 100
+
+    # Reads refresh a conversation's expiry at most this often (in seconds), to avoid a write per read
+    TOUCH_INTERVAL = 30
+
+    def __init__(self,
+                 name: str,
+                 db_path: str,
+                 ttl: float,
+                 max_conversations: int,
+                 max_bytes: int,
+                 sweep_interval: float = 0,
+                 hot_entries: int = 256):
+        """
+        Initialize the store, creating its tables if needed.
+
+        The database runs in WAL mode so readers in other processes are not
+        blocked by a writer. Expired conversations are found through an index
+        on their expiry time. Each value is stored with a version token, and
+        decoded values are cached in process until the version changes.
+
+        Args:
+            name: Store name used in logs and as the SQLite table prefix
+            db_path: SQLite database file shared by the worker processes
+            ttl: Seconds of inactivity after which a conversation expires
+            max_conversations: Maximum number of conversations kept
+            max_bytes: Approximate budget for the size of all stored values
+            sweep_interval: Seconds between background expiry sweeps, 0 to only expire on access
+            hot_entries: Number of decoded values cached in this process
+
+        Raises:
+            sqlite3.Error: If the database cannot be opened
+        """
+        self.name = name
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_conversations = max_conversations
+        self.max_bytes = max_bytes
+        self.hot_entries = hot_entries
+
+        self._conversations_table = f"{name}_conversations"
+        self._fields_table = f"{name}_fields"
+
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        self._hot = OrderedDict()  # (conversation id, field) -> (version, value), least recently used first
+        self._writes = 0
+        self._stats = {"evictions": 0, "expirations": 0, "hot_hits": 0, "hot_misses": 0, "errors": 0}
+
+        db = self._connection()
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(
+            f"CREATE TABLE IF NOT EXISTS {self._conversations_table} "
+            "(conversation_id TEXT PRIMARY KEY, expires_at REAL NOT NULL)"
+        )
+        db.execute(
+            f"CREATE INDEX IF NOT EXISTS {self._conversations_table}_expires_at "
+            f"ON {self._conversations_table} (expires_at)"
+        )
+        db.execute(
+            f"CREATE TABLE IF NOT EXISTS {self._fields_table} ("
+            "conversation_id TEXT NOT NULL "
+            f"REFERENCES {self._conversations_table} (conversation_id) ON DELETE CASCADE, "
+            "field TEXT NOT NULL, version TEXT NOT NULL, size INTEGER NOT NULL, value TEXT NOT NULL, "
+            "PRIMARY KEY (conversation_id, field))"
+        )
+        logger.info(f"Conversation store '{name}' shared through {db_path}")
+
+        self._stop = threading.Event()
+        if sweep_interval > 0:
+            sweeper = threading.Thread(
+                target=ConversationStore._sweep,
+                args=(weakref.ref(self), self._stop, sweep_interval),
+                name=f"{name}-expiry",
+                daemon=True
+            )
+            sweeper.start()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get this thread's database connection, opening it on first use."""
+        db = getattr(self._local, "db", None)
+        if db is None:
+            # Autocommit mode; writes open their own IMMEDIATE transactions
+            db = sqlite3.connect(self.db_path, timeout=5, isolation_level=None, check_same_thread=False)
+            db.execute("PRAGMA foreign_keys=ON")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+            with self._lock:
+                self._connections.append(db)
+        return db
+
+    def _error(self, action: str, error: Exception) -> None:
+        with self._lock:
+            self._stats["errors"] += 1
+        logger.error(f"Error {action} conversation store '{self.name}': {str(error)}")
+
+    def get(self, conversation_id: str, field: str, default: Any = None) -> Any:
+        """
+        Get a field of a conversation, refreshing the conversation's TTL.
+
+        Args:
+            conversation_id: The conversation ID
+            field: The field name
+            default: Value returned if the field is not stored
+
+        Returns:
+            The stored value, or the default
+        """
+        key = (conversation_id, field)
+        with self._lock:
+            hot = self._hot.get(key)
+        hot_version = hot[0] if hot is not None else None
+
+        now = time.time()
+        try:
+            db = self._connection()
+            # The value is only transferred when the cached version is stale
+            row = db.execute(
+                f"SELECT c.expires_at, f.version, CASE WHEN f.version = ? THEN NULL ELSE f.value END "
+                f"FROM {self._conversations_table} c LEFT JOIN {self._fields_table} f "
+                "ON f.conversation_id = c.conversation_id AND f.field = ? "
+                "WHERE c.conversation_id = ?",
+                (hot_version, field, conversation_id)
+            ).fetchone()
+
+            if row is None:
+                self._forget(key)
+                return default
+
+            expires_at, version, encoded = row
+            if expires_at <= now:
+                db.execute(
+                    f"DELETE FROM {self._conversations_table} WHERE conversation_id = ? AND expires_at <= ?",
+                    (conversation_id, now)
+                )
+                with self._lock:
+                    self._stats["expirations"] += 1
+                self._forget(key)
+                return default
+
+            if expires_at - now < self.ttl - min(self.TOUCH_INTERVAL, self.ttl / 10):
+                db.execute(
+                    f"UPDATE {self._conversations_table} SET expires_at = ? WHERE conversation_id = ?",
+                    (now + self.ttl, conversation_id)
+                )
+        except sqlite3.Error as e:
+            self._error("reading", e)
+            return default
+
+        if version is None:
+            self._forget(key)
+            return default
+
+        with self._lock:
+            if version == hot_version:
+                self._stats["hot_hits"] += 1
+                self._hot.move_to_end(key)
+                return hot[1]
+            self._stats["hot_misses"] += 1
+
+        value = json.loads(encoded)
+        self._remember(key, version, value)
+        return value
+
+    def contains(self, conversation_id: str, field: str) -> bool:
+        """
+        Check whether a conversation has a field stored.
+
+        Args:
+            conversation_id: The conversation ID
+            field: The field name
+
+        Returns:
+            True if the field is stored and the conversation has not expired
+        """
+        try:
+            row = self._connection().execute(
+                f"SELECT 1 FROM {self._fields_table} f JOIN {self._conversations_table} c "
+                "ON c.conversation_id = f.conversation_id "
+                "WHERE f.conversation_id = ? AND f.field = ? AND c.expires_at > ?",
+                (conversation_id, field, time.time())
+            ).fetchone()
+        except sqlite3.Error as e:
+            self._error("reading", e)
+            return False
+        return row is not None
+
+    def set(self, conversation_id: str, field: str, value: Any) -> None:
+        """
+        Store a field of a conversation, evicting other conversations if over budget.
+
+        Args:
+            conversation_id: The conversation ID
+            field: The field name
+            value: The value to store
+        """
+        encoded = json.dumps(value, default=str)
+        version = uuid.uuid4().hex
+        now = time.time()
+        try:
+            db = self._connection()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                db.execute(
+                    f"INSERT INTO {self._conversations_table} (conversation_id, expires_at) VALUES (?, ?) "
+                    "ON CONFLICT (conversation_id) DO UPDATE SET expires_at = excluded.expires_at",
+                    (conversation_id, now + self.ttl)
+                )
+                db.execute(
+                    f"INSERT OR REPLACE INTO {self._fields_table} "
+                    "(conversation_id, field, version, size, value) VALUES (?, ?, ?, ?, ?)",
+                    (conversation_id, field, version, len(encoded), encoded)
+                )
+
+                with self._lock:
+                    self._writes += 1
+                    prune = self._writes % self.PRUNE_INTERVAL == 0
+                if prune:
+                    self._enforce_budget(db, conversation_id)
+
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            self._error("writing", e)
+            self._forget((conversation_id, field))
+            return
+
+        # Values are returned as stored, matching the in-memory store
+        self._remember((conversation_id, field), version, value)
+
+    def delete(self, conversation_id: str, field: str) -> None:
+        """
+        Remove a field of a conversation.
+
+        Args:
+            conversation_id: The conversation ID
+            field: The field name
+        """
+        self._forget((conversation_id, field))
+        try:
+            db = self._connection()
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                db.execute(
+                    f"DELETE FROM {self._fields_table} WHERE conversation_id = ? AND field = ?",
+                    (conversation_id, field)
+                )
+                db.execute(
+                    f"DELETE FROM {self._conversations_table} WHERE conversation_id = ? AND NOT EXISTS "
+                    f"(SELECT 1 FROM {self._fields_table} WHERE conversation_id = ?)",
+                    (conversation_id, conversation_id)
+                )
+                db.execute("COMMIT")
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            self._error("writing", e)
+
+    def clear(self, conversation_id: Optional[str] = None) -> None:
+        """
+        Remove one conversation, or all conversations.
+
+        Args:
+            conversation_id: The conversation to remove, or None to remove all
+        """
+        with self._lock:
+            if conversation_id is None:
+                self._hot.clear()
+            else:
+                for key in [key for key in self._hot if key[0] == conversation_id]:
+                    del self._hot[key]
+
+        try:
+            db = self._connection()
+            if conversation_id is None:
+                db.execute(f"DELETE FROM {self._conversations_table}")
+            else:
+                db.execute(f"DELETE FROM {self._conversations_table} WHERE conversation_id = ?", (conversation_id,))
+        except sqlite3.Error as e:
+            self._error("clearing", e)
+
+    def expire(self) -> int:
+        """
+        Remove all conversations whose TTL has passed.
+
+        Returns:
+            Number of conversations removed
+        """
+        try:
+            cursor = self._connection().execute(
+                f"DELETE FROM {self._conversations_table} WHERE expires_at <= ?", (time.time(),)
+            )
+        except sqlite3.Error as e:
+            self._error("expiring", e)
+            return 0
+
+        expired = cursor.rowcount
+        if expired:
+            with self._lock:
+                self._stats["expirations"] += expired
+            logger.info(f"Expired {expired} conversations from '{self.name}'")
+        return expired
+
+    def field(self, name: str) -> "ConversationField":
+        """
+        Get a dictionary-like view of one field across conversations.
+
+        Args:
+            name: The field name
+
+        Returns:
+            A mapping of conversation ID to the field's value
+        """
+        return ConversationField(self, name)
+
+    def conversation_ids(self, field: str) -> List[str]:
+        """
+        List the conversations that have a field stored.
+
+        Args:
+            field: The field name
+
+        Returns:
+            Conversation IDs, least recently used first
+        """
+        try:
+            rows = self._connection().execute(
+                f"SELECT c.conversation_id FROM {self._conversations_table} c JOIN {self._fields_table} f "
+                "ON f.conversation_id = c.conversation_id "
+                "WHERE f.field = ? AND c.expires_at > ? ORDER BY c.expires_at",
+                (field, time.time())
+            ).fetchall()
+        except sqlite3.Error as e:
+            self._error("reading", e)
+            return []
+        return [row[0] for row in rows]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get storage metrics.
+
+        Returns:
+            Dictionary with conversation count, approximate bytes stored, budgets,
+            eviction, expiration and error counts, and in-process cache hits and misses
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["hot_entries"] = len(self._hot)
+
+        try:
+            db = self._connection()
+            stats["conversations"] = db.execute(f"SELECT COUNT(*) FROM {self._conversations_table}").fetchone()[0]
+            stats["approx_bytes"] = db.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self._fields_table}").fetchone()[0]
+        except sqlite3.Error as e:
+            self._error("reading", e)
+
+        stats["max_conversations"] = self.max_conversations
+        stats["max_bytes"] = self.max_bytes
+        stats["ttl"] = self.ttl
+        stats["shared"] = True
+        return stats
+
+    def close(self) -> None:
+        """Stop the background expiry thread and close the database connections."""
+        self._stop.set()
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for db in connections:
+            try:
+                db.close()
+            except sqlite3.Error:
+                pass
+
+    def __len__(self) -> int:
+        try:
+            return self._connection().execute(
+                f"SELECT COUNT(*) FROM {self._conversations_table} WHERE expires_at > ?", (time.time(),)
+            ).fetchone()[0]
+        except sqlite3.Error as e:
+            self._error("reading", e)
+            return 0
+
+    def _remember(self, key: tuple, version: str, value: Any) -> None:
+        """Cache a decoded value in process."""
+        with self._lock:
+            self._hot[key] = (version, value)
+            self._hot.move_to_end(key)
+            while len(self._hot) > self.hot_entries:
+                self._hot.popitem(last=False)
+
+    def _forget(self, key: tuple) -> None:
+        with self._lock:
+            self._hot.pop(key, None)
+
+    def _enforce_budget(self, db: sqlite3.Connection, keep: str) -> None:
+        """
+        Evict the conversations closest to expiry until within budget. Runs inside a write transaction.
+
+        Expiry times move with every use, so the order approximates least recently used.
+        """
+        now = time.time()
+        db.execute(f"DELETE FROM {self._conversations_table} WHERE expires_at <= ?", (now,))
+
+        count = db.execute(f"SELECT COUNT(*) FROM {self._conversations_table}").fetchone()[0]
+        total = db.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self._fields_table}").fetchone()[0]
+        if count <= self.max_conversations and total <= self.max_bytes:
+            return
+
+        rows = db.execute(
+            f"SELECT c.conversation_id, COALESCE(SUM(f.size), 0) FROM {self._conversations_table} c "
+            f"LEFT JOIN {self._fields_table} f ON f.conversation_id = c.conversation_id "
+            "WHERE c.conversation_id != ? GROUP BY c.conversation_id ORDER BY c.expires_at",
+            (keep,)
+        ).fetchall()
+
+        evicted = []
+        for conversation_id, size in rows:
+            if count <= self.max_conversations and total <= self.max_bytes:
+                break
+            evicted.append((conversation_id,))
+            count -= 1
+            total -= size
+
+        db.executemany(f"DELETE FROM {self._conversations_table} WHERE conversation_id = ?", evicted)
+        with self._lock:
+            self._stats["evictions"] += len(evicted)
+
+class ConversationField(MutableMapping):
+    """Dictionary-like view of one field of a conversation store, keyed by conversation ID"""
+
+    def __init__(self, store: "ConversationStore", name: str):
+        self.store = store
+        self.name = name
+
+    def __getitem__(self, conversation_id: str) -> Any:
+        value = self.store.get(conversation_id, self.name, _MISSING)
+        if value is _MISSING:
+            raise KeyError(conversation_id)
+        return value
+
+    def __setitem__(self, conversation_id: str, value: Any) -> None:
+        self.store.set(conversation_id, self.name, value)
+
+    def __delitem__(self, conversation_id: str) -> None:
+        if not self.store.contains(conversation_id, self.name):
+            raise KeyError(conversation_id)
+        self.store.delete(conversation_id, self.name)
+
+    def __contains__(self, conversation_id: object) -> bool:
+        return self.store.contains(conversation_id, self.name)
+
+    def get(self, conversation_id: str, default: Any = None) -> Any:
+        return self.store.get(conversation_id, self.name, default)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.store.conversation_ids(self.name))
+
+    def __len__(self) -> int:
+        return len(self.store.conversation_ids(self.name))
+
+def _create_store(name: str, ttl: float, max_conversations: int, max_bytes: int):
+    """Create a store in the shared database if one is configured, otherwise in process memory."""
+    if config.SHARED_STATE_DB_PATH:
+        try:
+            return SharedConversationStore(
+                name=name,
+                db_path=config.SHARED_STATE_DB_PATH,
+                ttl=ttl,
+                max_conversations=max_conversations,
+                max_bytes=max_bytes,
+                sweep_interval=config.CHAT_MEMORY_SWEEP_INTERVAL,
+                hot_entries=config.SHARED_STATE_HOT_ENTRIES
+            )
+        except sqlite3.Error as e:
+            logger.error(f"Could not open shared state store {config.SHARED_STATE_DB_PATH}, "
+                         f"using process memory for '{name}': {str(e)}")
+
+    return ConversationStore(
+        name=name,
+        ttl=ttl,
+        max_conversations=max_conversations,
+        max_bytes=max_bytes,
+        sweep_interval=config.CHAT_MEMORY_SWEEP_INTERVAL
+    )
+
+_conversation_store = None
+_session_store = None
+_store_lock = threading.Lock()
+
+def get_conversation_store():
+    """
+    Get the process-wide conversation store shared by all chat memory agents.
+
+    Returns:
+        The shared SharedConversationStore if SHARED_STATE_DB_PATH is set,
+        otherwise the in-memory ConversationStore
+    """
+    global _conversation_store
+    with _store_lock:
+        if _conversation_store is None:
+            _conversation_store = _create_store(
+                name="chat_memory",
+                ttl=config.LANGCHAIN_MEMORY_TTL,
+                max_conversations=config.CHAT_MEMORY_MAX_CONVERSATIONS,
+                max_bytes=config.CHAT_MEMORY_MAX_BYTES
+            )
+        return _conversation_store
+
+def get_session_store():
+    """
+    Get the process-wide web session store.
+
+    Returns:
+        The shared SharedConversationStore if SHARED_STATE_DB_PATH is set,
+        otherwise the in-memory ConversationStore
+    """
+    global _session_store
+    with _store_lock:
+        if _session_store is None:
+            _session_store = _create_store(
+                name="web_sessions",
+                ttl=config.SESSION_TTL,
+                max_conversations=config.SESSION_MAX_ENTRIES,
+                max_bytes=config.SESSION_MAX_BYTES
+            )
+        return _session_store
@@ -0,0 +1,365 @@
+"""
+Prometheus metrics for DealFinder AI.
+
+This module defines the application's metrics and small recording helpers for
+agent message handling, retailer HTTP requests and rate limits, source
+circuit breakers, Gemini calls, caches and scraped products. Recording is a no-op when prometheus-client is not installed
+or METRICS_ENABLED is off.
+
+Gemini calls are labelled with a call site, set by decorating the calling
+method (or wrapping the call) with llm_call_site("name").
+"""
+
+import contextvars
+import functools
+import inspect
+import os
+import time
+from typing import Any, Callable, Optional, Tuple
+
+from dealfinder import config
+from dealfinder.utils.logging import get_logger
+
+try:
+    from prometheus_client import Counter, Gauge, Histogram, CollectorRegistry, REGISTRY, CONTENT_TYPE_LATEST, generate_latest
+    from prometheus_client import multiprocess
+except ImportError:
+    Counter = None
+
+logger = get_logger("Metrics")
+
+# Buckets in seconds, from cache-speed lookups to slow scrapes and model calls
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+
+METRICS_AVAILABLE = Counter is not None
+
+if METRICS_AVAILABLE:
+    AGENT_SECONDS = Histogram(
+        "dealfinder_agent_process_seconds",
+        "Time agents spend handling a message",
+        ["agent", "message_type", "outcome"],
+        buckets=LATENCY_BUCKETS
+    )
+    HTTP_REQUESTS = Counter(
+        "dealfinder_http_requests_total",
+        "Retailer HTTP request attempts by response status",
+        ["host", "status"]
+    )
+    HTTP_SECONDS = Histogram(
+        "dealfinder_http_request_seconds",
+        "Retailer HTTP request attempt latency",
+        ["host"],
+        buckets=LATENCY_BUCKETS
+    )
+    HTTP_BYTES = Counter(
+        "dealfinder_http_response_bytes_total",
+        "Bytes received in successful retailer HTTP responses",
+        ["host"]
+    )
+    LLM_CALLS = Counter(
+        "dealfinder_llm_calls_total",
+        "Gemini calls by call site and outcome (ok, error or cached)",
+        ["call_site", "outcome"]
+    )
+    LLM_SECONDS = Histogram(
+        "dealfinder_llm_call_seconds",
+        "Gemini call latency, excluding cached responses",
+        ["call_site"],
+        buckets=LATENCY_BUCKETS
+    )
+    LLM_TOKENS = Counter(
+        "dealfinder_llm_tokens_total",
+        "Gemini tokens used by call site",
+        ["call_site", "kind"]
+    )
+    CACHE_LOOKUPS = Counter(
+        "dealfinder_cache_lookups_total",
+        "Cache lookups by cache and result (hit or miss)",
+        ["cache", "result"]
+    )
+    PRODUCTS = Counter(
+        "dealfinder_products_total",
+        "Products per source extracted from search results and removed by the relevance filter",
+        ["source", "stage"]
+    )
+    RATE_LIMIT_TOKENS = Gauge(
+        "dealfinder_rate_limit_tokens",
+        "Request tokens left in a retailer host's bucket (negative when requests are queued)",
+        ["host"],
+        multiprocess_mode="liveall"
+    )
+    RATE_LIMIT_RATE = Gauge(
+        "dealfinder_rate_limit_requests_per_second",
+        "Current request rate allowed for a retailer host",
+        ["host"],
+        multiprocess_mode="liveall"
+    )
+    RATE_LIMIT_WAIT_SECONDS = Histogram(
+        "dealfinder_rate_limit_wait_seconds",
+        "Time requests waited for their retailer host's rate limit",
+        ["host"],
+        buckets=LATENCY_BUCKETS
+    )
+    CIRCUIT_STATE = Gauge(
+        "dealfinder_circuit_state",
+        "Source circuit breaker state (0 closed, 1 half-open, 2 open)",
+        ["source"],
+        multiprocess_mode="liveall"
+    )
+    CIRCUIT_REJECTIONS = Counter(
+        "dealfinder_circuit_rejections_total",
+        "Searches skipped because the source's circuit was open",
+        ["source"]
+    )
+
+# Gauge values for circuit breaker states
+CIRCUIT_STATE_VALUES = {"closed": 0, "half_open": 1, "open": 2}
+
+_call_site = contextvars.ContextVar("llm_call_site", default=None)
+
+def enabled() -> bool:
+    """Check whether metrics are being recorded."""
+    return METRICS_AVAILABLE and config.METRICS_ENABLED
+
+def observe_agent(agent: str, message_type: str, outcome: str, seconds: float) -> None:
+    """
+    Record an agent's handling of one message.
+
+    Args:
+        agent: Agent name
+        message_type: Type of the incoming message
+        outcome: Type of the response message, or "exception"
+        seconds: Handling time
+    """
+    if enabled():
+        AGENT_SECONDS.labels(agent, message_type, outcome).observe(seconds)
+
+def observe_http(host: str, status: Any, seconds: float, size: int = 0) -> None:
+    """
+    Record one HTTP request attempt.
+
+    Args:
+        host: Request host
+        status: Response status code, or "error" if the request failed
+        seconds: Attempt duration
+        size: Bytes received, for successful responses
+    """
+    if enabled():
+        HTTP_REQUESTS.labels(host, str(status)).inc()
+        HTTP_SECONDS.labels(host).observe(seconds)
+        if size:
+            HTTP_BYTES.labels(host).inc(size)
+
+def observe_llm(call_site: str,
+                outcome: str,
+                seconds: Optional[float] = None,
+                response: Any = None) -> None:
+    """
+    Record one Gemini call.
+
+    Args:
+        call_site: Call site label
+        outcome: "ok", "error" or "cached"
+        seconds: Call duration, omitted for cached responses
+        response: Optional Gemini response whose usage metadata is counted
+    """
+    if not enabled():
+        return
+
+    LLM_CALLS.labels(call_site, outcome).inc()
+    if seconds is not None:
+        LLM_SECONDS.labels(call_site).observe(seconds)
+
+    usage = getattr(response, "usage_metadata", None)
+    if usage is not None:
+        LLM_TOKENS.labels(call_site, "prompt").inc(getattr(usage, "prompt_token_count", 0) or 0)
+        LLM_TOKENS.labels(call_site, "completion").inc(getattr(usage, "candidates_token_count", 0) or 0)
+
+def count_cache_lookup(cache: str, hit: bool) -> None:
+    """
+    Record a cache lookup.
+
+    Args:
+        cache: Cache name
+        hit: Whether the lookup was served from the cache
+    """
+    if enabled():
+        CACHE_LOOKUPS.labels(cache, "hit" if hit else "miss").inc()
+
+def count_products(source: str, extracted: int, kept: int) -> None:
+    """
+    Record the products a source extracted and how many the relevance filter removed.
+
+    Args:
+        source: Source name (e.g. "amazon")
+        extracted: Products extracted from the search results
+        kept: Products left after relevance filtering
+    """
+    if enabled():
+        PRODUCTS.labels(source, "extracted").inc(extracted)
+        PRODUCTS.labels(source, "filtered").inc(max(0, extracted - kept))
+
+def observe_rate_limit(host: str, tokens: float, rate: float, wait: Optional[float] = None) -> None:
+    """
+    Record a retailer host's rate limit state.
+
+    Args:
+        host: Request host
+        tokens: Tokens left in the host's bucket
+        rate: Current allowed requests per second
+        wait: Time a request waited for its slot, when recording a request
+    """
+    if not enabled():
+        return
+
+    RATE_LIMIT_TOKENS.labels(host).set(tokens)
+    RATE_LIMIT_RATE.labels(host).set(rate)
+    if wait is not None:
+        RATE_LIMIT_WAIT_SECONDS.labels(host).observe(wait)
+
+def observe_circuit_state(source: str, state: str) -> None:
+    """
+    Record a source circuit breaker's state.
+
+    Args:
+        source: Source name
+        state: "closed", "half_open" or "open"
+    """
+    if enabled():
+        CIRCUIT_STATE.labels(source).set(CIRCUIT_STATE_VALUES[state])
+
+def count_circuit_rejection(source: str) -> None:
+    """
+    Record a search skipped because the source's circuit was open.
+
+    Args:
+        source: Source name
+    """
+    if enabled():
+        CIRCUIT_REJECTIONS.labels(source).inc()
+
+class LLMCallSite:
+    """Context manager and decorator labelling the Gemini calls made inside it with a call site"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._tokens = []
+
+    def __enter__(self):
+        self._tokens.append(_call_site.set(self.name))
+        return self
+
+    def __exit__(self, *exc_info):
+        _call_site.reset(self._tokens.pop())
+        return False
+
+    def __call__(self, func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                token = _call_site.set(self.name)
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    _call_site.reset(token)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            token = _call_site.set(self.name)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _call_site.reset(token)
+        return wrapper
+
+def llm_call_site(name: str) -> LLMCallSite:
+    """
+    Label the Gemini calls made inside a block or method with a call site.
+
+    Usable as a context manager or as a decorator on sync and async functions.
+
+    Args:
+        name: Call site label (e.g. "optimize_search_params")
+
+    Returns:
+        The LLMCallSite
+    """
+    return LLMCallSite(name)
+
+def current_llm_call_site(default: str) -> str:
+    """
+    Get the call site label set by the innermost llm_call_site.
+
+    Args:
+        default: Label used when no call site is set
+
+    Returns:
+        The call site label
+    """
+    return _call_site.get() or default
+
+def instrument_agent_method(method: Callable) -> Callable:
+    """
+    Wrap an agent's process_message or async_process_message to record its latency.
+
+    Args:
+        method: The method to wrap
+
+    Returns:
+        The wrapped method
+    """
+    if getattr(method, "_instrumented", False):
+        return method
+
+    def record(agent, message, response, started):
+        outcome = getattr(response, "message_type", "exception")
+        observe_agent(agent.name, getattr(message, "message_type", "unknown"), outcome, time.perf_counter() - started)
+
+    if inspect.iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def async_wrapper(self, message, *args, **kwargs):
+            started = time.perf_counter()
+            response = None
+            try:
+                response = await method(self, message, *args, **kwargs)
+                return response
+            finally:
+                record(self, message, response, started)
+        async_wrapper._instrumented = True
+        return async_wrapper
+
+    @functools.wraps(method)
+    def wrapper(self, message, *args, **kwargs):
+        started = time.perf_counter()
+        response = None
+        try:
+            response = method(self, message, *args, **kwargs)
+            return response
+        finally:
+            record(self, message, response, started)
+    wrapper._instrumented = True
+    return wrapper
+
+def render_metrics() -> Tuple[bytes, str]:
+    """
+    Render all metrics in the Prometheus text format.
+
+    When PROMETHEUS_MULTIPROC_DIR is set (e.g. under gunicorn with several
+    workers), metrics from every worker process are aggregated.
+
+    Returns:
+        Tuple of (payload, content type)
+
+    Raises:
+        RuntimeError: If prometheus-client is not installed
+    """
+    if not METRICS_AVAILABLE:
+        raise RuntimeError("prometheus-client is not installed")
+
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,255 @@
+"""
+Columnar product ranking utilities for DealFinder AI.
+
+This module turns a batch of product dictionaries into NumPy columns, computes
+every score component as a vector operation and selects the best products with
+a partial sort, so ranking stays cheap for result sets in the thousands.
+"""
+
+import math
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+def _to_float(value: Any) -> float:
+    """Convert a product field to float, NaN if it is not numeric."""
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return math.nan
+
+def _to_int(value: Any) -> int:
+    """Convert a product field to int, -1 if it is not an integer."""
+    try:
+        return int(value)
+    except (ValueError, TypeError, OverflowError):
+        return -1
+
+def _text(product: Dict[str, Any], field: str) -> str:
+    """Get a lowercase text field, empty if the product does not have it."""
+    return str(product[field]).lower() if field in product else ""
+
+def _parse_price_range(search_params: Dict[str, Any]) -> Tuple[bool, Optional[float], Optional[float]]:
+    """
+    Parse the requested price range once for the whole batch.
+
+    Returns:
+        Tuple of (whether price scoring applies, minimum price, maximum price).
+        A malformed range disables price scoring, as the per-product scorer did.
+    """
+    if not search_params.get("price_range"):
+        return True, None, None
+
+    try:
+        min_price, max_price = search_params["price_range"]
+    except (ValueError, TypeError):
+        return False, None, None
+
+    def bound(value):
+        try:
+            return float(value)
+        except (ValueError, TypeError):
+            return None
+
+    if min_price and max_price:
+        min_bound, max_bound = bound(min_price), bound(max_price)
+        # Both bounds are needed for the range bonus
+        if min_bound is None or max_bound is None:
+            return True, None, None
+        return True, min_bound, max_bound
+    if max_price:
+        return True, None, bound(max_price)
+    if min_price:
+        return True, bound(min_price), None
+    return True, None, None
+
+def product_columns(products: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """
+    Extract the fields used for ranking into NumPy columns.
+
+    Missing or non-numeric values become NaN (-1 for review counts), missing
+    flags become False and missing text fields become empty strings.
+
+    Args:
+        products: List of product dictionaries
+
+    Returns:
+        Dictionary of field name to column
+    """
+    fields = {name: [] for name in (
+        "rating", "reviews", "price", "shipping", "seller_rating",
+        "is_free_shipping", "is_prime", "is_pickup_today", "is_sponsored",
+        "condition", "listing_type",
+    )}
+
+    for product in products:
+        fields["rating"].append(_to_float(product["rating"]) if "rating" in product else math.nan)
+        fields["reviews"].append(_to_int(product["reviews"]) if "reviews" in product else -1)
+        fields["price"].append(_to_float(product["price"]) if "price" in product else math.nan)
+        fields["shipping"].append(_to_float(product["shipping"]) if "shipping" in product else math.nan)
+        fields["seller_rating"].append(_to_float(product["seller_rating"]) if "seller_rating" in product else math.nan)
+        fields["is_free_shipping"].append(bool(product.get("is_free_shipping")))
+        fields["is_prime"].append(bool(product.get("is_prime")))
+        fields["is_pickup_today"].append(bool(product.get("is_pickup_today")))
+        fields["is_sponsored"].append(bool(product.get("is_sponsored")))
+        fields["condition"].append(_text(product, "condition"))
+        fields["listing_type"].append(_text(product, "listing_type"))
+
+    columns = {
+        "reviews": np.array(fields.pop("reviews"), dtype=np.int64),
+        "condition": np.array(fields.pop("condition"), dtype=str),
+        "listing_type": np.array(fields.pop("listing_type"), dtype=str),
+    }
+    for name in ("is_free_shipping", "is_prime", "is_pickup_today", "is_sponsored"):
+        columns[name] = np.array(fields.pop(name), dtype=bool)
+    for name, values in fields.items():
+        columns[name] = np.array(values, dtype=np.float64)
+
+    return columns
+
+def _contains(column: np.ndarray, text: str) -> np.ndarray:
+    """Vectorized substring test over a string column."""
+    if column.size == 0:
+        return np.zeros(0, dtype=bool)
+    return np.char.find(column, text) >= 0
+
+def score_products(products: List[Dict[str, Any]], search_params: Dict[str, Any]) -> np.ndarray:
+    """
+    Score a batch of products for the given search.
+
+    Args:
+        products: List of product dictionaries
+        search_params: Search parameters (price_range is used)
+
+    Returns:
+        Array of scores, one per product
+    """
+    columns = product_columns(products)
+    scores = np.zeros(len(products), dtype=np.float64)
+
+    # Higher ratings increase score
+    rating = columns["rating"]
+    scores += np.where(np.isnan(rating), 0.0, rating * 10)
+
+    # More reviews increase confidence
+    reviews = columns["reviews"]
+    scores += np.select([reviews > 1000, reviews > 500, reviews > 100], [15, 10, 5], default=0)
+
+    # Price considerations
+    price_scoring, min_price, max_price = _parse_price_range(search_params)
+    price = columns["price"]
+    has_price = ~np.isnan(price)
+    if price_scoring:
+        if min_price is not None and max_price is not None:
+            # Too cheap might indicate lower quality, too expensive is penalized more
+            price_fit = np.select(
+                [(price >= min_price) & (price <= max_price), price < min_price, price > max_price],
+                [20, -5, -15],
+                default=0
+            )
+        elif max_price is not None:
+            price_fit = np.where(price <= max_price, 10, 0)
+        elif min_price is not None:
+            price_fit = np.where(price >= min_price, 5, 0)
+        else:
+            price_fit = np.zeros(len(products))
+
+        # Generally, lower prices are better for same product
+        normalized_price_score = np.maximum(0, 30 - price / 10)
+        scores += np.where(has_price, price_fit + normalized_price_score, 0.0)
+
+    # Free shipping bonus, from a zero shipping cost or the free shipping flag
+    scores += np.where(columns["shipping"] == 0, 5, 0)
+    scores += np.where(columns["is_free_shipping"], 5, 0)
+
+    # Prime (Amazon) and pickup today (Walmart) benefits
+    scores += np.where(columns["is_prime"], 8, 0)
+    scores += np.where(columns["is_pickup_today"], 6, 0)
+
+    # Condition considerations (eBay)
+    condition = columns["condition"]
+    scores += np.select(
+        [
+            _contains(condition, "new"),
+            _contains(condition, "refurbished") | _contains(condition, "renewed"),
+            _contains(condition, "used") & _contains(condition, "like new"),
+        ],
+        [10, 5, 3],
+        default=0
+    )
+
+    # Buy It Now is generally preferred for immediacy (eBay)
+    scores += np.where(_contains(columns["listing_type"], "buy it now"), 5, 0)
+
+    # Seller rating considerations (eBay)
+    seller_rating = columns["seller_rating"]
+    scores += np.select([seller_rating > 95, seller_rating > 90], [5, 3], default=0)
+
+    # Sponsored items are ranked lower
+    scores -= np.where(columns["is_sponsored"], 10, 0)
+
+    return scores
+
+def order_by_score(scores: np.ndarray, indices: np.ndarray) -> np.ndarray:
+    """
+    Order product indices by descending score, ties kept in input order.
+
+    Args:
+        scores: Scores of all products
+        indices: Indices to order
+
+    Returns:
+        The ordered indices
+    """
+    indices = np.asarray(indices, dtype=np.int64)
+    return indices[np.lexsort((indices, -scores[indices]))]
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Select the k best-scored products without sorting the whole batch.
+
+    Uses argpartition to find the k-th best score, then keeps every product
+    above it and the earliest products tied with it, which gives the same
+    selection as a stable full sort.
+
+    Args:
+        scores: Product scores
+        k: Number of products to select
+
+    Returns:
+        Indices of the selected products, best first
+    """
+    n = len(scores)
+    if k >= n:
+        return order_by_score(scores, np.arange(n))
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+
+    # NaN scores rank last
+    keys = np.where(np.isnan(scores), -np.inf, scores)
+    threshold = keys[np.argpartition(-keys, k - 1)[k - 1]]
+    above = np.flatnonzero(keys > threshold)
+    tied = np.flatnonzero(keys == threshold)[:k - len(above)]
+    return order_by_score(keys, np.concatenate((above, tied)))
+
+def best_index_per_group(scores: np.ndarray, groups: List[Any]) -> List[int]:
+    """
+    Find the best-scored product of each group (e.g. each source).
+
+    Args:
+        scores: Product scores
+        groups: Group label of each product
+
+    Returns:
+        Index of the first best-scored product in each group
+    """
+    codes = {}
+    group_codes = np.array([codes.setdefault(group, len(codes)) for group in groups], dtype=np.int64)
+    keys = np.where(np.isnan(scores), -np.inf, scores)
+
+    best = []
+    for code in range(len(codes)):
+        members = np.flatnonzero(group_codes == code)
+        # argmax returns the first maximum, matching a stable sort
+        best.append(int(members[np.argmax(keys[members])]))
+    return best
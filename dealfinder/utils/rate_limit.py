@@ -0,0 +1,230 @@
+"""
+Per-host request rate limiting for DealFinder AI.
+
+This module provides one token bucket per retailer host, shared by every
+scraper, query and HTTP transport in the process. A request only waits when
+the host's request rate exceeds its budget. The budget is halved when the
+host answers 429 or 503 and recovers gradually on successful responses.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Dict, Any, Optional, Tuple
+
+from dealfinder import config
+from dealfinder.utils.logging import get_logger
+from dealfinder.utils.metrics import observe_rate_limit
+
+logger = get_logger("RateLimit")
+
+# Response statuses that mean the host wants us to slow down
+THROTTLE_STATUSES = (429, 503)
+
+class RateLimitExceeded(RuntimeError):
+    """Raised when a request would have to wait longer than the maximum wait for its host"""
+
+class _Bucket:
+    """Token bucket state for one host"""
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+        self.stats = {"requests": 0, "delayed": 0, "rejected": 0, "throttled": 0, "wait_seconds": 0.0}
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+class HostRateLimiter:
+    """Thread-safe per-host token buckets with adaptive rates"""
+
+    def __init__(self,
+                 rate: float,
+                 burst: float,
+                 min_rate: float,
+                 recovery: float,
+                 max_wait: float,
+                 host_limits: Optional[Dict[str, Tuple[float, float]]] = None):
+        """
+        Initialize the limiter.
+
+        Args:
+            rate: Default requests per second allowed per host
+            burst: Default number of requests a host may receive back to back
+            min_rate: Lowest rate a host is slowed down to after throttling responses
+            recovery: Fraction of the base rate restored after each successful response
+            max_wait: Longest a request may wait for its host before RateLimitExceeded is raised
+            host_limits: Optional (rate, burst) overrides keyed by host
+        """
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.recovery = recovery
+        self.max_wait = max_wait
+        self.host_limits = host_limits or {}
+
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, host: str) -> float:
+        """
+        Reserve the host's next request slot.
+
+        Slots are handed out in order, so concurrent callers queue behind each
+        other instead of all waking up at once.
+
+        Args:
+            host: Request host
+
+        Returns:
+            Seconds the caller must wait before sending the request
+
+        Raises:
+            RateLimitExceeded: If the slot is more than max_wait away
+        """
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._bucket(host, now)
+            bucket.refill(now)
+            wait = max(0.0, (1 - bucket.tokens) / bucket.rate)
+            if wait > self.max_wait:
+                bucket.stats["rejected"] += 1
+                raise RateLimitExceeded(f"Request to {host} would wait {wait:.1f}s (limit {self.max_wait}s)")
+
+            # Tokens may go negative: that is the queue of requests already promised a later slot
+            bucket.tokens -= 1
+            bucket.stats["requests"] += 1
+            if wait:
+                bucket.stats["delayed"] += 1
+                bucket.stats["wait_seconds"] += wait
+            tokens, rate = bucket.tokens, bucket.rate
+
+        observe_rate_limit(host, tokens, rate, wait)
+        return wait
+
+    def acquire(self, host: str) -> float:
+        """
+        Wait for the host's next request slot.
+
+        Args:
+            host: Request host
+
+        Returns:
+            Seconds waited
+
+        Raises:
+            RateLimitExceeded: If the slot is more than max_wait away
+        """
+        wait = self.reserve(host)
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    async def async_acquire(self, host: str) -> float:
+        """
+        Wait for the host's next request slot without blocking the event loop.
+
+        Args:
+            host: Request host
+
+        Returns:
+            Seconds waited
+
+        Raises:
+            RateLimitExceeded: If the slot is more than max_wait away
+        """
+        wait = self.reserve(host)
+        if wait:
+            await asyncio.sleep(wait)
+        return wait
+
+    def record_response(self, host: str, status: Any, retry_after: Optional[str] = None) -> None:
+        """
+        Adapt the host's rate to a response.
+
+        Throttling responses (429, 503) halve the rate, down to min_rate, and
+        hold back further requests for the Retry-After period when given.
+        Successful responses restore the rate towards its base step by step.
+
+        Args:
+            host: Request host
+            status: Response status code
+            retry_after: Optional Retry-After header value, in seconds
+        """
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._bucket(host, now)
+            bucket.refill(now)
+            if status in THROTTLE_STATUSES:
+                bucket.rate = max(self.min_rate, bucket.rate / 2)
+                bucket.stats["throttled"] += 1
+                try:
+                    delay = float(retry_after) if retry_after else 0.0
+                except ValueError:
+                    delay = 0.0
+                bucket.tokens = min(bucket.tokens, 1 - delay * bucket.rate)
+                logger.warning(f"{host} answered {status}, slowing down to {bucket.rate:.2f} requests/s")
+            elif status == 200 and bucket.rate < bucket.base_rate:
+                bucket.rate = min(bucket.base_rate, bucket.rate + bucket.base_rate * self.recovery)
+            tokens, rate = bucket.tokens, bucket.rate
+
+        observe_rate_limit(host, tokens, rate)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get bucket state and counters per host.
+
+        Returns:
+            Dictionary keyed by host with current tokens and rate, the base
+            rate and burst, and request, delay, rejection and throttle counts
+            with the total time spent waiting
+        """
+        now = time.monotonic()
+        with self._lock:
+            stats = {}
+            for host, bucket in self._buckets.items():
+                bucket.refill(now)
+                stats[host] = dict(bucket.stats)
+                stats[host]["wait_seconds"] = round(bucket.stats["wait_seconds"], 3)
+                stats[host].update({
+                    "tokens": round(bucket.tokens, 3),
+                    "rate": round(bucket.rate, 3),
+                    "base_rate": bucket.base_rate,
+                    "burst": bucket.burst,
+                })
+        return stats
+
+    def _bucket(self, host: str, now: float) -> _Bucket:
+        """Get or create the bucket for a host. Caller must hold the lock."""
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            rate, burst = self.host_limits.get(host, (self.rate, self.burst))
+            bucket = self._buckets[host] = _Bucket(rate, burst, now)
+        return bucket
+
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+def get_rate_limiter() -> HostRateLimiter:
+    """
+    Get the process-wide per-host rate limiter shared by the HTTP transports.
+
+    Returns:
+        The shared HostRateLimiter instance
+    """
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = HostRateLimiter(
+                rate=config.HTTP_RATE_LIMIT_PER_SECOND,
+                burst=config.HTTP_RATE_LIMIT_BURST,
+                min_rate=config.HTTP_RATE_LIMIT_MIN_RATE,
+                recovery=config.HTTP_RATE_LIMIT_RECOVERY,
+                max_wait=config.HTTP_RATE_LIMIT_MAX_WAIT,
+                host_limits=config.HTTP_HOST_RATE_LIMITS
+            )
+        return _rate_limiter
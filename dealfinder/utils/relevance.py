@@ -0,0 +1,164 @@
+"""
+Relevance term matching utilities for DealFinder AI.
+
+This module compiles a query's keywords, brands, must-include and exclude
+terms into a single regular expression, so each product's text is scanned
+once instead of once per term.
+"""
+
+import re
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
+
+def _as_terms(value: Any) -> List[str]:
+    """Normalize a search parameter holding one term or a list of terms to lowercase strings."""
+    if not value:
+        return []
+    if not isinstance(value, list):
+        value = [value]
+    return [str(term).lower() for term in value if term]
+
+class TermAutomaton:
+    """Compiled multi-pattern matcher reporting every occurrence of every term"""
+
+    def __init__(self, terms: Tuple[str, ...]):
+        """
+        Compile the terms.
+
+        The pattern is a lookahead alternation tried at every position, longest
+        term first, so overlapping matches are found. A shorter term starting at
+        the same position as a longer one is recovered through the longer term's
+        list of contained terms.
+
+        Args:
+            terms: Unique lowercase terms
+        """
+        self.terms = terms
+        ordered = sorted(terms, key=len, reverse=True)
+        self.pattern = re.compile("(?=(" + "|".join(re.escape(term) for term in ordered) + "))") if ordered else None
+
+        # term -> [(contained term, offsets within term)]
+        self.contained = {}
+        for term in terms:
+            self.contained[term] = [
+                (other, [match.start() for match in re.finditer(f"(?={re.escape(other)})", term)])
+                for other in terms if other != term and other in term
+            ]
+
+    def find_all(self, text: str) -> Dict[str, List[int]]:
+        """
+        Find all occurrences of the terms in a lowercase text in one pass.
+
+        Args:
+            text: The lowercase text to scan
+
+        Returns:
+            Dictionary of matched term to sorted start positions
+        """
+        if self.pattern is None:
+            return {}
+
+        positions = {}
+        for match in self.pattern.finditer(text):
+            start = match.start()
+            term = match.group(1)
+            positions.setdefault(term, set()).add(start)
+            for other, offsets in self.contained[term]:
+                positions.setdefault(other, set()).update(start + offset for offset in offsets)
+
+        return {term: sorted(starts) for term, starts in positions.items()}
+
+@lru_cache(maxsize=128)
+def compile_terms(terms: Tuple[str, ...]) -> TermAutomaton:
+    """
+    Get the compiled matcher for a set of terms, reusing it across pages of the same query.
+
+    Args:
+        terms: Unique lowercase terms
+
+    Returns:
+        The compiled TermAutomaton
+    """
+    return TermAutomaton(terms)
+
+class RelevanceMatcher:
+    """Applies a query's term criteria to product titles and descriptions"""
+
+    def __init__(self,
+                 keywords: List[str],
+                 brands: List[str],
+                 must_include_terms: List[str],
+                 exclude_terms: List[str]):
+        """
+        Initialize the matcher.
+
+        Args:
+            keywords: Lowercase keywords scored in titles and descriptions
+            brands: Lowercase brands, at least one of which must appear
+            must_include_terms: Lowercase terms that must all appear
+            exclude_terms: Lowercase terms that must not appear
+        """
+        self.keywords = keywords
+        self.brands = brands
+        self.must_include_terms = must_include_terms
+        self.exclude_terms = exclude_terms
+
+        unique_terms = sorted(set(keywords) | set(brands) | set(must_include_terms) | set(exclude_terms))
+        self.automaton = compile_terms(tuple(unique_terms))
+
+    @classmethod
+    def from_search_params(cls, search_params: Dict[str, Any]) -> "RelevanceMatcher":
+        """
+        Build a matcher from scraper search parameters.
+
+        Args:
+            search_params: Search parameters with keywords, brands, must_include_terms and exclude_terms
+
+        Returns:
+            The RelevanceMatcher for the query
+        """
+        return cls(
+            keywords=_as_terms(search_params.get("keywords")),
+            brands=_as_terms(search_params.get("brands")),
+            must_include_terms=_as_terms(search_params.get("must_include_terms")),
+            exclude_terms=_as_terms(search_params.get("exclude_terms"))
+        )
+
+    def match(self, title: str, description: str) -> Optional[Tuple[int, int]]:
+        """
+        Check a product against the criteria and count its keyword matches.
+
+        Title and description are scanned together as "<title> <description>",
+        the same text the criteria have always been checked against.
+
+        Args:
+            title: Lowercase product title
+            description: Lowercase product description
+
+        Returns:
+            Tuple of (keywords found in the title, keywords found in the description),
+            or None if the product fails the exclude, must-include or brand criteria
+        """
+        found = self.automaton.find_all(f"{title} {description}")
+
+        if any(term in found for term in self.exclude_terms):
+            return None
+        if not all(term in found for term in self.must_include_terms):
+            return None
+        if self.brands and not any(brand in found for brand in self.brands):
+            return None
+
+        title_end = len(title)
+        description_start = title_end + 1
+        title_matches = 0
+        description_matches = 0
+        for keyword in self.keywords:
+            starts = found.get(keyword)
+            if not starts:
+                continue
+            if any(start + len(keyword) <= title_end for start in starts):
+                title_matches += 1
+            if any(start >= description_start for start in starts):
+                description_matches += 1
+
+        return title_matches, description_matches
@@ -0,0 +1,503 @@
+"""
+Lightweight per-query tracing for DealFinder AI.
+
+Spans record how long each step of a query took. The current span is tracked
+per thread and task, and MCPMessages carry their trace and parent span IDs so
+agent spans nest correctly even when agents run on other threads. When a
+trace's root span ends, the trace is appended to TRACE_FILE as one OTLP/JSON
+line and kept in memory for the /api/traces endpoints. The file is rotated by
+size, keeping TRACE_FILE_BACKUPS older files.
+
+Render a waterfall of traces from the file with:
+
+    python -m dealfinder.utils.tracing dealfinder_traces.jsonl [trace_id]
+"""
+
+import contextvars
+import functools
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Any, Callable, Iterator, List, Optional
+
+from dealfinder import config
+from dealfinder.utils.logging import get_logger
+
+logger = get_logger("Tracing")
+
+class Span:
+    """One timed operation within a trace"""
+
+    __slots__ = ("trace_id", "span_id", "parent_span_id", "name", "attributes", "start_ns", "end_ns", "status")
+
+    def __init__(self, name: str, trace_id: str, parent_span_id: Optional[str] = None,
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_span_id = parent_span_id
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.status = "ok"
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """
+        Attach an attribute to the span.
+
+        Args:
+            key: Attribute name
+            value: Attribute value (str, int, float or bool)
+        """
+        self.attributes[key] = value
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """
+        Convert the span to its OTLP/JSON representation.
+
+        Returns:
+            Dictionary in the OpenTelemetry protocol's JSON span format
+        """
+        attributes = []
+        for key, value in self.attributes.items():
+            if isinstance(value, bool):
+                attributes.append({"key": key, "value": {"boolValue": value}})
+            elif isinstance(value, int):
+                attributes.append({"key": key, "value": {"intValue": str(value)}})
+            elif isinstance(value, float):
+                attributes.append({"key": key, "value": {"doubleValue": value}})
+            else:
+                attributes.append({"key": key, "value": {"stringValue": str(value)}})
+
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_span_id or "",
+            "name": self.name,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": attributes,
+            # OTLP status codes: 1 = OK, 2 = ERROR
+            "status": {"code": 2 if self.status == "error" else 1},
+        }
+
+class _NoopSpan:
+    """Span stand-in used when tracing is disabled"""
+
+    trace_id = None
+    span_id = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+_NOOP_SPAN = _NoopSpan()
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+class Tracer:
+    """Collects spans per trace and exports each trace when its root span ends"""
+
+    def __init__(self,
+                 path: Optional[str],
+                 max_recent: int = 50,
+                 max_pending: int = 1000,
+                 max_bytes: int = 16 * 1024 * 1024,
+                 backups: int = 3):
+        """
+        Initialize the tracer.
+
+        Args:
+            path: File finished traces are appended to as OTLP/JSON lines, or None to keep them in memory only
+            max_recent: Number of finished traces kept in memory
+            max_pending: Maximum number of unfinished traces tracked before the oldest are dropped
+            max_bytes: Size at which the trace file is rotated to "<path>.1", 0 to never rotate
+            backups: Number of rotated files kept ("<path>.1" is the newest), older ones are deleted
+        """
+        self.path = path
+        self.max_recent = max_recent
+        self.max_pending = max_pending
+        self.max_bytes = max_bytes
+        self.backups = backups
+
+        self._pending = OrderedDict()  # trace id -> finished spans of traces whose root is still open
+        self._recent = OrderedDict()  # trace id -> spans of finished traces, oldest first
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    @contextmanager
+    def start_span(self,
+                   name: str,
+                   attributes: Optional[Dict[str, Any]] = None,
+                   trace_id: Optional[str] = None,
+                   parent_span_id: Optional[str] = None) -> Iterator[Span]:
+        """
+        Open a span for the duration of a block.
+
+        Without an explicit trace ID the span joins the current span's trace,
+        or starts a new trace if there is none.
+
+        Args:
+            name: Span name
+            attributes: Optional initial attributes
+            trace_id: Optional trace to join, e.g. from an incoming MCPMessage
+            parent_span_id: Optional parent span within that trace
+
+        Yields:
+            The open Span
+        """
+        if trace_id is None:
+            parent = _current_span.get()
+            if parent is not None:
+                trace_id, parent_span_id = parent.trace_id, parent.span_id
+            else:
+                trace_id = os.urandom(16).hex()
+
+        span = Span(name, trace_id, parent_span_id, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "error"
+            span.set_attribute("error", f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end_ns = time.time_ns()
+            self._finish(span)
+
+    def get_trace(self, trace_id: str) -> Optional[List[Span]]:
+        """
+        Get the spans of a recently finished trace.
+
+        Args:
+            trace_id: The trace ID
+
+        Returns:
+            The trace's spans ordered by start time, or None if it is not kept
+        """
+        with self._lock:
+            spans = self._recent.get(trace_id)
+            return sorted(spans, key=lambda span: span.start_ns) if spans is not None else None
+
+    def recent(self) -> List[Dict[str, Any]]:
+        """
+        Summarize the recently finished traces.
+
+        Returns:
+            List of dictionaries with trace ID, root span name, start time,
+            duration and span count, most recent first
+        """
+        with self._lock:
+            traces = list(self._recent.items())
+
+        summaries = []
+        for trace_id, spans in reversed(traces):
+            root = _root_span(spans)
+            summaries.append({
+                "trace_id": trace_id,
+                "name": root.name,
+                "start": root.start_ns / 1e9,
+                "duration_ms": round((root.end_ns - root.start_ns) / 1e6, 1),
+                "spans": len(spans),
+            })
+        return summaries
+
+    def _finish(self, span: Span) -> None:
+        """Record an ended span, exporting the trace if it was the root."""
+        with self._lock:
+            if span.parent_span_id is not None:
+                if span.trace_id in self._recent:
+                    # Ended after its root, e.g. a search that outlived the query's deadline
+                    self._recent[span.trace_id].append(span)
+                    late = [span]
+                else:
+                    self._pending.setdefault(span.trace_id, []).append(span)
+                    while len(self._pending) > self.max_pending:
+                        self._pending.popitem(last=False)
+                    return
+            else:
+                late = self._pending.pop(span.trace_id, []) + [span]
+                self._recent[span.trace_id] = late
+                while len(self._recent) > self.max_recent:
+                    self._recent.popitem(last=False)
+
+        self._export(late)
+
+    def _export(self, spans: List[Span]) -> None:
+        """Append spans to the trace file as one OTLP/JSON export request."""
+        if not self.path:
+            return
+
+        payload = {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": "dealfinder"}}]},
+                "scopeSpans": [{"scope": {"name": "dealfinder"}, "spans": [span.to_otlp() for span in spans]}],
+            }]
+        }
+        line = json.dumps(payload) + "\n"
+        try:
+            with self._write_lock:
+                self._rotate_if_due(len(line))
+                with open(self.path, "a") as f:
+                    f.write(line)
+        except OSError as e:
+            logger.error(f"Error writing traces to {self.path}: {str(e)}")
+
+    def _rotate_if_due(self, incoming: int) -> None:
+        """Rotate the trace file if the next write would take it past max_bytes. Caller must hold the write lock."""
+        if self.max_bytes <= 0:
+            return
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return
+        if not size or size + incoming <= self.max_bytes:
+            return
+
+        if self.backups <= 0:
+            os.remove(self.path)
+            return
+        for index in range(self.backups - 1, 0, -1):
+            older = f"{self.path}.{index}"
+            if os.path.exists(older):
+                os.replace(older, f"{self.path}.{index + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+_tracer = None
+_tracer_lock = threading.Lock()
+
+def get_tracer() -> Tracer:
+    """
+    Get the process-wide tracer.
+
+    Returns:
+        The shared Tracer instance
+    """
+    global _tracer
+    with _tracer_lock:
+        if _tracer is None:
+            _tracer = Tracer(
+                path=config.TRACE_FILE,
+                max_recent=config.TRACE_MAX_RECENT,
+                max_bytes=config.TRACE_FILE_MAX_BYTES,
+                backups=config.TRACE_FILE_BACKUPS
+            )
+        return _tracer
+
+@contextmanager
+def start_span(name: str,
+               attributes: Optional[Dict[str, Any]] = None,
+               trace_id: Optional[str] = None,
+               parent_span_id: Optional[str] = None) -> Iterator[Any]:
+    """
+    Open a span on the shared tracer, or a no-op span if tracing is disabled.
+
+    Args:
+        name: Span name
+        attributes: Optional initial attributes
+        trace_id: Optional trace to join
+        parent_span_id: Optional parent span within that trace
+
+    Yields:
+        The open span
+    """
+    if not config.TRACING_ENABLED:
+        yield _NOOP_SPAN
+        return
+
+    with get_tracer().start_span(name, attributes, trace_id, parent_span_id) as span:
+        yield span
+
+def traced(name: str) -> Callable[[Callable], Callable]:
+    """
+    Decorate a sync or async function to run inside a span.
+
+    Args:
+        name: Span name
+
+    Returns:
+        The decorator
+    """
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with start_span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with start_span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def current_span() -> Optional[Span]:
+    """
+    Get the innermost open span.
+
+    Returns:
+        The current Span, or None outside any span
+    """
+    return _current_span.get()
+
+def set_span_attribute(key: str, value: Any) -> None:
+    """
+    Attach an attribute to the innermost open span, if any.
+
+    Args:
+        key: Attribute name
+        value: Attribute value
+    """
+    span = _current_span.get()
+    if span is not None:
+        span.set_attribute(key, value)
+
+def trace_agent_method(method: Callable) -> Callable:
+    """
+    Wrap an agent's process_message or async_process_message in a span.
+
+    The span joins the trace carried by the incoming message, so agents
+    called on worker threads still nest under the span that sent the message.
+
+    Args:
+        method: The method to wrap
+
+    Returns:
+        The wrapped method
+    """
+    if getattr(method, "_traced", False):
+        return method
+
+    def open_span(agent, message):
+        return start_span(
+            f"{agent.name}.{getattr(message, 'message_type', 'unknown')}",
+            attributes={"agent": agent.name, "sender": getattr(message, "sender", "")},
+            trace_id=getattr(message, "trace_id", None),
+            parent_span_id=getattr(message, "parent_span_id", None)
+        )
+
+    if inspect.iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def async_wrapper(self, message, *args, **kwargs):
+            with open_span(self, message) as span:
+                response = await method(self, message, *args, **kwargs)
+                span.set_attribute("outcome", getattr(response, "message_type", ""))
+                return response
+        async_wrapper._traced = True
+        return async_wrapper
+
+    @functools.wraps(method)
+    def wrapper(self, message, *args, **kwargs):
+        with open_span(self, message) as span:
+            response = method(self, message, *args, **kwargs)
+            span.set_attribute("outcome", getattr(response, "message_type", ""))
+            return response
+    wrapper._traced = True
+    return wrapper
+
+def _root_span(spans: List[Span]) -> Span:
+    """Get the root span of a trace, falling back to the earliest span."""
+    for span in spans:
+        if not span.parent_span_id:
+            return span
+    return min(spans, key=lambda span: span.start_ns)
+
+def render_waterfall(spans: List[Span], width: int = 40) -> str:
+    """
+    Render a trace as a text waterfall.
+
+    Each line shows a span's offset from the start of the trace, its duration
+    and a bar positioned on the trace's timeline, indented under its parent.
+
+    Args:
+        spans: The trace's spans
+        width: Width of the timeline bars in characters
+
+    Returns:
+        The waterfall as text
+    """
+    if not spans:
+        return ""
+
+    start = min(span.start_ns for span in spans)
+    end = max(span.end_ns or span.start_ns for span in spans)
+    total = max(end - start, 1)
+
+    children = {}
+    ids = {span.span_id for span in spans}
+    for span in sorted(spans, key=lambda span: span.start_ns):
+        parent = span.parent_span_id if span.parent_span_id in ids else None
+        children.setdefault(parent, []).append(span)
+
+    lines = [f"trace {spans[0].trace_id}  {total / 1e6:.1f}ms"]
+
+    def walk(parent: Optional[str], depth: int) -> None:
+        for span in children.get(parent, []):
+            span_end = span.end_ns or span.start_ns
+            offset = span.start_ns - start
+            bar_start = int(offset / total * width)
+            bar_length = max(1, int((span_end - span.start_ns) / total * width))
+            bar = " " * bar_start + "#" * min(bar_length, width - bar_start)
+            marker = " !" if span.status == "error" else ""
+            name = ("  " * depth + span.name)[:48]
+            lines.append(
+                f"{offset / 1e6:9.1f}ms {(span_end - span.start_ns) / 1e6:9.1f}ms  "
+                f"{name:<48} |{bar:<{width}}|{marker}"
+            )
+            walk(span.span_id, depth + 1)
+
+    walk(None, 0)
+    return "\n".join(lines)
+
+def load_traces(path: str) -> Dict[str, List[Span]]:
+    """
+    Load spans from a trace file written by the tracer.
+
+    Args:
+        path: Path of the OTLP/JSON lines file
+
+    Returns:
+        Dictionary of trace ID to its spans, in file order
+    """
+    traces = OrderedDict()
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            for resource in json.loads(line).get("resourceSpans", []):
+                for scope in resource.get("scopeSpans", []):
+                    for data in scope.get("spans", []):
+                        span = Span(data["name"], data["traceId"], data.get("parentSpanId") or None)
+                        span.span_id = data["spanId"]
+                        span.start_ns = int(data["startTimeUnixNano"])
+                        span.end_ns = int(data["endTimeUnixNano"])
+                        span.status = "error" if data.get("status", {}).get("code") == 2 else "ok"
+                        traces.setdefault(span.trace_id, []).append(span)
+    return traces
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Print waterfalls for the traces in a trace file."""
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print("usage: python -m dealfinder.utils.tracing TRACE_FILE [TRACE_ID ...]")
+        return 2
+
+    traces = load_traces(argv[0])
+    trace_ids = argv[1:] or list(traces)[-1:]
+    for trace_id in trace_ids:
+        if trace_id not in traces:
+            print(f"trace {trace_id} not found")
+            continue
+        print(render_waterfall(traces[trace_id]))
+        print()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,14 +11,27 @@ import sys
 import argparse
 import logging
 import json
+import queue
+import threading
 from typing import Optional
-from datetime import datetime, timedelta
+from datetime import datetime
 
 from dotenv import load_dotenv
 from rich.console import Console
 
 from dealfinder.langchain_integration.controller import DealFinderControllerAdapter
-from dealfinder.utils.logging import setup_logging
+from dealfinder.utils.logging import setup_logging, get_logging_stats
+from dealfinder.utils.http import get_transport
+from dealfinder.utils.rate_limit import get_rate_limiter
+from dealfinder.utils.circuit_breaker import circuit_breaker_stats
+from dealfinder.utils.cache import get_search_cache, get_llm_cache
+from dealfinder.utils.memory_store import get_conversation_store, get_session_store
+from dealfinder.utils.follow_up import get_follow_up_classifier
+from dealfinder.utils.llm_clients import get_llm_registry
+from dealfinder.utils.jobs import get_job_manager, JobQueueFull
+from dealfinder.utils.metrics import render_metrics
+from dealfinder.utils.tracing import get_tracer, start_span, render_waterfall
+from dealfinder.utils.analytics import get_analytics_sink
 from dealfinder import config
 
 
@@ -120,8 +133,8 @@ def setup_flask_app(gemini_api_key: Optional[str] = None):
     # Flask session configuration - simplified to avoid Flask-Session dependency
     app.secret_key = os.getenv("SECRET_KEY") or "dealfinder-secret-key"  
     
-    # Initialize session store - simple in-memory dict for sessions
-    session_store = {}
+    # Session store with inactivity expiry, shared between worker processes when SHARED_STATE_DB_PATH is set
+    session_store = get_session_store()
 
     # Initialize the controller adapter which can use either implementation
     try:
@@ -147,35 +160,14 @@ def setup_flask_app(gemini_api_key: Optional[str] = None):
     def get_session_id():
         client_id = request.cookies.get('dealfinder_session')
         
-        if not client_id or client_id not in session_store:
-            # Create new session ID
-            client_id = f"session_{datetime.now().strftime('%Y%m%d%H%M%S')}_{os.urandom(4).hex()}"
-            # Initialize session data
-            session_store[client_id] = {
-                "created_at": datetime.now(),
-                "last_accessed": datetime.now()
-            }
-        else:
-            # Update last accessed time
-            session_store[client_id]["last_accessed"] = datetime.now()
-            
-        # Clean up old sessions periodically
-        clean_old_sessions()
-            
-        return client_id
-    
-    # Clean up old sessions to avoid memory leaks
-    def clean_old_sessions():
-        now = datetime.now()
-        expired_time = now - timedelta(hours=1)  # Sessions expire after 1 hour
-        
-        expired_sessions = [
-            session_id for session_id, data in session_store.items() 
-            if data["last_accessed"] < expired_time
-        ]
+        # Looking the session up refreshes its expiry; expired sessions are swept in the background
+        if client_id and session_store.get(client_id, "created_at") is not None:
+            return client_id
         
-        for session_id in expired_sessions:
-            del session_store[session_id]
+        # Create new session ID
+        client_id = f"session_{datetime.now().strftime('%Y%m%d%H%M%S')}_{os.urandom(4).hex()}"
+        session_store.set(client_id, "created_at", datetime.now().isoformat())
+        return client_id
 
     # API endpoint for querying
     @app.route('/api/query', methods=['POST'])
@@ -202,13 +194,15 @@ def setup_flask_app(gemini_api_key: Optional[str] = None):
 
             # Process the query using the controller adapter
             try:
-                controller_response = controller.process_user_query(user_query, session_id=client_id)
+                with start_span("api.query", {"session_id": client_id}) as span:
+                    controller_response = controller.process_user_query(user_query, session_id=client_id)
                 
                 # Create JSON response
                 return jsonify({
                     'response': controller_response,
                     'using_langchain': config.ENABLE_LANGCHAIN,
-                    'session_id': client_id
+                    'session_id': client_id,
+                    'trace_id': span.trace_id
                 })
             except Exception as e:
                 logger.error(f"Error processing query: {str(e)}")
@@ -218,6 +212,129 @@ def setup_flask_app(gemini_api_key: Optional[str] = None):
             logger.error(f"Error in query endpoint: {str(e)}")
             return jsonify({'error': f"Server error: {str(e)}"}), 500
             
+    # Format one Server-Sent Event
+    def format_sse(event: str, data: dict) -> str:
+        return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+    
+    # Streaming API endpoint: pushes each stage's results as Server-Sent Events
+    # (parsed, source, ranked, comparison, response or error, then done)
+    @app.route('/api/query/stream', methods=['POST'])
+    def query_stream():
+        if not request.is_json:
+            return jsonify({'error': 'Invalid request format - expected JSON'}), 400
+        
+        data = request.get_json() or {}
+        user_query = data.get('query', '').strip()
+        
+        if not user_query:
+            return jsonify({'error': 'No query provided'}), 400
+        
+        client_id = get_session_id()
+        events = queue.Queue()
+        
+        # Run the query in the background so events can be sent while it progresses
+        def run_query():
+            try:
+                with start_span("api.query_stream", {"session_id": client_id}) as span:
+                    controller_response = controller.process_user_query(
+                        user_query,
+                        session_id=client_id,
+                        on_event=lambda event, payload: events.put((event, payload))
+                    )
+                events.put(('response', {
+                    'response': controller_response,
+                    'using_langchain': config.ENABLE_LANGCHAIN,
+                    'session_id': client_id,
+                    'trace_id': span.trace_id
+                }))
+            except Exception as e:
+                logger.error(f"Error processing streamed query: {str(e)}")
+                events.put(('error', {'error': f"Error processing query: {str(e)}"}))
+            finally:
+                events.put(None)
+        
+        threading.Thread(target=run_query, name="query-stream", daemon=True).start()
+        
+        def generate():
+            while True:
+                try:
+                    item = events.get(timeout=config.STREAM_HEARTBEAT_INTERVAL)
+                except queue.Empty:
+                    # Comment line keeps proxies from closing an idle connection
+                    yield ": keep-alive\n\n"
+                    continue
+                
+                if item is None:
+                    yield format_sse('done', {})
+                    return
+                yield format_sse(*item)
+        
+        response = Response(generate(), mimetype='text/event-stream')
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Accel-Buffering'] = 'no'
+        response.set_cookie('dealfinder_session', client_id, max_age=3600, httponly=True)
+        return response
+    
+    # Job API: submit a query to the background worker pool and return immediately
+    @app.route('/api/jobs', methods=['POST'])
+    def submit_job():
+        if not request.is_json:
+            return jsonify({'error': 'Invalid request format - expected JSON'}), 400
+        
+        data = request.get_json() or {}
+        user_query = data.get('query', '').strip()
+        
+        if not user_query:
+            return jsonify({'error': 'No query provided'}), 400
+        
+        client_id = get_session_id()
+        
+        try:
+            job = get_job_manager().submit(
+                lambda on_event: controller.process_user_query(user_query, session_id=client_id, on_event=on_event),
+                owner=client_id
+            )
+        except JobQueueFull as e:
+            logger.warning(f"Rejected job submission: {str(e)}")
+            response = jsonify({'error': 'Server is busy, please try again shortly'})
+            response.headers['Retry-After'] = '5'
+            return response, 503
+        
+        response = jsonify({
+            'job_id': job.id,
+            'status': job.status,
+            'session_id': client_id
+        })
+        response.headers['Location'] = f"/api/jobs/{job.id}"
+        response.set_cookie('dealfinder_session', client_id, max_age=3600, httponly=True)
+        return response, 202
+    
+    # Job API: get a job's status and result, optionally waiting up to ?wait=<seconds> for it to finish
+    @app.route('/api/jobs/<job_id>', methods=['GET'])
+    def get_job(job_id):
+        client_id = request.cookies.get('dealfinder_session')
+        
+        try:
+            wait = float(request.args.get('wait', 0))
+        except ValueError:
+            return jsonify({'error': 'wait must be a number of seconds'}), 400
+        
+        job = get_job_manager().wait(job_id, wait, owner=client_id)
+        if job is None:
+            return jsonify({'error': 'Job not found'}), 404
+        
+        data = job.to_dict()
+        data['using_langchain'] = config.ENABLE_LANGCHAIN
+        return jsonify(data)
+    
+    # Job API: cancel a queued or running job
+    @app.route('/api/jobs/<job_id>', methods=['DELETE'])
+    def cancel_job(job_id):
+        job = get_job_manager().cancel(job_id, owner=request.cookies.get('dealfinder_session'))
+        if job is None:
+            return jsonify({'error': 'Job not found'}), 404
+        return jsonify(job.to_dict())
+    
     # API endpoint for getting welcome message
     @app.route('/api/welcome', methods=['GET', 'HEAD'])
     def welcome():
@@ -267,13 +384,72 @@ def setup_flask_app(gemini_api_key: Optional[str] = None):
             logger.error(f"Error toggling LangChain: {str(e)}")
             return jsonify({'error': f"Error toggling LangChain: {str(e)}"}), 500
     
+    # Recently finished query traces
+    @app.route('/api/traces', methods=['GET'])
+    def list_traces():
+        return jsonify({'traces': get_tracer().recent()})
+    
+    # One trace's spans and waterfall (?format=text for the waterfall alone)
+    @app.route('/api/traces/<trace_id>', methods=['GET'])
+    def get_trace(trace_id):
+        spans = get_tracer().get_trace(trace_id)
+        if spans is None:
+            return jsonify({'error': 'Trace not found'}), 404
+        
+        waterfall = render_waterfall(spans)
+        if request.args.get('format') == 'text':
+            return Response(waterfall + "\n", mimetype='text/plain')
+        return jsonify({
+            'trace_id': trace_id,
+            'spans': [span.to_otlp() for span in spans],
+            'waterfall': waterfall
+        })
+    
+    # Query analytics report (?hours= limits it to recent queries, ?limit= sets the number of top queries)
+    @app.route('/api/analytics', methods=['GET'])
+    def analytics_report():
+        try:
+            hours = request.args.get('hours', type=float)
+            since = datetime.now().timestamp() - hours * 3600 if hours else None
+            table = get_analytics_sink().table()
+            return jsonify({
+                'queries': int((table.columns['timestamp'] >= since).sum()) if since else len(table),
+                'top_queries': table.top_queries(request.args.get('limit', 10, type=int), since),
+                'source_yield': table.source_yield(since),
+                'latency_ms': table.latency_percentiles(since=since)
+            })
+        except Exception as e:
+            logger.error(f"Error building analytics report: {str(e)}")
+            return jsonify({'error': f"Error building analytics report: {str(e)}"}), 500
+    
+    # Prometheus metrics endpoint
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        try:
+            payload, content_type = render_metrics()
+        except RuntimeError as e:
+            return jsonify({'error': str(e)}), 503
+        return Response(payload, headers={'Content-Type': content_type})
+    
     # Basic health check endpoint
     @app.route('/health', methods=['GET'])
     def health_check():
         return jsonify({
             'status': 'ok',
             'timestamp': datetime.now().isoformat(),
-            'using_langchain': config.ENABLE_LANGCHAIN
+            'using_langchain': config.ENABLE_LANGCHAIN,
+            'http': get_transport().stats(),
+            'rate_limits': get_rate_limiter().stats(),
+            'circuit_breakers': circuit_breaker_stats(),
+            'search_cache': get_search_cache().stats(),
+            'llm_cache': get_llm_cache().stats(),
+            'llm_clients': get_llm_registry().stats(),
+            'chat_memory': get_conversation_store().stats(),
+            'sessions': session_store.stats(),
+            'follow_up_classifier': get_follow_up_classifier().stats(),
+            'jobs': get_job_manager().stats(),
+            'analytics': get_analytics_sink().stats(),
+            'logging': get_logging_stats()
         })
 
     return app
@@ -32,8 +32,10 @@ setup(
     python_requires=">=3.8",
     install_requires=[
         "requests>=2.28.0",
+        "aiohttp>=3.8.0",
         "beautifulsoup4>=4.11.0",
         "lxml>=4.9.0",
+        "numpy>=1.21.0",
         "google-generativeai>=0.3.0",
         "python-dotenv>=1.0.0",
         "rich>=12.0.0",